@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+import consultas
+from database import obter_engine
+from cache import estatisticas_usuarios
+import fila_auditoria
+import multas
+import painel
+
+log = logging.getLogger(__name__)
+
+# Varredura sem terminar há mais que isso (segundos) é de um worker que morreu; outro a assume
+TEMPO_MAXIMO = float(os.environ.get("AGENDADOR_TEMPO_MAXIMO", 3600))
+# Espera antes de tentar de novo quando a varredura falhou ou está com outro worker
+ESPERA_NOVA_TENTATIVA = 60
+TAREFA = "atrasados"
+
+_trava = threading.Lock()
+_acordar = threading.Event()
+_thread = None
+
+# Cópia local da marca d'água de tarefas_agendadas: último dia em que a
+# varredura terminou, neste ou em outro processo
+ultima_varredura = None
+_nova_tentativa = 0.0
+
+
+def _reservar(hoje):
+    """Tenta reservar a varredura de hoje para este processo; devolve (reservou, última execução)."""
+    try:
+        with obter_engine().begin() as conn:
+            if conn.execute(consultas.TAREFA, {"nome": TAREFA}).first() is None:
+                conn.execute(consultas.CRIAR_TAREFA, {"nome": TAREFA})
+    except IntegrityError:
+        pass  # outro worker criou a linha ao mesmo tempo
+    agora = datetime.now()
+    with obter_engine().begin() as conn:
+        reservou = conn.execute(consultas.RESERVAR_TAREFA, {
+            "nome": TAREFA, "agora": agora, "hoje": hoje, "expirada": agora - timedelta(seconds=TEMPO_MAXIMO),
+        }).rowcount == 1
+        ultima = conn.execute(consultas.TAREFA, {"nome": TAREFA}).one().ultima_execucao
+    return reservou, ultima and date.fromisoformat(str(ultima)[:10])
+
+
+def _liberar():
+    try:
+        with obter_engine().begin() as conn:
+            conn.execute(consultas.LIBERAR_TAREFA, {"nome": TAREFA})
+    except Exception:
+        log.warning("Não foi possível liberar a varredura; outro worker a assume em %ss", TEMPO_MAXIMO, exc_info=True)
+
+
+def atualizar_status_emprestimos():
+    """Marca como 'atrasado' os empréstimos pendentes já vencidos, acumula as multas do dia e reconcilia o painel.
+
+    Roda uma vez por dia entre todos os workers: quem reserva a tarefa em
+    tarefas_agendadas faz a varredura, os demais só anotam a marca d'água.
+    Depois da primeira execução só olha os vencimentos posteriores à última,
+    já que empréstimos lançados com vencimento passado entram atrasados.
+    Devolve quantos empréstimos foram marcados, ou None se a varredura de hoje
+    já foi feita ou está em andamento em outro processo.
+    """
+    global ultima_varredura, _nova_tentativa
+    with _trava:
+        hoje = date.today()
+        reservou, ultima = _reservar(hoje)
+        if not reservou:
+            if ultima == hoje:
+                ultima_varredura = hoje
+            else:
+                _nova_tentativa = time.monotonic() + ESPERA_NOVA_TENTATIVA
+            log.info("Varredura de atrasados de %s feita ou em andamento em outro processo", hoje)
+            return None
+        try:
+            total = _varrer(hoje, ultima)
+        except Exception:
+            _nova_tentativa = time.monotonic() + ESPERA_NOVA_TENTATIVA
+            _liberar()
+            raise
+        ultima_varredura = hoje
+        return total
+
+
+def _varrer(hoje, ultima):
+    desde = ultima - timedelta(days=1) if ultima else date.min
+    params = {"desde": desde, "hoje": hoje}
+    with obter_engine().begin() as conn:
+        vencidos = []
+        if fila_auditoria.ativa():
+            vencidos = conn.execute(consultas.VENCIDOS, params).fetchall()
+        resultado = conn.execute(consultas.MARCAR_ATRASADOS, params)
+    for emprestimo in vencidos:
+        fila_auditoria.registrar("Emprestimos", "UPDATE", emprestimo.ID_emprestimo,
+                                 {"status": "pendente", "data_devolucao_real": None},
+                                 {"usuario_id": emprestimo.Usuario_id, "livro_id": emprestimo.Livro_id,
+                                  "status": "atrasado", "data_devolucao_real": None})
+    # Antes de concluir a tarefa: se o acúmulo falhar, a varredura inteira é refeita
+    multas.acumular(hoje)
+    painel.reconciliar()
+    with obter_engine().begin() as conn:
+        conn.execute(consultas.CONCLUIR_TAREFA, {"nome": TAREFA, "hoje": hoje})
+    if resultado.rowcount:
+        estatisticas_usuarios.invalidar()
+    log.info("Varredura de atrasados em %s: %s empréstimos atualizados", hoje, resultado.rowcount)
+    return resultado.rowcount
+
+
+def varredura_pendente():
+    return ultima_varredura != date.today() and time.monotonic() >= _nova_tentativa
+
+
+def sinalizar_virada_de_dia():
+    # Só compara datas; quem executa a varredura é a thread do agendador
+    if _thread is not None and varredura_pendente():
+        _acordar.set()
+
+
+def _segundos_ate_amanha():
+    agora = datetime.now()
+    amanha = datetime.combine(agora.date() + timedelta(days=1), datetime.min.time())
+    return (amanha - agora).total_seconds() + 1
+
+
+def _executar():
+    while True:
+        espera = _segundos_ate_amanha()
+        if varredura_pendente():
+            try:
+                atualizar_status_emprestimos()
+            except Exception:
+                log.exception("Falha na varredura de atrasados; nova tentativa em %ss", ESPERA_NOVA_TENTATIVA)
+        if ultima_varredura != date.today():
+            espera = min(espera, ESPERA_NOVA_TENTATIVA)
+        _acordar.wait(timeout=espera)
+        _acordar.clear()
+
+
+def iniciar_agendador():
+    global _thread
+    if _thread is not None or os.environ.get("AGENDADOR_ATIVO", "1") == "0":
+        return
+    with _trava:
+        if _thread is None:
+            _thread = threading.Thread(target=_executar, name="agendador-atrasados", daemon=True)
+            _thread.start()
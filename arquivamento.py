@@ -0,0 +1,266 @@
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from sqlalchemy import MetaData, bindparam, inspect, text
+
+import consultas
+from database import obter_engine, metadata
+from paginacao import Pagina
+from transacao import conexao_leitura
+
+RETENCAO_DIAS = int(os.environ.get("AUDITORIA_RETENCAO_DIAS", 90))
+PASTA_ARQUIVO = Path(os.environ.get("AUDITORIA_PASTA_ARQUIVO", "arquivo_auditoria"))
+TAMANHO_LOTE = 5000
+LIMITE_RELATORIO = 1000
+
+COLUNAS = "id_log, tabela_afetada, operacao, id_registro, dados_antigos, dados_novos, usuario_executor, data_hora"
+PADRAO_ARQUIVO = re.compile(r"^logs_auditoria_(\d{6}|inicial)$")
+
+
+def inicio_quente(dias=None):
+    """Início da janela "quente": registros mais novos que a retenção ficam em logs_auditoria."""
+    return datetime.combine(date.today() - timedelta(days=dias or RETENCAO_DIAS), time.min)
+
+
+def _mes_seguinte(dia):
+    return date(dia.year + dia.month // 12, dia.month % 12 + 1, 1)
+
+
+def _particoes(conn):
+    """{nome: limite superior (datetime, ou None para MAXVALUE)} se logs_auditoria for particionada."""
+    if conn.dialect.name != "mysql":
+        return {}
+    linhas = conn.execute(consultas.PARTICOES_AUDITORIA).fetchall()
+    return {linha.nome: linha.limite for linha in linhas}
+
+
+def _particionada(conn, tabela):
+    return conn.execute(consultas.TABELA_PARTICIONADA, {"tabela": tabela}).scalar() > 0
+
+
+def garantir_particoes(meses_a_frente=3):
+    """Divide p_futuro em partições mensais (pAAAAMM) até `meses_a_frente` meses adiante."""
+    with obter_engine().begin() as conn:
+        particoes = _particoes(conn)
+        limites = [limite.date() for limite in particoes.values() if limite]
+        if "p_futuro" not in particoes or not limites:
+            return []
+
+        alvo = date.today().replace(day=1)
+        for _ in range(meses_a_frente):
+            alvo = _mes_seguinte(alvo)
+
+        novas, mes = [], max(limites)
+        while mes < alvo:
+            novas.append((f"p{mes:%Y%m}", _mes_seguinte(mes)))
+            mes = _mes_seguinte(mes)
+        if novas:
+            definicoes = ", ".join(
+                f"PARTITION {nome} VALUES LESS THAN (UNIX_TIMESTAMP('{limite} 00:00:00'))" for nome, limite in novas
+            )
+            conn.exec_driver_sql(
+                f"ALTER TABLE logs_auditoria REORGANIZE PARTITION p_futuro INTO "
+                f"({definicoes}, PARTITION p_futuro VALUES LESS THAN MAXVALUE)"
+            )
+        return [nome for nome, _ in novas]
+
+
+def _gravar_arquivo(conn, sufixo, consulta, params):
+    """Grava as linhas de `consulta` em logs_auditoria_<sufixo>.jsonl.gz.
+
+    O arquivo é montado num temporário e só substitui o anterior quando está
+    completo. Se uma execução interrompida já tinha gravado o mês, as linhas
+    dela são mantidas e as que ainda estão na tabela não se repetem (id_log).
+    """
+    caminho = PASTA_ARQUIVO / f"logs_auditoria_{sufixo}.jsonl.gz"
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    resultado = conn.execution_options(stream_results=True, yield_per=TAMANHO_LOTE).execute(text(consulta), params)
+    PASTA_ARQUIVO.mkdir(parents=True, exist_ok=True)
+    gravadas, novas = set(), 0
+    with open(temporario, "wb") as bruto:
+        with gzip.open(bruto, "wt", encoding="utf-8") as arquivo:
+            if caminho.exists():
+                with gzip.open(caminho, "rt", encoding="utf-8") as anterior:
+                    for linha in anterior:
+                        gravadas.add(json.loads(linha)["id_log"])
+                        arquivo.write(linha)
+            for linha in resultado.mappings():
+                if linha["id_log"] not in gravadas:
+                    arquivo.write(json.dumps(dict(linha), default=str, ensure_ascii=False) + "\n")
+                    novas += 1
+        bruto.flush()
+        os.fsync(bruto.fileno())
+    if novas:
+        # As linhas são apagadas da tabela logo depois: o arquivo tem que estar inteiro em disco
+        os.replace(temporario, caminho)
+    else:
+        temporario.unlink()
+    return caminho
+
+
+def _arquivar_particoes(particoes, corte, destino):
+    arquivadas = []
+    for nome, limite in particoes.items():
+        if limite is None or limite.date() > corte:
+            continue
+        sufixo = "inicial" if nome == "p_inicial" else nome[1:]
+        with obter_engine().begin() as conn:
+            if destino == "arquivo":
+                _gravar_arquivo(conn, sufixo, f"SELECT {COLUNAS} FROM logs_auditoria PARTITION ({nome})", {})
+            else:
+                # EXCHANGE PARTITION só troca metadados: o mês sai da tabela quente sem copiar linhas
+                tabela = f"logs_auditoria_{sufixo}"
+                conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {tabela} LIKE logs_auditoria")
+                if _particionada(conn, tabela):
+                    conn.exec_driver_sql(f"ALTER TABLE {tabela} REMOVE PARTITIONING")
+                # Cada DDL tem commit próprio; numa nova execução depois de uma falha
+                # entre a troca e o DROP, a tabela já tem o mês e trocar de novo o
+                # devolveria à partição
+                if conn.exec_driver_sql(f"SELECT 1 FROM {tabela} LIMIT 1").first() is None:
+                    conn.exec_driver_sql(f"ALTER TABLE logs_auditoria EXCHANGE PARTITION {nome} WITH TABLE {tabela}")
+            conn.exec_driver_sql(f"ALTER TABLE logs_auditoria DROP PARTITION {nome}")
+        arquivadas.append(nome)
+    return arquivadas
+
+
+def _arquivar_em_lotes(corte, destino):
+    # Sem particionamento (ou no SQLite): copia mês a mês e apaga em lotes pela chave primária
+    with obter_engine().connect() as conn:
+        mais_antigo = conn.execute(consultas.LOG_MAIS_ANTIGO, {"corte": corte}).scalar()
+    if mais_antigo is None:
+        return []
+
+    arquivados, mes = [], mais_antigo.date().replace(day=1)
+    while mes < corte:
+        periodo = {"inicio": mes, "fim": _mes_seguinte(mes)}
+        filtro = "data_hora >= :inicio AND data_hora < :fim"
+        tabela = f"logs_auditoria_{mes:%Y%m}"
+        copiar = None
+        if destino == "arquivo":
+            with obter_engine().connect() as conn:
+                _gravar_arquivo(conn, f"{mes:%Y%m}", f"SELECT {COLUNAS} FROM logs_auditoria WHERE {filtro}", periodo)
+        else:
+            with obter_engine().begin() as conn:
+                if conn.dialect.name == "mysql":
+                    conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {tabela} LIKE logs_auditoria")
+                else:
+                    metadata.tables["logs_auditoria"].to_metadata(MetaData(), name=tabela).create(conn, checkfirst=True)
+            copiar = text(
+                f"INSERT INTO {tabela} ({COLUNAS}) SELECT {COLUNAS} FROM logs_auditoria WHERE id_log IN :ids"
+            ).bindparams(bindparam("ids", expanding=True))
+        # Um commit por lote: as travas duram um lote, e uma execução interrompida
+        # recomeça do que ainda está na tabela quente sem copiar nada em dobro
+        while True:
+            with obter_engine().begin() as conn:
+                ids = conn.execute(consultas.LOTE_A_ARQUIVAR, {**periodo, "limite": TAMANHO_LOTE}).scalars().all()
+                if ids and copiar is not None:
+                    conn.execute(copiar, {"ids": ids})
+                if ids:
+                    conn.execute(consultas.APAGAR_LOGS, {"ids": ids})
+            if not ids:
+                break
+        arquivados.append(f"{mes:%Y%m}")
+        mes = _mes_seguinte(mes)
+    return arquivados
+
+
+def arquivar(dias=None, destino="tabela"):
+    """Move para arquivo os meses inteiros anteriores à janela de retenção.
+
+    `destino` é "tabela" (logs_auditoria_AAAAMM) ou "arquivo" (JSONL gzip em PASTA_ARQUIVO).
+    """
+    corte = inicio_quente(dias).date().replace(day=1)
+    garantir_particoes()
+    with obter_engine().connect() as conn:
+        particoes = _particoes(conn)
+    if particoes:
+        return _arquivar_particoes(particoes, corte, destino)
+    return _arquivar_em_lotes(corte, destino)
+
+
+def _tabelas_arquivo(conn, inicio):
+    tabelas = []
+    for nome in inspect(conn).get_table_names():
+        encontrado = PADRAO_ARQUIVO.match(nome)
+        if not encontrado:
+            continue
+        sufixo = encontrado.group(1)
+        if sufixo == "inicial" or _mes_seguinte(date(int(sufixo[:4]), int(sufixo[4:]), 1)) > inicio.date():
+            tabelas.append(nome)
+    return tabelas
+
+
+def consultar_logs(inicio=None, fim=None, operacao=None):
+    """Logs entre `inicio` e `fim` (datas, inclusive), do mais novo para o mais antigo.
+
+    Sem `inicio` a consulta fica na janela quente; as tabelas de arquivo só
+    entram quando o período pedido começa antes dela. Meses arquivados em
+    arquivo (.jsonl.gz) não são consultados.
+    """
+    inicio = datetime.combine(inicio, time.min) if inicio else inicio_quente()
+    condicoes, params = ["data_hora >= :inicio"], {"inicio": inicio, "limite": LIMITE_RELATORIO}
+    if fim:
+        condicoes.append("data_hora < :fim")
+        params["fim"] = datetime.combine(fim + timedelta(days=1), time.min)
+    if operacao:
+        condicoes.append("operacao = :operacao")
+        params["operacao"] = operacao
+    filtro = " AND ".join(condicoes)
+
+    with conexao_leitura() as conn:
+        tabelas = ["logs_auditoria"]
+        if inicio < inicio_quente():
+            tabelas += _tabelas_arquivo(conn, inicio)
+        partes = " UNION ALL ".join(f"SELECT {COLUNAS} FROM {tabela} WHERE {filtro}" for tabela in tabelas)
+        return conn.execute(
+            text(f"SELECT * FROM ({partes}) logs ORDER BY data_hora DESC LIMIT :limite"), params
+        ).fetchall()
+
+
+# Tabela na URL do histórico -> (nomes gravados em tabela_afetada, coluna gerada
+# com o id do registro nos eventos de outras tabelas)
+ENTIDADES = {
+    "usuarios": (("usuarios", "Usuarios"), "usuario_id"),
+    "livros": (("Livros",), "livro_id"),
+    "emprestimos": (("Emprestimos",), None),
+}
+
+
+def historico_registro(entidade, id_registro, apos=None, limite=50):
+    """Eventos de um registro em logs_auditoria (sem os meses já arquivados, em tabela ou arquivo), do mais novo para o mais antigo.
+
+    Para usuários e livros entram também os eventos de empréstimo que os citam.
+    `apos` é o cursor devolvido na página anterior (`AAAA-MM-DDTHH:MM:SS_id`).
+    Devolve Pagina(itens, próximo cursor ou None).
+    """
+    nomes, coluna = ENTIDADES[entidade]
+    params = {"nomes": list(nomes), "id": id_registro, "limite": limite + 1}
+    cursor = ""
+    try:
+        data_cursor, id_cursor = (apos or "").rsplit("_", 1)
+        params.update(data_cursor=datetime.fromisoformat(data_cursor), id_cursor=int(id_cursor))
+        cursor = " AND (data_hora < :data_cursor OR (data_hora = :data_cursor AND id_log < :id_cursor))"
+    except ValueError:
+        pass
+
+    # Um SELECT por índice (idx_logs_registro e idx_logs_usuario/idx_logs_livro),
+    # cada um já limitado; um OR entre as colunas no mesmo WHERE varreria a tabela
+    ordem = "ORDER BY data_hora DESC, id_log DESC LIMIT :limite"
+    filtros = ["tabela_afetada IN :nomes AND id_registro = :id"] + ([f"{coluna} = :id"] if coluna else [])
+    partes = " UNION ".join(
+        f"SELECT * FROM (SELECT {COLUNAS} FROM logs_auditoria WHERE {filtro}{cursor} {ordem}) parte{i}"
+        for i, filtro in enumerate(filtros)
+    )
+    consulta = text(f"SELECT * FROM ({partes}) logs {ordem}").bindparams(bindparam("nomes", expanding=True))
+
+    with conexao_leitura() as conn:
+        linhas = conn.execute(consulta, params).fetchall()
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        return Pagina(linhas, f"{ultima.data_hora:%Y-%m-%dT%H:%M:%S}_{ultima.id_log}")
+    return Pagina(linhas, None)
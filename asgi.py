@@ -0,0 +1,197 @@
+"""Entrada ASGI: as mesmas rotas e templates do app.py, com as páginas de leitura
+mais pesadas servidas por um engine assíncrono.
+
+    uvicorn asgi:aplicacao --workers 4
+
+As rotas de ASSINCRONAS (só GET/HEAD) rodam no event loop: cada consulta
+espera o banco sem prender uma thread, e consultas independentes da mesma
+página vão em conexões próprias ao mesmo tempo. Todo o resto passa para o app
+Flask original, numa pool de threads (ASGI_THREADS).
+"""
+import asyncio
+import os
+
+from a2wsgi import WSGIMiddleware
+from flask import flash, redirect, render_template, session, url_for
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+import consultas
+from app import criar_app
+from arquivamento import inicio_quente
+from cache import estatisticas_usuarios, referencias
+from database import criar_engine_async, obter_engine
+from paginacao import pagina_por_data
+from replicas import engine_leitura
+from rotas.usuarios import consultar_estatisticas
+
+THREADS_WSGI = int(os.environ.get("ASGI_THREADS", 10))
+
+app = criar_app()
+
+# Par assíncrono de cada engine síncrono (primário e réplicas), com o mesmo pool,
+# criado no primeiro uso como o síncrono
+_assincronos = {}
+
+_wsgi = WSGIMiddleware(app, workers=THREADS_WSGI)
+
+
+def _par_assincrono(sincrono):
+    if sincrono not in _assincronos:
+        _assincronos[sincrono] = criar_engine_async(sincrono.url.render_as_string(hide_password=False))
+    return _assincronos[sincrono]
+
+
+def engine_async():
+    """Par assíncrono de engine_leitura(): mesma réplica e mesma leitura própria após escrita.
+
+    A medição de atraso das réplicas roda numa thread de replicas.py, fora do
+    event loop.
+    """
+    return _par_assincrono(engine_leitura())
+
+
+async def _consultar(consulta, primario=False):
+    """Roda consulta(conn) numa conexão própria; `conn` é a Connection síncrona de sempre."""
+    engine = _par_assincrono(obter_engine()) if primario else engine_async()
+    async with engine.connect() as conn:
+        return await conn.run_sync(consulta)
+
+
+async def _em_paralelo(*tarefas):
+    return await asyncio.gather(*(_consultar(tarefa) for tarefa in tarefas))
+
+
+def _todas(instrucao, params=None):
+    return lambda conn: conn.execute(instrucao, params or {}).fetchall()
+
+
+async def _referencias():
+    # Autores, gêneros e editoras: cada falha de cache vai ao banco em paralelo.
+    # Do primário, como cache._carregar: o cache é de todo o worker e não pode
+    # guardar o estado de uma réplica atrasada
+    return await asyncio.gather(*(
+        referencias.obter_async(
+            tabela, lambda tabela=tabela: _consultar(_todas(consultas.REFERENCIAS[tabela]), primario=True)
+        )
+        for tabela in ("autores", "generos", "editoras")
+    ))
+
+
+async def listar_emprestimos():
+    pagina = await _consultar(lambda conn: pagina_por_data(
+        conn, consultas.LISTAR_EMPRESTIMOS, "e.Data_emprestimo", "e.ID_emprestimo"
+    ))
+    return render_template("emprestimos/listar_emprestimo.html", emprestimos=pagina.itens, proximo=pagina.proximo)
+
+
+async def listar_emprestimos_atrasados():
+    emprestimos_atrasados = await _consultar(_todas(consultas.ATRASADOS))
+    return render_template("emprestimos/listar_atrasados.html", emprestimos=emprestimos_atrasados)
+
+
+async def novo_emprestimo():
+    usuarios, livros = await _em_paralelo(_todas(consultas.USUARIOS_EMPRESTIMO), _todas(consultas.LIVROS_DISPONIVEIS))
+    return render_template("emprestimos/novo_emprestimo.html", usuarios=usuarios, livros=livros)
+
+
+async def criar_livro():
+    autores, generos, editoras = await _referencias()
+    return render_template("livros/criar_livro.html", autores=autores, generos=generos, editoras=editoras)
+
+
+async def auditoria():
+    logs = await _consultar(_todas(consultas.AUDITORIA_RECENTE, {"desde": inicio_quente()}))
+    return render_template('auditoria/listar_logs.html', logs=logs)
+
+
+async def estatisticas():
+    if 'usuario_id' not in session:
+        flash('Faça login para ver suas estatísticas.', 'warning')
+        return redirect(url_for('usuarios.login'))
+
+    usuario_id = session['usuario_id']
+    estatisticas, historico, emprestimos_atrasados, multa_atual = await estatisticas_usuarios.obter_async(
+        usuario_id, lambda: _consultar(lambda conn: consultar_estatisticas(conn, usuario_id))
+    )
+    return render_template('usuarios/estatisticas.html', estatisticas=estatisticas, historico=historico,
+                           emprestimos_atrasados=emprestimos_atrasados, multa_atual=multa_atual)
+
+
+# Endpoint do app Flask -> versão assíncrona do GET
+ASSINCRONAS = {
+    "emprestimos.listar_emprestimos": listar_emprestimos,
+    "emprestimos.listar_emprestimos_atrasados": listar_emprestimos_atrasados,
+    "emprestimos.novo_emprestimo": novo_emprestimo,
+    "livros.criar_livro": criar_livro,
+    "auditoria.auditoria": auditoria,
+    "usuarios.estatisticas": estatisticas,
+}
+
+
+def _endpoint(scope):
+    if scope["method"] not in ("GET", "HEAD"):
+        return None
+    try:
+        endpoint, _ = app.url_map.bind("localhost").match(scope["path"], method=scope["method"])
+    except HTTPException:
+        return None
+    return endpoint if endpoint in ASSINCRONAS else None
+
+
+def _environ(scope):
+    servidor = scope.get("server") or ("localhost", 80)
+    cliente = scope.get("client") or ("127.0.0.1", 0)
+    return EnvironBuilder(
+        path=scope["path"],
+        base_url=f"{scope.get('scheme', 'http')}://{servidor[0]}:{servidor[1]}{scope.get('root_path', '')}",
+        query_string=scope["query_string"].decode("latin-1"),
+        method=scope["method"],
+        headers=[(nome.decode("latin-1"), valor.decode("latin-1")) for nome, valor in scope["headers"]],
+        environ_overrides={"REMOTE_ADDR": cliente[0], "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}"},
+    ).get_environ()
+
+
+async def _responder(view, scope):
+    # Mesmo ciclo do Flask (before_request, after_request, sessão, teardown),
+    # com a rota aguardada no lugar da chamada síncrona
+    with app.request_context(_environ(scope)):
+        try:
+            try:
+                resposta = app.preprocess_request()
+                if resposta is None:
+                    resposta = await view()
+            except Exception as erro:
+                resposta = app.handle_user_exception(erro)
+            return app.finalize_request(resposta)
+        except Exception as erro:
+            return app.handle_exception(erro)
+
+
+async def _ciclo_de_vida(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif mensagem["type"] == "lifespan.shutdown":
+            for assincrono in list(_assincronos.values()):
+                await assincrono.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def aplicacao(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _ciclo_de_vida(receive, send)
+
+    endpoint = _endpoint(scope) if scope["type"] == "http" else None
+    if endpoint is None:
+        return await _wsgi(scope, receive, send)
+
+    resposta = await _responder(ASSINCRONAS[endpoint], scope)
+    await send({
+        "type": "http.response.start",
+        "status": resposta.status_code,
+        "headers": [(nome.lower().encode("latin-1"), valor.encode("latin-1")) for nome, valor in resposta.headers.items()],
+    })
+    await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else resposta.get_data()})
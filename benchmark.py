@@ -0,0 +1,616 @@
+"""Benchmarks contra o banco configurado em database.py (use uma base de teste).
+
+    python benchmark.py estoque --threads 8
+    python benchmark.py concorrencia --exemplares 5 --threads 32
+    python benchmark.py popular --emprestimos 1000000
+    python benchmark.py carga --url http://127.0.0.1:5000 --saida resultados/atual.json --base resultados/base.json
+    python benchmark.py modos --sincrono http://127.0.0.1:5000 --assincrono http://127.0.0.1:8000 --concorrencia 256
+    python benchmark.py senhas --metodos scrypt pbkdf2:sha256:600000
+    python benchmark.py senhas --url http://127.0.0.1:5000 --nucleos 4
+    python benchmark.py consultas --repeticoes 5000
+"""
+import argparse
+import copy
+import http.cookiejar
+import json
+import os
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import cycle
+from pathlib import Path
+
+from sqlalchemy import text
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import consultas as registro
+import dados_sinteticos
+import senhas
+from database import obter_engine
+from operacoes_emprestimo import EstoqueEsgotado, emprestar
+
+# Gatilhos de estoque de bases criadas antes da migração 009; com eles o estoque
+# seria descontado duas vezes
+GATILHOS_ESTOQUE_ANTIGOS = [
+    "diminuir_livro_emprestimo",
+    "aumentar_livro_devolucao",
+    "deletar_emprestimo_pendente",
+    "atualizar_status_apos_emprestimo",
+    "atualizar_status_apos_update_emprestimo",
+    "atualizar_status_apos_devolucao",
+]
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def _status_bloqueios(conn):
+    linhas = conn.execute(text("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock%'")).fetchall()
+    return {nome: int(valor) for nome, valor in linhas}
+
+
+def _gatilhos_estoque_instalados(conn):
+    gatilhos = set(conn.execute(text(
+        "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()"
+    )).scalars())
+    return sorted(gatilhos.intersection(GATILHOS_ESTOQUE_ANTIGOS))
+
+
+def _preparar_titulo_quente(conn, exemplares):
+    marcador = uuid.uuid4().hex[:8]
+    usuario_id = conn.execute(text("""
+        INSERT INTO usuarios (nome_usuario, email, numero_telefone, data_inscricao, multa_atual, senha)
+        VALUES (:nome, :email, NULL, CURDATE(), 0.00, '-')
+    """), {"nome": f"benchmark {marcador}", "email": f"benchmark-{marcador}@exemplo.com"}).lastrowid
+    livro_id = conn.execute(text("""
+        INSERT INTO Livros (Titulo, ISBN, Quantidade_disponivel)
+        VALUES (:titulo, :isbn, :quantidade)
+    """), {"titulo": f"Título quente {marcador}", "isbn": dados_sinteticos._isbn13(int(marcador, 16)),
+           "quantidade": exemplares}).lastrowid
+    return usuario_id, livro_id
+
+
+def estoque(args):
+    """Empresta e devolve o mesmo livro em várias threads e mede a espera por bloqueio na linha de Livros."""
+    if obter_engine().dialect.name != "mysql":
+        raise SystemExit("O benchmark de estoque mede bloqueios do InnoDB; rode contra o MySQL.")
+
+    with obter_engine().connect() as conn:
+        antigos = _gatilhos_estoque_instalados(conn)
+    if antigos:
+        raise SystemExit(f"Gatilhos de estoque ainda instalados ({', '.join(antigos)}); rode `flask --app app:criar_app migrar`.")
+    with obter_engine().begin() as conn:
+        usuario_id, livro_id = _preparar_titulo_quente(conn, args.threads * args.emprestimos + 10)
+        antes = _status_bloqueios(conn)
+
+    latencias, erros = [], []
+    trava = threading.Lock()
+
+    def trabalhador():
+        for _ in range(args.emprestimos):
+            inicio = time.perf_counter()
+            try:
+                with obter_engine().begin() as conn:
+                    # Os mesmos UPDATE de operacoes_emprestimo
+                    conn.execute(registro.RESERVAR_EXEMPLAR, {"id": livro_id})
+                    emprestimo_id = conn.execute(text("""
+                        INSERT INTO Emprestimos (Usuario_id, Livro_id, Data_emprestimo, Status_emprestimo)
+                        VALUES (:usuario_id, :livro_id, CURDATE(), 'pendente')
+                    """), {"usuario_id": usuario_id, "livro_id": livro_id}).lastrowid
+                    conn.execute(text("""
+                        UPDATE Emprestimos SET Status_emprestimo = 'devolvido', Data_devolucao_real = CURDATE()
+                        WHERE ID_emprestimo = :id
+                    """), {"id": emprestimo_id})
+                    conn.execute(registro.REPOR_EXEMPLAR, {"id": livro_id})
+            except Exception as e:
+                with trava:
+                    erros.append(str(getattr(e, "orig", e)))
+                continue
+            with trava:
+                latencias.append(time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(args.threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    with obter_engine().begin() as conn:
+        depois = _status_bloqueios(conn)
+        conn.execute(text("DELETE FROM Emprestimos WHERE Livro_id = :id"), {"id": livro_id})
+        conn.execute(text("DELETE FROM Livros WHERE ID_livro = :id"), {"id": livro_id})
+        conn.execute(text("DELETE FROM usuarios WHERE id_usuario = :id"), {"id": usuario_id})
+
+    eventos = len(latencias) * 2
+    print(f"threads: {args.threads} | eventos de empréstimo: {eventos}")
+    print(f"duração: {duracao:.2f} s | vazão: {eventos / duracao:.0f} eventos/s | erros: {len(erros)}")
+    if latencias:
+        print(f"transação (ms): média {statistics.mean(latencias) * 1000:.2f} "
+              f"p95 {_percentil(latencias, 95) * 1000:.2f} p99 {_percentil(latencias, 99) * 1000:.2f}")
+    print(f"esperas por bloqueio de linha: {depois['Innodb_row_lock_waits'] - antes['Innodb_row_lock_waits']}")
+    print(f"tempo em espera por bloqueio (ms): {depois['Innodb_row_lock_time'] - antes['Innodb_row_lock_time']}")
+    for erro in erros[:5]:
+        print(f"erro: {erro}")
+
+
+def concorrencia(args):
+    """Várias threads disputam os últimos exemplares de um título; o estoque não pode ficar negativo."""
+    with obter_engine().begin() as conn:
+        usuario_id, livro_id = _preparar_titulo_quente(conn, args.exemplares)
+
+    concedidos, esgotados, erros = [], [], []
+    trava = threading.Lock()
+    largada = threading.Barrier(args.threads)
+
+    def trabalhador():
+        largada.wait()
+        for _ in range(args.tentativas):
+            try:
+                emprestimo_id = emprestar(usuario_id, livro_id, date.today(), date.today() + timedelta(days=20)).id
+                resultado = concedidos
+            except EstoqueEsgotado:
+                emprestimo_id, resultado = None, esgotados
+            except Exception as e:
+                emprestimo_id, resultado = str(getattr(e, "orig", e)), erros
+            with trava:
+                resultado.append(emprestimo_id)
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(args.threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    with obter_engine().begin() as conn:
+        restante = conn.execute(
+            text("SELECT Quantidade_disponivel FROM Livros WHERE ID_livro = :id"), {"id": livro_id}
+        ).scalar()
+        registrados = conn.execute(
+            text("SELECT COUNT(*) FROM Emprestimos WHERE Livro_id = :id"), {"id": livro_id}
+        ).scalar()
+        conn.execute(text("DELETE FROM Emprestimos WHERE Livro_id = :id"), {"id": livro_id})
+        conn.execute(text("DELETE FROM Livros WHERE ID_livro = :id"), {"id": livro_id})
+        conn.execute(text("DELETE FROM usuarios WHERE id_usuario = :id"), {"id": usuario_id})
+
+    print(f"exemplares: {args.exemplares} | tentativas: {args.threads * args.tentativas} | duração: {duracao:.2f} s")
+    print(f"concedidos: {len(concedidos)} | sem estoque: {len(esgotados)} | erros: {len(erros)}")
+    print(f"empréstimos gravados: {registrados} | estoque final: {restante}")
+    for erro in erros[:5]:
+        print(f"erro: {erro}")
+    if restante != 0 or registrados != args.exemplares or len(concedidos) != args.exemplares:
+        raise SystemExit("FALHOU: estoque vendido além do disponível ou exemplares não emprestados")
+    print("OK: nenhum exemplar vendido além do estoque")
+
+
+def popular(args):
+    """Enche a base com dados sintéticos (use uma base descartável)."""
+    inicio = time.perf_counter()
+    contagens = dados_sinteticos.popular(args.livros, args.usuarios, args.emprestimos, args.dias, args.semente)
+    for tabela, quantidade in contagens.items():
+        print(f"{tabela}: {quantidade}")
+    print(f"concluído em {time.perf_counter() - inicio:.1f} s; senha dos usuários: {dados_sinteticos.SENHA_PADRAO}")
+
+
+class _SemRedirecionar(urllib.request.HTTPRedirectHandler):
+    # Mede só a rota pedida; o destino do redirect é medido na própria rota
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def _cliente(url, email):
+    cookies = http.cookiejar.CookieJar()
+    cliente = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies), _SemRedirecionar())
+    if email:
+        _requisitar(cliente, url + "/login", {"email": email, "senha": dados_sinteticos.SENHA_PADRAO})
+    return cliente
+
+
+def _requisitar(cliente, url, formulario=None):
+    dados = urllib.parse.urlencode(formulario).encode() if formulario is not None else None
+    try:
+        with cliente.open(url, data=dados, timeout=60) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def _amostras(quantidade):
+    """IDs reais para parametrizar as rotas: usuários, livros com estoque e empréstimos em aberto."""
+    with obter_engine().connect() as conn:
+        usuarios = conn.execute(text(
+            "SELECT id_usuario, email FROM usuarios WHERE email LIKE 'leitor%@exemplo.com' ORDER BY id_usuario LIMIT :n"
+        ), {"n": quantidade}).fetchall()
+        livros = conn.execute(text(
+            "SELECT ID_livro FROM Livros WHERE Quantidade_disponivel > 0 ORDER BY Quantidade_disponivel DESC LIMIT :n"
+        ), {"n": quantidade}).scalars().all()
+        abertos = conn.execute(text(
+            "SELECT ID_emprestimo FROM Emprestimos WHERE Status_emprestimo <> 'devolvido' ORDER BY ID_emprestimo DESC LIMIT :n"
+        ), {"n": quantidade}).scalars().all()
+    return usuarios, livros, abertos
+
+
+def _rotas(args, usuarios, livros, abertos):
+    """(nome, função que devolve (caminho, formulário ou None)); os nomes batem com os endpoints do app."""
+    hoje = date.today().isoformat()
+    ha_30_dias = (date.today() - timedelta(days=30)).isoformat()
+    rotas = [
+        ("principal.index", lambda: ("/", None)),
+        ("livros.listar_livros", lambda: ("/livros", None)),
+        ("livros.buscar_livro", lambda: ("/livros/buscar?q=memoria+jardim", None)),
+        ("livros.api_buscar_livros", lambda: ("/api/livros/buscar?q=sombra", None)),
+        ("usuarios.listar_usuarios", lambda: ("/usuarios", None)),
+        ("autores.listar_autor", lambda: ("/autores", None)),
+        ("generos.listar_generos", lambda: ("/generos", None)),
+        ("editoras.listar_editora", lambda: ("/editoras", None)),
+        ("emprestimos.listar_emprestimos", lambda: ("/emprestimos", None)),
+        ("emprestimos.listar_emprestimos_atrasados", lambda: ("/emprestimos/atrasados", None)),
+        ("emprestimos.exportar_emprestimos", lambda: (f"/emprestimos/export?inicio={ha_30_dias}", None)),
+        ("auditoria.auditoria", lambda: ("/auditoria", None)),
+        ("auditoria.filtrar_auditoria", lambda: ("/auditoria/filtrar", {"data_inicio": ha_30_dias, "data_fim": hoje, "operacao": "UPDATE"})),
+        ("usuarios.estatisticas", lambda: ("/estatisticas", None)),
+        ("emprestimos.novo_emprestimo", lambda: ("/emprestimos/novo", None)),
+        ("livros.criar_livro", lambda: ("/livros/criar_livro", None)),
+    ]
+    if abertos:
+        proximo_aberto = cycle(abertos)
+        rotas.append(("emprestimos.devolver_emprestimo", lambda: (f"/emprestimos/devolver/{next(proximo_aberto)}", None)))
+    if args.escrita:
+        proximo_livro, proximo_usuario = cycle(livros), cycle([u.id_usuario for u in usuarios])
+        rotas.append(("emprestimos.novo_emprestimo:POST", lambda: ("/emprestimos/novo", {
+            "usuario_id": next(proximo_usuario), "livro_id": next(proximo_livro),
+            "data_emprestimo": hoje, "data_devolucao_prevista": "",
+        })))
+        pendentes = iter(abertos)
+        trava = threading.Lock()
+
+        def devolver():
+            with trava:
+                emprestimo = next(pendentes, None)
+            if emprestimo is None:
+                return None
+            return f"/emprestimos/devolver/{emprestimo}", {"data_devolucao_real": hoje}
+        rotas.append(("emprestimos.devolver_emprestimo:POST", devolver))
+    if args.rotas:
+        rotas = [rota for rota in rotas if rota[0].split(":")[0] in args.rotas]
+    return rotas
+
+
+def _medir_rota(args, gerar, clientes):
+    latencias, status = [], {}
+    trava = threading.Lock()
+    fim = time.perf_counter() + args.duracao
+
+    def trabalhador(cliente):
+        while time.perf_counter() < fim:
+            with trava:
+                pedido = gerar()
+            if pedido is None:
+                return
+            caminho, formulario = pedido
+            inicio = time.perf_counter()
+            try:
+                codigo = _requisitar(cliente, args.url + caminho, formulario)
+            except Exception:
+                codigo = "falha"
+            duracao = time.perf_counter() - inicio
+            with trava:
+                latencias.append(duracao)
+                status[codigo] = status.get(codigo, 0) + 1
+
+    threads = [threading.Thread(target=trabalhador, args=(cliente,)) for cliente in clientes]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    erros = sum(quantidade for codigo, quantidade in status.items() if codigo == "falha" or codigo >= 400)
+    resultado = {"requisicoes": len(latencias), "erros": erros, "status": {str(c): q for c, q in status.items()},
+                 "vazao": round(len(latencias) / decorrido, 2)}
+    if latencias:
+        resultado.update({
+            "media_ms": round(statistics.mean(latencias) * 1000, 2),
+            "p50_ms": round(_percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(_percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(_percentil(latencias, 99) * 1000, 2),
+        })
+    return resultado
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _comparar(atual, base, tolerancia):
+    """Compara p95 e vazão por rota; devolve as rotas cujo p95 piorou além da tolerância."""
+    regressoes = []
+    print(f"\ncomparação com {base.get('commit') or 'base'} ({base.get('data')}):")
+    for nome, medida in atual["rotas"].items():
+        # Bases gravadas antes dos blueprints usam o endpoint sem o prefixo
+        anterior = base["rotas"].get(nome) or base["rotas"].get(nome.split(".", 1)[-1])
+        if not anterior or "p95_ms" not in anterior or "p95_ms" not in medida:
+            continue
+        variacao = (medida["p95_ms"] - anterior["p95_ms"]) / anterior["p95_ms"] if anterior["p95_ms"] else 0
+        marca = "  <-- regressão" if variacao > tolerancia else ""
+        print(f"{nome:46} p95 {anterior['p95_ms']:8.1f} -> {medida['p95_ms']:8.1f} ms ({variacao:+.0%}) "
+              f"vazão {anterior['vazao']:7.1f} -> {medida['vazao']:7.1f}/s{marca}")
+        if marca:
+            regressoes.append(nome)
+    return regressoes
+
+
+def carga(args):
+    """Dispara cada rota do app com concorrência fixa e guarda p50/p95/p99 e vazão em JSON."""
+    usuarios, livros, abertos = _amostras(max(args.concorrencia, 1000))
+    if not usuarios:
+        raise SystemExit("Nenhum usuário sintético encontrado; rode `python benchmark.py popular` antes.")
+    clientes = [_cliente(args.url, usuarios[i % len(usuarios)].email) for i in range(args.concorrencia)]
+
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "config": {"url": args.url, "concorrencia": args.concorrencia, "duracao": args.duracao, "escrita": args.escrita},
+        "rotas": {},
+    }
+    print(f"{'rota':46} {'req':>6} {'erros':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for nome, gerar in _rotas(args, usuarios, livros, abertos):
+        medida = _medir_rota(args, gerar, clientes)
+        resultado["rotas"][nome] = medida
+        print(f"{nome:46} {medida['requisicoes']:6} {medida['erros']:5} {medida['vazao']:8.1f} "
+              f"{medida.get('p50_ms', 0):8.1f} {medida.get('p95_ms', 0):8.1f} {medida.get('p99_ms', 0):8.1f}")
+
+    if args.saida:
+        Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"resultado gravado em {args.saida}")
+    if args.base:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        regressoes = _comparar(resultado, base, args.tolerancia)
+        if regressoes:
+            raise SystemExit(f"p95 piorou mais de {args.tolerancia:.0%} em: {', '.join(regressoes)}")
+
+
+# Rotas que o asgi.py serve pelo engine assíncrono
+ROTAS_ASSINCRONAS = ["emprestimos.listar_emprestimos", "emprestimos.listar_emprestimos_atrasados",
+                     "emprestimos.novo_emprestimo", "livros.criar_livro", "auditoria.auditoria", "usuarios.estatisticas"]
+
+
+def modos(args):
+    """As mesmas rotas no servidor WSGI (app.py) e no ASGI (asgi.py), alternando rota a rota."""
+    usuarios, livros, abertos = _amostras(max(args.concorrencia, 1000))
+    if not usuarios:
+        raise SystemExit("Nenhum usuário sintético encontrado; rode `python benchmark.py popular` antes.")
+    args.escrita = False
+    args.rotas = args.rotas or ROTAS_ASSINCRONAS
+    servidores = {"sincrono": args.sincrono, "assincrono": args.assincrono}
+    clientes = {
+        modo: [_cliente(url, usuarios[i % len(usuarios)].email) for i in range(args.concorrencia)]
+        for modo, url in servidores.items()
+    }
+
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "config": {**servidores, "concorrencia": args.concorrencia, "duracao": args.duracao},
+        "rotas": {},
+    }
+    print(f"{'rota':46} {'modo':10} {'req':>6} {'erros':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for nome, gerar in _rotas(args, usuarios, livros, abertos):
+        resultado["rotas"][nome] = {}
+        for modo, url in servidores.items():
+            alvo = copy.copy(args)
+            alvo.url = url
+            medida = _medir_rota(alvo, gerar, clientes[modo])
+            resultado["rotas"][nome][modo] = medida
+            print(f"{nome:46} {modo:10} {medida['requisicoes']:6} {medida['erros']:5} {medida['vazao']:8.1f} "
+                  f"{medida.get('p50_ms', 0):8.1f} {medida.get('p95_ms', 0):8.1f} {medida.get('p99_ms', 0):8.1f}")
+
+    if args.saida:
+        Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"resultado gravado em {args.saida}")
+
+
+def _kdf(metodo, nucleos, duracao):
+    hash_salvo = generate_password_hash(dados_sinteticos.SENHA_PADRAO, method=metodo, salt_length=senhas.TAMANHO_SAL)
+    inicio = time.perf_counter()
+    check_password_hash(hash_salvo, dados_sinteticos.SENHA_PADRAO)
+    latencia = time.perf_counter() - inicio
+
+    verificacoes = [0] * nucleos
+    fim = time.perf_counter() + duracao
+
+    def trabalhador(posicao):
+        while time.perf_counter() < fim:
+            check_password_hash(hash_salvo, dados_sinteticos.SENHA_PADRAO)
+            verificacoes[posicao] += 1
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(nucleos)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    vazao = sum(verificacoes) / (time.perf_counter() - inicio)
+    return {"latencia_ms": round(latencia * 1000, 2), "vazao": round(vazao, 2), "por_nucleo": round(vazao / nucleos, 2)}
+
+
+def senhas_login(args):
+    """Logins por segundo por núcleo: só o KDF de cada método, ou o POST /login inteiro com --url."""
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "config": {"nucleos": args.nucleos, "duracao": args.duracao, "url": args.url},
+    }
+    if not args.url:
+        # Uma thread por núcleo: o hashlib solta o GIL, então é a mesma conta da pool de senhas.py
+        print(f"{'método':28} {'1 login (ms)':>12} {'logins/s':>10} {'por núcleo':>11}")
+        resultado["metodos"] = {}
+        for metodo in args.metodos or [senhas.METODO]:
+            medida = _kdf(metodo, args.nucleos, args.duracao)
+            resultado["metodos"][metodo] = medida
+            print(f"{metodo:28} {medida['latencia_ms']:12.1f} {medida['vazao']:10.1f} {medida['por_nucleo']:11.1f}")
+    else:
+        usuarios, _, _ = _amostras(max(args.concorrencia, 1000))
+        if not usuarios:
+            raise SystemExit("Nenhum usuário sintético encontrado; rode `python benchmark.py popular` antes.")
+        proximo = cycle(usuarios)
+        gerar = lambda: ("/login", {"email": next(proximo).email, "senha": dados_sinteticos.SENHA_PADRAO})
+        clientes = [_cliente(args.url, None) for _ in range(args.concorrencia)]
+        medida = _medir_rota(args, gerar, clientes)
+        medida["por_nucleo"] = round(medida["vazao"] / args.nucleos, 2)
+        resultado["login"] = medida
+        print(f"logins: {medida['requisicoes']} | erros: {medida['erros']} | {medida['vazao']:.1f}/s "
+              f"({medida['por_nucleo']:.1f}/s por núcleo) | p50 {medida.get('p50_ms', 0):.1f} ms "
+              f"p95 {medida.get('p95_ms', 0):.1f} ms p99 {medida.get('p99_ms', 0):.1f} ms")
+
+    if args.saida:
+        Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"resultado gravado em {args.saida}")
+
+
+def _amostras_consultas(conn):
+    usuario = conn.execute(text("SELECT id_usuario, email FROM usuarios ORDER BY id_usuario LIMIT 1")).fetchone()
+    livro = conn.execute(text("SELECT ID_livro FROM Livros ORDER BY ID_livro LIMIT 1")).scalar()
+    emprestimo = conn.execute(text("SELECT ID_emprestimo FROM Emprestimos ORDER BY ID_emprestimo LIMIT 1")).scalar()
+    if not (usuario and livro and emprestimo):
+        raise SystemExit("Base sem usuários, livros ou empréstimos; rode `python benchmark.py popular` antes.")
+    # Só leituras, para o benchmark poder rodar em qualquer base
+    return {
+        "LOGIN": {"email": usuario.email},
+        "USUARIO_POR_ID": {"id": usuario.id_usuario},
+        "ESTATISTICAS_USUARIO": {"id": usuario.id_usuario},
+        "LIVRO_POR_ID": {"id": livro},
+        "AUTOR_POR_ID": {"id": 1},
+        "EMPRESTIMO_DETALHADO": {"id": emprestimo},
+        "EMPRESTIMO_A_DEVOLVER": {"id": emprestimo},
+        "USUARIOS_EMPRESTIMO": {},
+        "ATRASADOS": {},
+        "BUSCA_PREFIXO": {"prefixo": "A%", "limite": 51, "deslocamento": 0},
+        "AUDITORIA_RECENTE": {"desde": date.today() - timedelta(days=30)},
+    }
+
+
+def _por_chamada(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def consultas(args):
+    """µs por chamada de cada instrução do registro contra o mesmo SQL montado com text() na hora."""
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "config": {"repeticoes": args.repeticoes, "banco": obter_engine().dialect.name},
+        "consultas": {},
+    }
+    print(f"{'instrução':24} {'na hora (µs)':>13} {'registrada (µs)':>16} {'ganho':>7} {'text() (µs)':>12}")
+    with obter_engine().connect() as conn:
+        for nome, params in _amostras_consultas(conn).items():
+            instrucao = registro.REGISTRO[nome]
+            na_hora = lambda: conn.execute(text(instrucao.text), params).fetchall()
+            registrada = lambda: conn.execute(instrucao, params).fetchall()
+            # Aquece os dois caminhos: cache de compilação e instruções preparadas do driver
+            na_hora()
+            registrada()
+            medida = {
+                "na_hora_us": round(_por_chamada(na_hora, args.repeticoes), 2),
+                "registrada_us": round(_por_chamada(registrada, args.repeticoes), 2),
+                "montagem_us": round(_por_chamada(lambda: text(instrucao.text), args.repeticoes), 2),
+            }
+            medida["ganho"] = round(1 - medida["registrada_us"] / medida["na_hora_us"], 3)
+            resultado["consultas"][nome] = medida
+            print(f"{nome:24} {medida['na_hora_us']:13.1f} {medida['registrada_us']:16.1f} "
+                  f"{medida['ganho']:7.1%} {medida['montagem_us']:12.1f}")
+
+    if args.saida:
+        Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"resultado gravado em {args.saida}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p = comandos.add_parser("estoque", help="espera por bloqueio num título disputado")
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--emprestimos", type=int, default=200, help="empréstimos por thread")
+    p.set_defaults(executar=estoque)
+
+    p = comandos.add_parser("concorrencia", help="muitas threads emprestando o mesmo título até esgotar")
+    p.add_argument("--exemplares", type=int, default=5)
+    p.add_argument("--threads", type=int, default=32)
+    p.add_argument("--tentativas", type=int, default=3, help="empréstimos tentados por thread")
+    p.set_defaults(executar=concorrencia)
+
+    p = comandos.add_parser("popular", help="gera dados sintéticos em todas as tabelas")
+    p.add_argument("--livros", type=int, default=10000)
+    p.add_argument("--usuarios", type=int, default=5000)
+    p.add_argument("--emprestimos", type=int, default=100000)
+    p.add_argument("--dias", type=int, default=3 * 365, help="período coberto pelos empréstimos")
+    p.add_argument("--semente", type=int, default=42)
+    p.set_defaults(executar=popular)
+
+    p = comandos.add_parser("carga", help="latência e vazão de cada rota via HTTP, com linha de base em JSON")
+    p.add_argument("--url", default="http://127.0.0.1:5000")
+    p.add_argument("--concorrencia", type=int, default=8)
+    p.add_argument("--duracao", type=float, default=10, help="segundos por rota")
+    p.add_argument("--rotas", nargs="*", help="só estas rotas (nomes dos endpoints)")
+    p.add_argument("--escrita", action="store_true", help="inclui POST de empréstimo e devolução (altera a base)")
+    p.add_argument("--saida", help="arquivo JSON para guardar o resultado")
+    p.add_argument("--base", help="resultado anterior para comparar")
+    p.add_argument("--tolerancia", type=float, default=0.2, help="piora aceitável do p95 (0.2 = 20%%)")
+    p.set_defaults(executar=carga)
+
+    p = comandos.add_parser("modos", help="compara o servidor síncrono (app.py) e o assíncrono (asgi.py)")
+    p.add_argument("--sincrono", default="http://127.0.0.1:5000")
+    p.add_argument("--assincrono", default="http://127.0.0.1:8000")
+    p.add_argument("--concorrencia", type=int, default=256)
+    p.add_argument("--duracao", type=float, default=10, help="segundos por rota e modo")
+    p.add_argument("--rotas", nargs="*", help=f"padrão: {' '.join(ROTAS_ASSINCRONAS)}")
+    p.add_argument("--saida", help="arquivo JSON para guardar o resultado")
+    p.set_defaults(executar=modos)
+
+    p = comandos.add_parser("senhas", help="logins por segundo por núcleo (KDF isolado ou POST /login)")
+    p.add_argument("--metodos", nargs="*", help="métodos do werkzeug a comparar (padrão: SENHA_METODO)")
+    p.add_argument("--url", help="mede o POST /login do app em vez do KDF isolado")
+    p.add_argument("--nucleos", type=int, default=os.cpu_count() or 1, help="núcleos usados (ou do servidor, com --url)")
+    p.add_argument("--concorrencia", type=int, default=32, help="clientes simultâneos, com --url")
+    p.add_argument("--duracao", type=float, default=10, help="segundos por medida")
+    p.add_argument("--saida", help="arquivo JSON para guardar o resultado")
+    p.set_defaults(executar=senhas_login)
+
+    p = comandos.add_parser("consultas", help="custo por chamada das instruções do registro contra text() na hora")
+    p.add_argument("--repeticoes", type=int, default=2000, help="execuções de cada instrução por medida")
+    p.add_argument("--saida", help="arquivo JSON para guardar o resultado")
+    p.set_defaults(executar=consultas)
+
+    args = parser.parse_args()
+    args.executar(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import re
+
+from sqlalchemy import text
+
+import consultas
+from cache import buscas, nomes_referencia
+from transacao import conexao_leitura
+from paginacao import Pagina
+
+# innodb_ft_min_token_size: palavras menores não entram no índice FULLTEXT
+TAMANHO_MINIMO_PALAVRA = 3
+
+PADRAO_ISBN = re.compile(r"^[\dXx][\dXx\- ]{8,16}[\dXx]$")
+
+
+def _isbn(termo):
+    digitos = termo.replace("-", "").replace(" ", "").upper()
+    if PADRAO_ISBN.match(termo) and len(digitos) in (10, 13) and digitos[:9].isdigit():
+        return digitos
+    return None
+
+
+def _por_isbn(conn, termo, isbn, limite, deslocamento):
+    return conn.execute(consultas.BUSCA_ISBN, {"isbn": isbn, "termo": termo, "limite": limite,
+                                               "deslocamento": deslocamento}).fetchall()
+
+
+def _por_prefixo(conn, termo, limite, deslocamento):
+    return conn.execute(consultas.BUSCA_PREFIXO, {"prefixo": termo.replace("%", "").replace("_", "") + "%",
+                                                  "limite": limite, "deslocamento": deslocamento}).fetchall()
+
+
+def _por_texto(conn, palavras, limite, deslocamento):
+    # Termos opcionais: cada lado da UNION casa só parte das palavras ("casmurro"
+    # no título, "machado" no autor) e a soma das relevâncias põe na frente os
+    # livros que casam com mais delas
+    termos = " ".join(f"{palavra}*" for palavra in palavras)
+    return conn.execute(consultas.BUSCA_TEXTO, {"termos": termos, "limite": limite,
+                                                "deslocamento": deslocamento}).fetchall()
+
+
+def _por_like(conn, palavras, termo, limite, deslocamento):
+    # Sem FULLTEXT (SQLite): cada palavra precisa aparecer no título, no resumo
+    # ou no autor; título que começa com a busca vem antes. O número de palavras
+    # muda o SQL, então esta fica fora do registro de consultas
+    condicoes, params = [], {"frase": termo + "%", "limite": limite, "deslocamento": deslocamento}
+    for i, palavra in enumerate(palavras):
+        condicoes.append(f"(l.Titulo LIKE :p{i} OR l.Resumo LIKE :p{i} OR a.Nome_autor LIKE :p{i})")
+        params[f"p{i}"] = f"%{palavra}%"
+    return conn.execute(text(f"""
+        SELECT {consultas.COLUNAS_BUSCA} FROM Livros l
+        LEFT JOIN Autores a ON l.Autor_id = a.ID_autor
+        WHERE {" AND ".join(condicoes)}
+        ORDER BY CASE WHEN l.Titulo LIKE :frase THEN 0 ELSE 1 END, l.ID_livro
+        LIMIT :limite OFFSET :deslocamento
+    """), params).fetchall()
+
+
+def _executar(termo, modo, pagina, limite):
+    deslocamento = (pagina - 1) * limite
+    # Um registro a mais só para saber se existe próxima página
+    limite += 1
+    palavras = re.findall(r"\w+", termo)
+    with conexao_leitura() as conn:
+        isbn = _isbn(termo)
+        if isbn:
+            return _por_isbn(conn, termo, isbn, limite, deslocamento)
+        if modo == "prefixo":
+            return _por_prefixo(conn, termo, limite, deslocamento)
+        if conn.dialect.name != "mysql":
+            return _por_like(conn, palavras, termo, limite, deslocamento)
+        indexaveis = [palavra for palavra in palavras if len(palavra) >= TAMANHO_MINIMO_PALAVRA]
+        if not indexaveis:
+            return _por_prefixo(conn, termo, limite, deslocamento)
+        return _por_texto(conn, indexaveis, limite, deslocamento)
+
+
+def buscar_livros(termo, modo="texto", pagina=1, limite=50):
+    """Livros que casam com `termo`, do mais para o menos relevante.
+
+    ISBN (10 ou 13 dígitos) vai direto ao índice de ISBN; `modo="prefixo"`
+    procura títulos que começam com o termo. Devolve Pagina(itens, próxima
+    página ou None), com os itens como dicionários já com os nomes de autor,
+    gênero e editora.
+    """
+    termo = " ".join(termo.split())
+    if not termo:
+        return Pagina([], None)
+
+    def carregar():
+        linhas = _executar(termo, modo, pagina, limite)
+        autores, generos, editoras = nomes_referencia()
+        itens = [
+            dict(linha._mapping,
+                 Nome_autor=autores.get(linha.Autor_id),
+                 nome_genero=generos.get(linha.Genero_id),
+                 Nome_editora=editoras.get(linha.Editora_id))
+            for linha in linhas[:limite]
+        ]
+        return Pagina(itens, pagina + 1 if len(linhas) > limite else None)
+
+    return buscas.obter((termo.lower(), modo, pagina, limite), carregar)
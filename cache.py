@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import consultas
+from transacao import conexao, depois_do_commit
+
+
+class CacheTTL:
+    """Cache LRU em memória com expiração por tempo e contadores de acertos/falhas."""
+
+    def __init__(self, ttl, tamanho_maximo=128):
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def _procurar(self, chave, agora):
+        with self._trava:
+            item = self._itens.get(chave)
+            if item and item[0] > agora:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, item[1]
+            self.falhas += 1
+        return False, None
+
+    def _guardar(self, chave, valor, agora):
+        with self._trava:
+            self._itens[chave] = (agora + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def obter(self, chave, carregar):
+        agora = time.monotonic()
+        achou, valor = self._procurar(chave, agora)
+        if not achou:
+            valor = carregar()
+            self._guardar(chave, valor, agora)
+        return valor
+
+    async def obter_async(self, chave, carregar):
+        """Como obter(), com `carregar` devolvendo um awaitable (rotas do asgi.py)."""
+        agora = time.monotonic()
+        achou, valor = self._procurar(chave, agora)
+        if not achou:
+            valor = await carregar()
+            self._guardar(chave, valor, agora)
+        return valor
+
+    def invalidar(self, *chaves):
+        # Dentro de uma requisição, só depois do commit: antes dele outra
+        # requisição ainda leria e guardaria o dado antigo
+        depois_do_commit(lambda: self._remover(chaves))
+
+    def _remover(self, chaves):
+        with self._trava:
+            if not chaves:
+                self._itens.clear()
+            for chave in chaves:
+                self._itens.pop(chave, None)
+
+    def estatisticas(self):
+        return {"acertos": self.acertos, "falhas": self.falhas, "itens": len(self._itens)}
+
+
+# Tabelas de apoio dos formulários de livros. Cada worker tem seu cache; as
+# rotas de cadastro/edição/exclusão invalidam o do próprio processo e o TTL
+# limita quanto tempo os demais ficam desatualizados.
+referencias = CacheTTL(ttl=float(os.environ.get("CACHE_REFERENCIA_TTL", 300)))
+
+def _carregar(tabela):
+    def carregar():
+        with conexao() as conn:
+            return conn.execute(consultas.REFERENCIAS[tabela]).fetchall()
+    return carregar
+
+
+def obter_autores():
+    return referencias.obter("autores", _carregar("autores"))
+
+
+def obter_generos():
+    return referencias.obter("generos", _carregar("generos"))
+
+
+def obter_editoras():
+    return referencias.obter("editoras", _carregar("editoras"))
+
+
+def nomes_referencia():
+    """Dicionários id -> nome de autores, gêneros e editoras, para montar listagens sem JOIN."""
+    return referencias.obter("nomes", lambda: (
+        {autor.ID_autor: autor.Nome_autor for autor in obter_autores()},
+        {genero.id_genero: genero.nome_genero for genero in obter_generos()},
+        {editora.ID_editora: editora.Nome_editora for editora in obter_editoras()},
+    ))
+
+
+def invalidar_referencia(tabela):
+    referencias.invalidar(tabela, "nomes")
+    # Os resultados da busca já trazem os nomes de autor, gênero e editora
+    buscas.invalidar()
+
+
+# Página /estatisticas, por usuario_id; invalidada pelas rotas de empréstimo
+estatisticas_usuarios = CacheTTL(ttl=float(os.environ.get("CACHE_ESTATISTICAS_TTL", 30)), tamanho_maximo=1024)
+
+
+# Resultados de /livros/buscar por (termo, modo, página, limite). Limpo pelas
+# rotas que alteram livros e autores; o TTL curto cobre a quantidade
+# disponível, que muda a cada empréstimo.
+buscas = CacheTTL(ttl=float(os.environ.get("CACHE_BUSCA_TTL", 30)), tamanho_maximo=512)
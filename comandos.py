@@ -0,0 +1,82 @@
+"""Comandos de CLI (`flask --app app:criar_app <comando>`), registrados por app.criar_app()."""
+import click
+
+import fila_auditoria
+import importacao
+import multas
+import painel
+from agendador import atualizar_status_emprestimos
+from arquivamento import arquivar
+from database import criar_tabelas
+from esquema import migrar, verificar_planos
+
+
+def registrar(app):
+    @app.cli.command("atualizar-atrasados")
+    def atualizar_atrasados_comando():
+        """Executa uma vez a varredura de empréstimos atrasados e o acúmulo de multas (uso via cron)."""
+        total = atualizar_status_emprestimos()
+        if total is None:
+            print("A varredura de hoje já foi feita ou está em andamento em outro processo.")
+        else:
+            print(f"{total} empréstimos marcados como atrasados.")
+
+    @app.cli.command("acumular-multas")
+    def acumular_multas_comando():
+        """Recalcula as multas dos empréstimos atrasados e o pendente dos usuários (pode repetir no mesmo dia)."""
+        alterados = multas.acumular()
+        print(f"{alterados} empréstimos com multa atualizada.")
+
+    @app.cli.command("reconciliar-painel")
+    def reconciliar_painel_comando():
+        """Recalcula os totais da página inicial a partir das tabelas."""
+        desvios = painel.reconciliar()
+        print(f"Contadores corrigidos: {desvios}" if desvios else "Contadores em dia.")
+
+    @app.cli.command("criar-tabelas")
+    def criar_tabelas_comando():
+        """Cria as tabelas do sistema caso ainda não existam."""
+        criar_tabelas()
+        print("Tabelas criadas ou já existiam.")
+
+    @app.cli.command("migrar")
+    def migrar_comando():
+        """Aplica as migrações pendentes da pasta migracoes/."""
+        migrar()
+
+    @app.cli.command("verificar-planos")
+    def verificar_planos_comando():
+        """Falha se alguma consulta quente passar a varrer a tabela inteira."""
+        regressoes = verificar_planos()
+        if regressoes:
+            raise SystemExit(f"Consultas sem índice: {', '.join(regressoes)}")
+        print("Todas as consultas quentes usam índice.")
+
+    @app.cli.command("importar")
+    @click.argument("tabela", type=click.Choice(["livros", "usuarios"]))
+    @click.argument("arquivo", type=click.Path(exists=True, dir_okay=False))
+    def importar_comando(tabela, arquivo):
+        """Importa livros ou usuários de um arquivo CSV/JSON."""
+        with open(arquivo, encoding="utf-8-sig") as f:
+            registros = importacao.ler_registros(f, arquivo)
+        importar = importacao.importar_livros if tabela == "livros" else importacao.importar_usuarios
+        resultado = importar(registros)
+        for erro in resultado["erros"]:
+            print(f"linha {erro['linha']}: {erro['erro']}")
+        print(f"{resultado['inseridos']} registros importados, {len(resultado['erros'])} com erro.")
+
+    @app.cli.command("auditoria-gatilhos")
+    @click.argument("acao", type=click.Choice(["ativar", "desativar"]))
+    def auditoria_gatilhos_comando(acao):
+        """Recria ou remove os gatilhos log_* (use 'desativar' junto com AUDITORIA_MODO=aplicacao)."""
+        for nome in fila_auditoria.alternar_gatilhos(acao == "ativar"):
+            print(f"{nome}: {'ativado' if acao == 'ativar' else 'removido'}")
+
+    @app.cli.command("arquivar-auditoria")
+    @click.option("--dias", type=int, default=None, help="Retenção em dias (padrão: AUDITORIA_RETENCAO_DIAS).")
+    @click.option("--destino", type=click.Choice(["tabela", "arquivo"]), default="tabela",
+                  help="'arquivo' tira os meses do banco: as consultas de auditoria deixam de vê-los.")
+    def arquivar_auditoria_comando(dias, destino):
+        """Move os logs de auditoria antigos para tabelas mensais ou arquivos JSONL.gz."""
+        arquivados = arquivar(dias, destino)
+        print(f"Meses arquivados: {', '.join(arquivados) or 'nenhum'}")
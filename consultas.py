@@ -0,0 +1,499 @@
+"""Registro das instruções SQL fixas das rotas e das tarefas.
+
+Cada instrução é um text() montado uma vez, na importação, com o tipo dos
+parâmetros que chegam já convertidos (ids, datas e valores calculados no
+Python); os que vêm direto do formulário, como texto, ficam sem tipo, como
+antes. Com a instrução pronta a rota não refaz, a cada chamada, a varredura do
+SQL atrás dos parâmetros. O registro serve antes de tudo para ter o SQL num só
+lugar (o EXPLAIN de esquema.verificar_planos e o benchmark partem dele); o
+efeito no tempo de resposta não foi medido no MySQL, e no SQLite foi pequeno e
+nem sempre a favor.
+
+As constantes LISTAR_* são a base das listagens paginadas: paginacao.py
+acrescenta o filtro, a ordem e o LIMIT e guarda o resultado. As EXPORTAR_*
+fazem o mesmo papel nas exportações, que acrescentam o período e a ordem.
+
+`python benchmark.py consultas` compara as instruções registradas com o
+text() montado na hora.
+"""
+from sqlalchemy import Date, DateTime, Integer, Numeric, String, bindparam, text
+from sqlalchemy.sql.elements import TextClause
+
+
+def _sql(sql, **tipos):
+    return text(sql).bindparams(*(bindparam(nome, type_=tipo) for nome, tipo in tipos.items()))
+
+
+# --- Usuários ---
+
+INSERIR_USUARIO = _sql("""
+    INSERT INTO usuarios (nome_usuario, email, numero_telefone, data_inscricao, multa_atual, senha)
+    VALUES (:nome, :email, :telefone, :data, 0.00, :senha)
+""", nome=String, email=String, telefone=String, senha=String)
+
+# Só o necessário, pelo índice único de email (migração 001)
+# Importação: executemany não devolve os ids gerados, então a auditoria busca pelo e-mail, que é único
+EMAILS_CADASTRADOS = text("SELECT email FROM usuarios WHERE email IN :emails").bindparams(
+    bindparam("emails", expanding=True)
+)
+
+USUARIOS_POR_EMAIL = text("""
+    SELECT id_usuario, nome_usuario, email, numero_telefone, data_inscricao
+    FROM usuarios WHERE email IN :emails
+""").bindparams(bindparam("emails", expanding=True))
+
+LOGIN = _sql("SELECT id_usuario, nome_usuario, senha FROM usuarios WHERE email = :email", email=String)
+
+ATUALIZAR_SENHA = _sql("UPDATE usuarios SET senha = :senha WHERE id_usuario = :id", senha=String, id=Integer)
+
+LISTAR_USUARIOS = "SELECT id_usuario, nome_usuario, email, numero_telefone, data_inscricao, multa_atual FROM usuarios"
+
+USUARIO_POR_ID = _sql("SELECT * FROM usuarios WHERE id_usuario=:id", id=Integer)
+
+USUARIO_AUDITADO = _sql("""
+    SELECT nome_usuario AS nome, email, numero_telefone AS telefone, multa_atual AS multa
+    FROM usuarios WHERE id_usuario=:id
+""", id=Integer)
+
+ATUALIZAR_USUARIO = _sql("""
+    UPDATE usuarios
+    SET nome_usuario=:nome, email=:email, numero_telefone=:telefone, data_inscricao=:data, multa_atual=:multa
+    WHERE id_usuario=:id
+""", nome=String, email=String, telefone=String, id=Integer)
+
+EXCLUIR_USUARIO = _sql("DELETE FROM usuarios WHERE id_usuario=:id", id=Integer)
+
+ESTATISTICAS_USUARIO = _sql("""
+    WITH historico AS (
+        SELECT e.*, l.Titulo,
+               CASE
+                 WHEN e.Data_devolucao_real IS NOT NULL
+                 THEN DATEDIFF(e.Data_devolucao_real, e.Data_devolucao_prevista)
+                 ELSE DATEDIFF(CURDATE(), e.Data_devolucao_prevista)
+               END as dias_atraso,
+               e.multa as multa_devida,
+               CASE
+                 WHEN e.Status_emprestimo = 'atrasado' AND CURDATE() > e.Data_devolucao_prevista
+                 THEN 1 ELSE 0
+               END as em_atraso,
+               ROW_NUMBER() OVER (ORDER BY e.Data_emprestimo DESC, e.ID_emprestimo DESC) as posicao,
+               COUNT(*) OVER () as total_emprestimos,
+               SUM(CASE WHEN e.Status_emprestimo = 'atrasado' THEN 1 ELSE 0 END) OVER () as atrasos
+        FROM Emprestimos e
+        JOIN Livros l ON e.Livro_id = l.ID_livro
+        WHERE e.Usuario_id = :id
+    )
+    SELECT u.multa_atual, u.multa_pendente, h.*
+    FROM usuarios u
+    LEFT JOIN historico h ON h.posicao <= 10 OR h.em_atraso = 1
+    WHERE u.id_usuario = :id
+    ORDER BY h.posicao
+""", id=Integer)
+
+# --- Gêneros, autores e editoras ---
+
+LISTAR_GENEROS = "SELECT * FROM generos"
+
+INSERIR_GENERO = _sql("INSERT INTO generos (nome_genero) VALUES (:nome)", nome=String)
+
+ATUALIZAR_GENERO = _sql("UPDATE generos SET nome_genero=:nome WHERE id_genero=:id", nome=String, id=Integer)
+
+GENERO_POR_ID = _sql("SELECT * FROM generos WHERE id_genero=:id", id=Integer)
+
+EXCLUIR_GENERO = _sql("DELETE FROM generos WHERE id_genero=:id", id=Integer)
+
+LISTAR_AUTORES = "SELECT * FROM Autores"
+
+AUTOR_POR_NOME = _sql("SELECT * FROM Autores WHERE Nome_autor = :nome", nome=String)
+
+AUTOR_POR_ID = _sql("SELECT * FROM Autores WHERE ID_autor = :id", id=Integer)
+
+INSERIR_AUTOR = _sql("""
+    INSERT INTO Autores
+        (Nome_autor, Nacionalidade, Data_nascimento, Biografia)
+    VALUES
+        (:nome, :nacionalidade, :data_nascimento, :biografia)
+""", nome=String, nacionalidade=String, biografia=String)
+
+ATUALIZAR_AUTOR = _sql("""
+    UPDATE Autores
+    SET Nome_autor = :nome,
+        Nacionalidade = :nacionalidade,
+        Data_nascimento = :data_nascimento,
+        Biografia = :biografia
+    WHERE ID_autor = :id
+""", nome=String, nacionalidade=String, biografia=String, id=Integer)
+
+EXCLUIR_AUTOR = _sql("DELETE FROM Autores WHERE ID_autor = :id", id=Integer)
+
+LISTAR_EDITORAS = "SELECT * FROM Editoras"
+
+EDITORA_POR_NOME = _sql("SELECT * FROM Editoras WHERE Nome_editora = :nome", nome=String)
+
+EDITORA_POR_ID = _sql("SELECT * FROM Editoras WHERE ID_editora = :id", id=Integer)
+
+INSERIR_EDITORA = _sql("""
+    INSERT INTO Editoras (Nome_editora, Endereco_editora)
+    VALUES (:nome, :endereco)
+""", nome=String, endereco=String)
+
+ATUALIZAR_EDITORA = _sql("""
+    UPDATE Editoras
+    SET Nome_editora = :nome,
+        Endereco_editora = :endereco
+    WHERE ID_editora = :id
+""", nome=String, endereco=String, id=Integer)
+
+EXCLUIR_EDITORA = _sql("DELETE FROM Editoras WHERE ID_editora = :id", id=Integer)
+
+# Autores, gêneros e editoras inteiros, para os caches de cache.py
+REFERENCIAS = {
+    "autores": _sql(LISTAR_AUTORES),
+    "generos": _sql(LISTAR_GENEROS),
+    "editoras": _sql(LISTAR_EDITORAS),
+}
+
+# --- Livros ---
+
+LISTAR_LIVROS = "SELECT * FROM Livros"
+
+LIVRO_POR_ID = _sql("SELECT * FROM Livros WHERE ID_livro = :id", id=Integer)
+
+LIVRO_AUDITADO = _sql(
+    "SELECT Titulo AS titulo, ISBN AS isbn, Ano_publicacao AS ano_publicacao FROM Livros WHERE ID_livro = :id",
+    id=Integer,
+)
+
+INSERIR_LIVRO = _sql("""
+    INSERT INTO Livros
+    (Titulo, Autor_id, ISBN, Ano_publicacao, Genero_id, Editora_id, Quantidade_disponivel, Resumo)
+    VALUES (:titulo, :autor_id, :isbn, :ano_publicacao, :genero_id, :editora_id, :quantidade, :resumo)
+""", titulo=String, isbn=String, resumo=String)
+
+ATUALIZAR_LIVRO = _sql("""
+    UPDATE Livros
+    SET Titulo = :titulo,
+        Autor_id = :autor_id,
+        ISBN = :isbn,
+        Ano_publicacao = :ano_publicacao,
+        Genero_id = :genero_id,
+        Editora_id = :editora_id,
+        Quantidade_disponivel = :quantidade,
+        Resumo = :resumo
+    WHERE ID_livro = :id
+""", titulo=String, isbn=String, resumo=String, id=Integer)
+
+EXCLUIR_LIVRO = _sql("DELETE FROM Livros WHERE ID_livro = :id", id=Integer)
+
+COLUNAS_BUSCA = "l.ID_livro, l.Titulo, l.Autor_id, l.ISBN, l.Ano_publicacao, l.Genero_id, l.Editora_id, " \
+                "l.Quantidade_disponivel, l.l_Status"
+
+BUSCA_ISBN = _sql(f"""
+    SELECT {COLUNAS_BUSCA} FROM Livros l
+    WHERE l.ISBN IN (:isbn, :termo)
+    ORDER BY l.ID_livro LIMIT :limite OFFSET :deslocamento
+""", isbn=String, termo=String, limite=Integer, deslocamento=Integer)
+
+# Usa idx_livros_titulo; serve para autocompletar e para termos curtos demais para o FULLTEXT
+BUSCA_PREFIXO = _sql(f"""
+    SELECT {COLUNAS_BUSCA} FROM Livros l
+    WHERE l.Titulo LIKE :prefixo
+    ORDER BY l.Titulo, l.ID_livro LIMIT :limite OFFSET :deslocamento
+""", prefixo=String, limite=Integer, deslocamento=Integer)
+
+# Cada lado da UNION usa o próprio índice FULLTEXT; um OR entre as duas
+# tabelas no mesmo WHERE obrigaria a varrer Livros inteira. Os pontos dos dois
+# lados são somados por livro, então título + autor vale mais que só um deles
+BUSCA_TEXTO = _sql(f"""
+    SELECT {COLUNAS_BUSCA}, r.relevancia
+    FROM (
+        SELECT candidatos.ID_livro, SUM(candidatos.pontos) AS relevancia
+        FROM (
+            SELECT ID_livro, MATCH(Titulo, Resumo) AGAINST (:termos IN BOOLEAN MODE) * 2 AS pontos
+            FROM Livros
+            WHERE MATCH(Titulo, Resumo) AGAINST (:termos IN BOOLEAN MODE)
+            UNION ALL
+            SELECT l.ID_livro, MATCH(a.Nome_autor) AGAINST (:termos IN BOOLEAN MODE)
+            FROM Autores a JOIN Livros l ON l.Autor_id = a.ID_autor
+            WHERE MATCH(a.Nome_autor) AGAINST (:termos IN BOOLEAN MODE)
+        ) candidatos
+        GROUP BY candidatos.ID_livro
+        ORDER BY relevancia DESC, candidatos.ID_livro
+        LIMIT :limite OFFSET :deslocamento
+    ) r
+    JOIN Livros l ON l.ID_livro = r.ID_livro
+    ORDER BY r.relevancia DESC, l.ID_livro
+""", termos=String, limite=Integer, deslocamento=Integer)
+
+# --- Empréstimos ---
+
+LISTAR_EMPRESTIMOS = """
+    SELECT e.*, u.nome_usuario, l.Titulo
+    FROM Emprestimos e
+    LEFT JOIN usuarios u ON e.Usuario_id = u.id_usuario
+    LEFT JOIN Livros l ON e.Livro_id = l.ID_livro
+"""
+
+EXPORTAR_EMPRESTIMOS = """
+    SELECT ID_emprestimo, Usuario_id, Livro_id, Data_emprestimo,
+           Data_devolucao_prevista, Data_devolucao_real, Status_emprestimo
+    FROM Emprestimos
+"""
+
+USUARIOS_EMPRESTIMO = _sql("SELECT id_usuario, nome_usuario, multa_atual FROM usuarios")
+
+LIVROS_DISPONIVEIS = _sql("SELECT * FROM Livros WHERE Quantidade_disponivel > 0")
+
+EMPRESTIMO_DETALHADO = _sql("""
+    SELECT e.*, u.nome_usuario, l.Titulo, l.ID_livro
+    FROM Emprestimos e
+    LEFT JOIN usuarios u ON e.Usuario_id = u.id_usuario
+    LEFT JOIN Livros l ON e.Livro_id = l.ID_livro
+    WHERE e.ID_emprestimo = :id
+""", id=Integer)
+
+EXCLUIR_EMPRESTIMO = _sql("DELETE FROM Emprestimos WHERE ID_emprestimo = :id", id=Integer)
+
+ATRASADOS = _sql("""
+    SELECT e.*, u.nome_usuario, l.Titulo,
+           DATEDIFF(CURDATE(), e.Data_devolucao_prevista) as dias_atraso
+    FROM Emprestimos e
+    LEFT JOIN usuarios u ON e.Usuario_id = u.id_usuario
+    LEFT JOIN Livros l ON e.Livro_id = l.ID_livro
+    WHERE e.Status_emprestimo = 'atrasado'
+    ORDER BY e.Data_devolucao_prevista ASC
+""")
+
+# Empréstimo, devolução e exclusão (operacoes_emprestimo.py). As versões
+# *_PARA_ATUALIZAR levam FOR UPDATE, que só o MySQL tem
+
+# Sem exemplar disponível não altera linha nenhuma; no MySQL bloqueia a linha do
+# livro até o fim da transação. l_Status vem antes da quantidade porque o MySQL
+# avalia as atribuições em ordem e o SQLite sempre usa os valores antigos
+RESERVAR_EXEMPLAR = _sql("""
+    UPDATE Livros
+    SET l_Status = CASE WHEN Quantidade_disponivel - 1 <= 2 THEN 'Estoque baixo' ELSE 'Disponível' END,
+        Quantidade_disponivel = Quantidade_disponivel - 1
+    WHERE ID_livro = :id AND Quantidade_disponivel > 0
+""", id=Integer)
+
+REPOR_EXEMPLAR = _sql("""
+    UPDATE Livros
+    SET l_Status = CASE WHEN Quantidade_disponivel + 1 <= 2 THEN 'Estoque baixo' ELSE 'Disponível' END,
+        Quantidade_disponivel = Quantidade_disponivel + 1
+    WHERE ID_livro = :id
+""", id=Integer)
+
+USUARIO_DO_EMPRESTIMO = _sql("SELECT nome_usuario, multa_atual FROM usuarios WHERE id_usuario = :id", id=Integer)
+
+INSERIR_EMPRESTIMO = _sql("""
+    INSERT INTO Emprestimos
+    (Usuario_id, Livro_id, Data_emprestimo, Data_devolucao_prevista, Status_emprestimo)
+    VALUES (:usuario_id, :livro_id, :data_emprestimo, :data_devolucao_prevista, :status)
+""", usuario_id=Integer, livro_id=Integer, status=String)
+
+VENCIMENTO_EMPRESTIMO = _sql(
+    "SELECT Data_devolucao_prevista FROM Emprestimos WHERE ID_emprestimo = :id", id=Integer
+)
+
+MARCAR_EMPRESTIMO_ATRASADO = _sql(
+    "UPDATE Emprestimos SET Status_emprestimo = 'atrasado' WHERE ID_emprestimo = :id", id=Integer
+)
+
+EMPRESTIMO_A_DEVOLVER = _sql("""
+    SELECT Usuario_id, Livro_id, Status_emprestimo, Data_devolucao_prevista, Data_devolucao_real, multa
+    FROM Emprestimos WHERE ID_emprestimo = :id
+""", id=Integer)
+
+EMPRESTIMO_A_DEVOLVER_PARA_ATUALIZAR = _sql(EMPRESTIMO_A_DEVOLVER.text + " FOR UPDATE", id=Integer)
+
+REGISTRAR_DEVOLUCAO = _sql("""
+    UPDATE Emprestimos
+    SET Data_devolucao_real = :data_devolucao_real, Status_emprestimo = 'devolvido', multa = :multa
+    WHERE ID_emprestimo = :id
+""", multa=Numeric(10, 2), id=Integer)
+
+COBRAR_MULTA = _sql("""
+    UPDATE usuarios
+    SET multa_atual = multa_atual + :multa,
+        multa_pendente = CASE WHEN multa_pendente > :acumulada THEN multa_pendente - :acumulada ELSE 0 END
+    WHERE id_usuario = :usuario_id
+""", multa=Numeric(10, 2), acumulada=Numeric(10, 2), usuario_id=Integer)
+
+# Empréstimo em aberto apagado: a multa acumulada dele deixa de ser devida
+DESCONTAR_MULTA_PENDENTE = _sql("""
+    UPDATE usuarios
+    SET multa_pendente = CASE WHEN multa_pendente > :acumulada THEN multa_pendente - :acumulada ELSE 0 END
+    WHERE id_usuario = :usuario_id
+""", acumulada=Numeric(10, 2), usuario_id=Integer)
+
+# --- Varredura diária (agendador.py e multas.py) ---
+
+VENCIDOS = _sql("""
+    SELECT ID_emprestimo, Usuario_id, Livro_id FROM Emprestimos
+    WHERE Status_emprestimo = 'pendente'
+    AND Data_devolucao_prevista >= :desde
+    AND Data_devolucao_prevista < :hoje
+""", desde=Date, hoje=Date)
+
+MARCAR_ATRASADOS = _sql("""
+    UPDATE Emprestimos
+    SET Status_emprestimo = 'atrasado'
+    WHERE Status_emprestimo = 'pendente'
+    AND Data_devolucao_prevista >= :desde
+    AND Data_devolucao_prevista < :hoje
+""", desde=Date, hoje=Date)
+
+# Marca d'água e reserva da varredura diária, compartilhadas por todos os workers
+TAREFA = _sql("SELECT ultima_execucao, em_execucao_desde FROM tarefas_agendadas WHERE nome = :nome", nome=String)
+
+CRIAR_TAREFA = _sql("INSERT INTO tarefas_agendadas (nome) VALUES (:nome)", nome=String)
+
+# Só um processo consegue: a varredura de hoje não terminou e ninguém a está
+# rodando (ou quem estava passou de AGENDADOR_TEMPO_MAXIMO, caso de worker morto)
+RESERVAR_TAREFA = _sql("""
+    UPDATE tarefas_agendadas SET em_execucao_desde = :agora
+    WHERE nome = :nome
+    AND (ultima_execucao IS NULL OR ultima_execucao < :hoje)
+    AND (em_execucao_desde IS NULL OR em_execucao_desde < :expirada)
+""", nome=String, agora=DateTime, hoje=Date, expirada=DateTime)
+
+CONCLUIR_TAREFA = _sql("""
+    UPDATE tarefas_agendadas SET ultima_execucao = :hoje, em_execucao_desde = NULL WHERE nome = :nome
+""", nome=String, hoje=Date)
+
+LIBERAR_TAREFA = _sql("UPDATE tarefas_agendadas SET em_execucao_desde = NULL WHERE nome = :nome", nome=String)
+
+# Valor absoluto (dias de atraso x diária), não incremento: rodar duas vezes no
+# mesmo dia não cobra em dobro, e só as linhas cujo valor mudou são gravadas
+ACUMULAR_MULTAS_EMPRESTIMOS = _sql("""
+    UPDATE Emprestimos
+    SET multa = DATEDIFF(:hoje, Data_devolucao_prevista) * :diaria
+    WHERE Status_emprestimo = 'atrasado'
+    AND Data_devolucao_prevista < :hoje
+    AND multa <> DATEDIFF(:hoje, Data_devolucao_prevista) * :diaria
+""", hoje=Date, diaria=Numeric(10, 2))
+
+ACUMULAR_MULTAS_USUARIOS = _sql("""
+    UPDATE usuarios
+    SET multa_pendente = COALESCE((
+        SELECT SUM(e.multa) FROM Emprestimos e
+        WHERE e.Usuario_id = usuarios.id_usuario AND e.Status_emprestimo = 'atrasado'
+    ), 0)
+    WHERE multa_pendente <> 0
+    OR id_usuario IN (SELECT Usuario_id FROM Emprestimos WHERE Status_emprestimo = 'atrasado')
+""")
+
+# --- Auditoria ---
+
+AUDITORIA_RECENTE = _sql("""
+    SELECT * FROM logs_auditoria
+    WHERE data_hora >= :desde
+    ORDER BY data_hora DESC
+    LIMIT 100
+""", desde=DateTime)
+
+EXPORTAR_AUDITORIA = """
+    SELECT id_log, data_hora, tabela_afetada, operacao, id_registro,
+           dados_antigos, dados_novos, usuario_executor
+    FROM logs_auditoria
+"""
+
+# Arquivamento (arquivamento.py). A troca de partições, as tabelas mensais e as
+# consultas que juntam as tabelas de arquivo dependem do mês e continuam lá
+PARTICOES_AUDITORIA = _sql("""
+    SELECT PARTITION_NAME AS nome,
+           CASE WHEN PARTITION_DESCRIPTION = 'MAXVALUE' THEN NULL
+                ELSE FROM_UNIXTIME(PARTITION_DESCRIPTION) END AS limite
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'logs_auditoria'
+      AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+""")
+
+TABELA_PARTICIONADA = _sql("""
+    SELECT COUNT(*) FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela AND PARTITION_NAME IS NOT NULL
+""", tabela=String)
+
+LOG_MAIS_ANTIGO = _sql(
+    "SELECT data_hora FROM logs_auditoria WHERE data_hora < :corte ORDER BY data_hora LIMIT 1", corte=Date
+)
+
+LOTE_A_ARQUIVAR = _sql("""
+    SELECT id_log FROM logs_auditoria
+    WHERE data_hora >= :inicio AND data_hora < :fim
+    ORDER BY id_log LIMIT :limite
+""", inicio=Date, fim=Date, limite=Integer)
+
+APAGAR_LOGS = text("DELETE FROM logs_auditoria WHERE id_log IN :ids").bindparams(bindparam("ids", expanding=True))
+
+# --- Versões das tabelas (versoes.py) ---
+
+LER_VERSOES = text("""
+    SELECT tabela, SUM(versao) AS versao FROM versoes_tabelas
+    WHERE tabela IN :tabelas GROUP BY tabela
+""").bindparams(bindparam("tabelas", expanding=True))
+
+# Fora do MySQL não há gatilhos nem fatias: a aplicação incrementa a fatia 0
+INCREMENTAR_VERSAO = _sql(
+    "UPDATE versoes_tabelas SET versao = versao + 1 WHERE tabela = :tabela AND fatia = 0", tabela=String
+)
+
+CRIAR_VERSAO = _sql("INSERT INTO versoes_tabelas (tabela, fatia, versao) VALUES (:tabela, 0, 1)", tabela=String)
+
+# --- Painel da página inicial (painel.py) ---
+
+CONTADORES_PAINEL = (
+    "livros", "exemplares_disponiveis", "estoque_baixo",
+    "emprestimos_ativos", "emprestimos_atrasados", "multas_pendentes",
+)
+
+TOTAIS_PAINEL = {
+    "livros": "SELECT COUNT(*) FROM Livros",
+    "exemplares_disponiveis": "SELECT COALESCE(SUM(Quantidade_disponivel), 0) FROM Livros",
+    "estoque_baixo": "SELECT COUNT(*) FROM Livros WHERE l_Status = 'Estoque baixo'",
+    "emprestimos_ativos": "SELECT COUNT(*) FROM Emprestimos WHERE Status_emprestimo IN ('pendente', 'atrasado')",
+    "emprestimos_atrasados": "SELECT COUNT(*) FROM Emprestimos WHERE Status_emprestimo = 'atrasado'",
+    "multas_pendentes": "SELECT COALESCE(SUM(COALESCE(multa_atual, 0) + multa_pendente), 0) FROM usuarios",
+}
+
+CALCULAR_TOTAIS = text("SELECT " + ", ".join(f"({TOTAIS_PAINEL[nome]}) AS {nome}" for nome in CONTADORES_PAINEL))
+
+# Tabelas e contadores lidos no mesmo comando, portanto no mesmo snapshot:
+# os gatilhos mudam os dois na mesma transação, e a diferença é só o desvio
+CALCULAR_DESVIOS = text("SELECT " + ", ".join(
+    f"({TOTAIS_PAINEL[nome]}) - (SELECT COALESCE(SUM(valor), 0) FROM contadores_painel WHERE nome = '{nome}') AS {nome}"
+    for nome in CONTADORES_PAINEL
+))
+
+LER_CONTADORES = text("SELECT nome, SUM(valor) AS valor FROM contadores_painel GROUP BY nome")
+
+CORRIGIR_CONTADOR = _sql(
+    "UPDATE contadores_painel SET valor = valor + :desvio WHERE nome = :nome AND fatia = 0", nome=String
+)
+
+CRIAR_CONTADOR = _sql("INSERT INTO contadores_painel (nome, fatia, valor) VALUES (:nome, 0, :desvio)", nome=String)
+
+# --- Migrações (esquema.py) ---
+
+CRIAR_VERSAO_ESQUEMA = text("""
+    CREATE TABLE IF NOT EXISTS versao_esquema (
+        versao VARCHAR(100) PRIMARY KEY,
+        aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+""")
+
+MIGRACOES_APLICADAS = text("SELECT versao FROM versao_esquema")
+
+REGISTRAR_MIGRACAO = _sql("INSERT INTO versao_esquema (versao) VALUES (:versao)", versao=String)
+
+APAGAR_PASSOS_MIGRACAO = _sql("DELETE FROM versao_esquema WHERE versao LIKE :passos", passos=String)
+
+# Fora do registro ficam só os SQL que mudam de texto a cada chamada: a busca
+# sem FULLTEXT, os filtros da auditoria, a paginação (paginacao._instrucao), o
+# DDL e as consultas por mês/partição do arquivamento e o EXPLAIN de esquema.py
+
+# Nome da constante -> instrução, para o benchmark e para inspecionar o que está registrado
+REGISTRO = {nome: valor for nome, valor in globals().items() if isinstance(valor, TextClause)}
+REGISTRO.update({f"REFERENCIAS[{tabela}]": instrucao for tabela, instrucao in REFERENCIAS.items()})
@@ -0,0 +1,228 @@
+"""Gera uma base sintética com a cara da produção, para testes de carga locais.
+
+Os IDs são atribuídos aqui (a partir do maior existente) para que empréstimos e
+logs possam referenciá-los sem ler de volta o que foi inserido.
+"""
+import json
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+
+from sqlalchemy import text
+
+import fila_auditoria
+import multas
+import painel
+import senhas
+from database import obter_engine
+
+TAMANHO_LOTE = 5000
+SENHA_PADRAO = "senha123"
+EXECUTOR = "gerador_dados@localhost"
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "William"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Rodrigues", "Almeida",
+              "Nascimento", "Carvalho", "Ribeiro", "Gomes", "Martins", "Araújo", "Barbosa"]
+NACIONALIDADES = ["Brasileira"] * 6 + ["Portuguesa", "Argentina", "Inglesa", "Norte-americana", "Francesa"]
+GENEROS = ["Romance", "Ficção científica", "Fantasia", "Suspense", "Terror", "Biografia", "História",
+           "Poesia", "Infantil", "Juvenil", "Autoajuda", "Negócios", "Tecnologia", "Filosofia", "Religião",
+           "Quadrinhos", "Culinária", "Viagem", "Ciências", "Didático"]
+PALAVRAS = ["Sombra", "Vento", "Cidade", "Mar", "Memória", "Jardim", "Segredo", "Noite", "Caminho", "Silêncio",
+            "Fogo", "Rio", "Estrela", "Casa", "Tempo", "Herança", "Ilha", "Espelho", "Labirinto", "Promessa"]
+
+
+def _isbn13(numero):
+    base = f"978{numero % 10 ** 9:09d}"
+    soma = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(base))
+    return base + str((10 - soma % 10) % 10)
+
+
+def _telefone(rng):
+    return f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(0, 9999):04d}"
+
+
+def _pesos_zipf(quantidade, expoente):
+    """Pesos acumulados 1/posição^expoente: poucos itens concentram a maior parte do uso."""
+    return list(accumulate(1 / (posicao ** expoente) for posicao in range(1, quantidade + 1)))
+
+
+def _proximo_id(conn, tabela, coluna):
+    return (conn.execute(text(f"SELECT MAX({coluna}) FROM {tabela}")).scalar() or 0) + 1
+
+
+def _inserir(conn, comando, linhas):
+    for inicio in range(0, len(linhas), TAMANHO_LOTE):
+        conn.execute(text(comando), linhas[inicio:inicio + TAMANHO_LOTE])
+
+
+def _log(tabela, operacao, id_registro, momento, antigos=None, novos=None):
+    return {
+        "tabela": tabela,
+        "operacao": operacao,
+        "id_registro": id_registro,
+        "antigos": None if antigos is None else json.dumps(antigos, default=str, ensure_ascii=False),
+        "novos": None if novos is None else json.dumps(novos, default=str, ensure_ascii=False),
+        "executor": EXECUTOR,
+        "data_hora": momento,
+    }
+
+
+def _momento(rng, dia):
+    return datetime.combine(dia, time(rng.randint(8, 20), rng.randint(0, 59), rng.randint(0, 59)))
+
+
+def popular(livros=10000, usuarios=5000, emprestimos=100000, dias=3 * 365, semente=42):
+    """Insere os dados e devolve a contagem por tabela.
+
+    Popularidade de livros e atividade de usuários seguem uma distribuição de
+    Zipf; os empréstimos se concentram nos meses mais recentes. Empréstimos com
+    mais de 60 dias estão todos devolvidos; os recentes podem estar pendentes
+    ou atrasados, sem passar do estoque de cada livro.
+    """
+    rng = random.Random(semente)
+    hoje = date.today()
+    primeiro_dia = hoje - timedelta(days=dias)
+    autores, editoras = max(1, livros // 8), max(1, livros // 200)
+
+    # Os gatilhos log_* gravariam data_hora = NOW(); com eles fora os logs
+    # sintéticos ficam com a data do evento, como numa base antiga de verdade
+    gatilhos_auditoria = obter_engine().dialect.name == "mysql" and not fila_auditoria.ativa()
+    if gatilhos_auditoria:
+        fila_auditoria.alternar_gatilhos(False)
+    try:
+        with obter_engine().begin() as conn:
+            id_autor = _proximo_id(conn, "Autores", "ID_autor")
+            id_genero = _proximo_id(conn, "generos", "id_genero")
+            id_editora = _proximo_id(conn, "Editoras", "ID_editora")
+            id_livro = _proximo_id(conn, "Livros", "ID_livro")
+            id_usuario = _proximo_id(conn, "usuarios", "id_usuario")
+            id_emprestimo = _proximo_id(conn, "Emprestimos", "ID_emprestimo")
+
+            _inserir(conn, """
+                INSERT INTO Autores (ID_autor, Nome_autor, Nacionalidade, Data_nascimento, Biografia)
+                VALUES (:id, :nome, :nacionalidade, :nascimento, NULL)
+            """, [{
+                "id": id_autor + i,
+                "nome": f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+                "nacionalidade": rng.choice(NACIONALIDADES),
+                "nascimento": date(rng.randint(1900, 1995), rng.randint(1, 12), rng.randint(1, 28)),
+            } for i in range(autores)])
+            _inserir(conn, "INSERT INTO generos (id_genero, nome_genero) VALUES (:id, :nome)",
+                     [{"id": id_genero + i, "nome": nome} for i, nome in enumerate(GENEROS)])
+            _inserir(conn, """
+                INSERT INTO Editoras (ID_editora, Nome_editora, Endereco_editora) VALUES (:id, :nome, NULL)
+            """, [{"id": id_editora + i, "nome": f"Editora {rng.choice(PALAVRAS)} {i + 1}"} for i in range(editoras)])
+
+            estoque = {}
+            linhas = []
+            for i in range(livros):
+                estoque[id_livro + i] = rng.choice([1, 1, 2, 2, 3, 3, 4, 5, 8, 10])
+                linhas.append({
+                    "id": id_livro + i,
+                    "titulo": f"{rng.choice(PALAVRAS)} {rng.choice(['de', 'do', 'da', 'sem'])} {rng.choice(PALAVRAS)} {i + 1}",
+                    "autor_id": id_autor + int(rng.paretovariate(1.2) - 1) % autores,
+                    "isbn": _isbn13(id_livro + i),
+                    "ano": rng.randint(1950, hoje.year),
+                    "genero_id": id_genero + rng.randrange(len(GENEROS)),
+                    "editora_id": id_editora + rng.randrange(editoras),
+                    "quantidade": estoque[id_livro + i],
+                })
+            _inserir(conn, """
+                INSERT INTO Livros (ID_livro, Titulo, Autor_id, ISBN, Ano_publicacao, Genero_id, Editora_id,
+                                    Quantidade_disponivel, Resumo)
+                VALUES (:id, :titulo, :autor_id, :isbn, :ano, :genero_id, :editora_id, :quantidade, NULL)
+            """, linhas)
+
+            senha = senhas.calcular_hash(SENHA_PADRAO)
+            linhas, logs = [], []
+            for i in range(usuarios):
+                inscricao = primeiro_dia + timedelta(days=rng.randrange(dias))
+                usuario = {
+                    "id": id_usuario + i,
+                    "nome": f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}",
+                    "email": f"leitor{id_usuario + i}@exemplo.com",
+                    "telefone": _telefone(rng),
+                    "data": inscricao,
+                    "multa": 0.0,
+                    "senha": senha,
+                }
+                linhas.append(usuario)
+                logs.append(_log("usuarios", "INSERT", usuario["id"], _momento(rng, inscricao), novos={
+                    "nome": usuario["nome"], "email": usuario["email"],
+                    "telefone": usuario["telefone"], "data_inscricao": inscricao,
+                }))
+            _inserir(conn, """
+                INSERT INTO usuarios (id_usuario, nome_usuario, email, numero_telefone, data_inscricao, multa_atual, senha)
+                VALUES (:id, :nome, :email, :telefone, :data, :multa, :senha)
+            """, linhas)
+            _inserir(conn, fila_auditoria.INSERIR_LOG.text, logs)
+
+        pesos_livros = _pesos_zipf(livros, 1.0)
+        pesos_usuarios = _pesos_zipf(usuarios, 0.8)
+        ids_livros = list(range(id_livro, id_livro + livros))
+        ids_usuarios = list(range(id_usuario, id_usuario + usuarios))
+        rng.shuffle(ids_livros)
+        rng.shuffle(ids_usuarios)
+        em_aberto = dict.fromkeys(ids_livros, 0)
+
+        for inicio in range(0, emprestimos, TAMANHO_LOTE):
+            quantidade = min(TAMANHO_LOTE, emprestimos - inicio)
+            livros_lote = rng.choices(ids_livros, cum_weights=pesos_livros, k=quantidade)
+            usuarios_lote = rng.choices(ids_usuarios, cum_weights=pesos_usuarios, k=quantidade)
+            linhas, logs = [], []
+            for posicao, (livro, usuario) in enumerate(zip(livros_lote, usuarios_lote)):
+                emprestado = primeiro_dia + timedelta(days=int(rng.triangular(0, dias, dias)))
+                prevista = emprestado + timedelta(days=20)
+                devolvido = emprestado + timedelta(days=max(1, int(rng.gauss(15, 8))))
+                if devolvido > hoje or ((hoje - emprestado).days <= 60 and rng.random() < 0.3):
+                    devolvido = None
+                if devolvido is None and em_aberto[livro] >= estoque[livro]:
+                    devolvido = min(hoje, emprestado + timedelta(days=rng.randint(1, 20)))
+                if devolvido is None:
+                    em_aberto[livro] += 1
+                    status = "atrasado" if prevista < hoje else "pendente"
+                else:
+                    status = "devolvido"
+
+                emprestimo = id_emprestimo + inicio + posicao
+                linhas.append({
+                    "id": emprestimo, "usuario_id": usuario, "livro_id": livro, "data": emprestado,
+                    "prevista": prevista, "real": devolvido, "status": status,
+                })
+                logs.append(_log("Emprestimos", "INSERT", emprestimo, _momento(rng, emprestado), novos={
+                    "usuario_id": usuario, "livro_id": livro, "data_emprestimo": emprestado,
+                    "data_prevista": prevista, "status": "pendente",
+                }))
+                if devolvido:
+                    logs.append(_log("Emprestimos", "UPDATE", emprestimo, _momento(rng, devolvido),
+                                     {"status": "pendente", "data_devolucao_real": None},
+                                     {"usuario_id": usuario, "livro_id": livro,
+                                      "status": "devolvido", "data_devolucao_real": devolvido}))
+            with obter_engine().begin() as conn:
+                _inserir(conn, """
+                    INSERT INTO Emprestimos (ID_emprestimo, Usuario_id, Livro_id, Data_emprestimo,
+                                             Data_devolucao_prevista, Data_devolucao_real, Status_emprestimo)
+                    VALUES (:id, :usuario_id, :livro_id, :data, :prevista, :real, :status)
+                """, linhas)
+                _inserir(conn, fila_auditoria.INSERIR_LOG.text, logs)
+
+        # Os empréstimos entram direto, sem passar por operacoes_emprestimo; o
+        # estoque de cada livro fica em estoque - empréstimos em aberto
+        with obter_engine().begin() as conn:
+            _inserir(conn, """
+                UPDATE Livros SET Quantidade_disponivel = :quantidade,
+                    l_Status = CASE WHEN :quantidade <= 2 THEN 'Estoque baixo' ELSE 'Disponível' END
+                WHERE ID_livro = :id
+            """, [{"id": livro, "quantidade": estoque[livro] - abertos} for livro, abertos in em_aberto.items()])
+        # Multas dos atrasados, como o agendador faria na primeira execução do dia
+        multas.acumular()
+        painel.reconciliar()
+    finally:
+        if gatilhos_auditoria:
+            fila_auditoria.alternar_gatilhos(True)
+
+    return {
+        "Autores": autores, "generos": len(GENEROS), "Editoras": editoras, "Livros": livros,
+        "usuarios": usuarios, "Emprestimos": emprestimos,
+    }
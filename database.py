@@ -1,83 +1,273 @@
-from sqlalchemy import create_engine, text
-
-user = "root"
-password = ""
-host = "localhost"
-port = 3306
-database = "db_atividade17"
-
-engine = create_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}")
-
-with engine.connect() as conn:
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS Autores (
-            ID_autor INT AUTO_INCREMENT PRIMARY KEY,
-            Nome_autor VARCHAR(255) NOT NULL,
-            Nacionalidade VARCHAR(255),
-            Data_nascimento DATE,
-            Biografia TEXT
-        )
-    """))
-
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS generos (
-            id_genero INT AUTO_INCREMENT PRIMARY KEY,
-            nome_genero VARCHAR(255) NOT NULL
-        )
-    """))
-
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS Editoras (
-            ID_editora INT AUTO_INCREMENT PRIMARY KEY,
-            Nome_editora VARCHAR(255) NOT NULL,
-            Endereco_editora TEXT
-        )
-    """))
-
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id_usuario INT AUTO_INCREMENT PRIMARY KEY,
-            nome_usuario VARCHAR(255) NOT NULL,
-            email VARCHAR(255) NOT NULL,
-            numero_telefone VARCHAR(20),
-            data_inscricao DATE,
-            multa_atual DECIMAL(10,2) DEFAULT 0.00,
-            senha VARCHAR(255) NOT NULL
-        )
-    """))
-
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS Livros (
-            ID_livro INT AUTO_INCREMENT PRIMARY KEY,
-            Titulo VARCHAR(255) NOT NULL,
-            Autor_id INT,
-            ISBN VARCHAR(20),
-            Ano_publicacao INT,
-            Genero_id INT,
-            Editora_id INT,
-            Quantidade_disponivel INT DEFAULT 0,
-            Resumo TEXT,
-            l_Status VARCHAR(20) NOT NULL DEFAULT 'Disponível',
-            FOREIGN KEY (Autor_id) REFERENCES Autores(ID_autor),
-            FOREIGN KEY (Genero_id) REFERENCES generos(id_genero),
-            FOREIGN KEY (Editora_id) REFERENCES Editoras(ID_editora)
-        )
-    """))
-
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS Emprestimos (
-            ID_emprestimo INT AUTO_INCREMENT PRIMARY KEY,
-            Usuario_id INT,
-            Livro_id INT,
-            Data_emprestimo DATE,
-            Data_devolucao_prevista DATE,
-            Data_devolucao_real DATE,
-            Status_emprestimo ENUM('pendente', 'devolvido', 'atrasado'),
-            FOREIGN KEY (Usuario_id) REFERENCES Usuarios(id_usuario),
-            FOREIGN KEY (Livro_id) REFERENCES Livros(ID_livro)
-        )
-    """))
-
-    print("Tabelas criadas ou já existiam.")
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
 
+from sqlalchemy import (
+    create_engine, event, MetaData, Table, Column, Computed, Integer, BigInteger, String, Text, Date,
+    Numeric, Enum, JSON, TIMESTAMP, ForeignKey, text,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
 
+log = logging.getLogger(__name__)
+
+user = os.environ.get("DB_USER", "root")
+password = os.environ.get("DB_PASSWORD", "")
+host = os.environ.get("DB_HOST", "localhost")
+port = int(os.environ.get("DB_PORT", 3306))
+database = os.environ.get("DB_NAME", "db_atividade17")
+
+
+def _env_bool(nome, padrao):
+    return os.environ.get(nome, str(padrao)).lower() in ("1", "true", "sim", "yes")
+
+
+def url_padrao():
+    return os.environ.get("DATABASE_URL") or f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
+
+
+def _funcoes_mysql_sqlite(dbapi_conn, _registro):
+    # Equivalentes das funções MySQL usadas nas consultas, para rodar sobre SQLite
+    dias = lambda valor: date.fromisoformat(str(valor)[:10])
+    dbapi_conn.create_function("CURDATE", 0, lambda: date.today().isoformat())
+    dbapi_conn.create_function("NOW", 0, lambda: datetime.now().isoformat(" ", "seconds"))
+    dbapi_conn.create_function(
+        "DATEDIFF", 2,
+        lambda a, b: None if a is None or b is None else (dias(a) - dias(b)).days,
+    )
+
+
+def _configuracao(url, opcoes):
+    # Cache de compilação do SQLAlchemy (instrução -> SQL do driver), por engine;
+    # precisa caber o registro de consultas.py mais as variações da paginação
+    cache_instrucoes = int(os.environ.get("DB_CACHE_INSTRUCOES", 500))
+    if url.startswith("sqlite"):
+        # Devolve DATE/TIMESTAMP como date/datetime, como o PyMySQL faz. O
+        # sqlite3 ainda guarda as instruções preparadas por conexão
+        # (cached_statements); o PyMySQL não prepara no servidor, então no
+        # MySQL esta opção só dimensiona o cache de compilação
+        config = {
+            "query_cache_size": cache_instrucoes,
+            "connect_args": {
+                "detect_types": sqlite3.PARSE_DECLTYPES,
+                "check_same_thread": False,
+                "cached_statements": cache_instrucoes,
+            },
+        }
+        if url.split("://", 1)[1] in ("", "/:memory:"):
+            config["poolclass"] = StaticPool
+        config.update(opcoes)
+        return config
+
+    config = {
+        "query_cache_size": cache_instrucoes,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "connect_args": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 10)),
+        },
+    }
+    if os.environ.get("DB_READ_TIMEOUT"):
+        config["connect_args"]["read_timeout"] = int(os.environ["DB_READ_TIMEOUT"])
+    if os.environ.get("DB_ISOLATION_LEVEL"):
+        config["isolation_level"] = os.environ["DB_ISOLATION_LEVEL"]
+    config.update(opcoes)
+    return config
+
+
+def criar_engine(url=None, **opcoes):
+    """Cria um engine a partir de `url` (ou DATABASE_URL / DB_*) com o pool configurado pelo ambiente."""
+    url = url or url_padrao()
+    engine = create_engine(url, **_configuracao(url, opcoes))
+    if url.startswith("sqlite"):
+        event.listen(engine, "connect", _funcoes_mysql_sqlite)
+    return engine
+
+
+def criar_engine_async(url=None, **opcoes):
+    """Versão assíncrona de criar_engine() para o asgi.py, com o mesmo pool.
+
+    Troca o driver da URL: PyMySQL por aiomysql (ou DB_DRIVER_ASYNC, como
+    asyncmy) e o sqlite3 por aiosqlite.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(url or url_padrao())
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    else:
+        url = url.set(drivername=f"{url.get_backend_name()}+{os.environ.get('DB_DRIVER_ASYNC', 'aiomysql')}")
+    url = url.render_as_string(hide_password=False)
+
+    config = _configuracao(url, opcoes)
+    # aiomysql e asyncmy não aceitam read_timeout; o limite fica por conta do servidor
+    config["connect_args"].pop("read_timeout", None)
+    engine = create_async_engine(url, **config)
+    if url.startswith("sqlite"):
+        event.listen(engine.sync_engine, "connect", _funcoes_mysql_sqlite)
+    return engine
+
+
+_engine = None
+_trava = threading.Lock()
+
+
+def obter_engine():
+    """Engine do primário, criado no primeiro uso.
+
+    Importar o módulo não abre conexão nem carrega o driver: um worker que sobe
+    com o banco fora do ar atende /saude com 503 e se conecta quando o banco
+    voltar, em vez de morrer na importação.
+    """
+    global _engine
+    if _engine is None:
+        with _trava:
+            if _engine is None:
+                _engine = criar_engine()
+    return _engine
+
+
+def _depois_do_fork():
+    # Conexões abertas antes do fork (gunicorn --preload, pré-aquecimento no
+    # processo mestre) pertencem ao pai; o filho começa com o pool vazio
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_depois_do_fork)
+
+
+def preaquecer(engine=None, quantidade=None):
+    """Abre `quantidade` conexões (DB_POOL_PREAQUECER) e as devolve ao pool; devolve quantas abriu.
+
+    Falha de conexão só é registrada: o worker sobe do mesmo jeito e as
+    conexões que faltarem são abertas sob demanda.
+    """
+    quantidade = int(os.environ.get("DB_POOL_PREAQUECER", 0)) if quantidade is None else quantidade
+    if not quantidade:
+        return 0
+    engine = engine or obter_engine()
+    conexoes = []
+    try:
+        for _ in range(quantidade):
+            conn = engine.connect()
+            conexoes.append(conn)
+            conn.execute(text("SELECT 1"))
+    except Exception:
+        log.warning("Pré-aquecimento do pool parou em %d de %d conexões", len(conexoes), quantidade, exc_info=True)
+    finally:
+        for conn in conexoes:
+            conn.close()
+    return len(conexoes)
+
+metadata = MetaData()
+
+Table(
+    "Autores", metadata,
+    Column("ID_autor", Integer, primary_key=True, autoincrement=True),
+    Column("Nome_autor", String(255), nullable=False),
+    Column("Nacionalidade", String(255)),
+    Column("Data_nascimento", Date),
+    Column("Biografia", Text),
+)
+
+Table(
+    "generos", metadata,
+    Column("id_genero", Integer, primary_key=True, autoincrement=True),
+    Column("nome_genero", String(255), nullable=False),
+)
+
+Table(
+    "Editoras", metadata,
+    Column("ID_editora", Integer, primary_key=True, autoincrement=True),
+    Column("Nome_editora", String(255), nullable=False),
+    Column("Endereco_editora", Text),
+)
+
+Table(
+    "usuarios", metadata,
+    Column("id_usuario", Integer, primary_key=True, autoincrement=True),
+    Column("nome_usuario", String(255), nullable=False),
+    Column("email", String(255), nullable=False),
+    Column("numero_telefone", String(20)),
+    Column("data_inscricao", Date),
+    Column("multa_atual", Numeric(10, 2), server_default=text("0.00")),
+    Column("multa_pendente", Numeric(10, 2), nullable=False, server_default=text("0.00")),
+    Column("senha", String(255), nullable=False),
+)
+
+Table(
+    "Livros", metadata,
+    Column("ID_livro", Integer, primary_key=True, autoincrement=True),
+    Column("Titulo", String(255), nullable=False),
+    Column("Autor_id", Integer, ForeignKey("Autores.ID_autor")),
+    Column("ISBN", String(20)),
+    Column("Ano_publicacao", Integer),
+    Column("Genero_id", Integer, ForeignKey("generos.id_genero")),
+    Column("Editora_id", Integer, ForeignKey("Editoras.ID_editora")),
+    Column("Quantidade_disponivel", Integer, server_default=text("0")),
+    Column("Resumo", Text),
+    Column("l_Status", String(20), nullable=False, server_default="Disponível"),
+)
+
+Table(
+    "Emprestimos", metadata,
+    Column("ID_emprestimo", Integer, primary_key=True, autoincrement=True),
+    Column("Usuario_id", Integer, ForeignKey("usuarios.id_usuario")),
+    Column("Livro_id", Integer, ForeignKey("Livros.ID_livro")),
+    Column("Data_emprestimo", Date),
+    Column("Data_devolucao_prevista", Date),
+    Column("Data_devolucao_real", Date),
+    Column("Status_emprestimo", Enum("pendente", "devolvido", "atrasado", name="status_emprestimo")),
+    Column("multa", Numeric(10, 2), nullable=False, server_default=text("0.00")),
+)
+
+Table(
+    "logs_auditoria", metadata,
+    Column("id_log", Integer, primary_key=True, autoincrement=True),
+    Column("tabela_afetada", String(50)),
+    Column("operacao", String(20)),
+    Column("id_registro", Integer),
+    Column("dados_antigos", JSON),
+    Column("dados_novos", JSON),
+    Column("usuario_executor", String(100)),
+    Column("data_hora", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")),
+    # Extraídas do JSON para o histórico por usuário e por livro (no MySQL, migração 007)
+    Column("usuario_id", Integer, Computed(
+        "COALESCE(json_extract(dados_novos, '$.usuario_id'), json_extract(dados_antigos, '$.usuario_id'))",
+        persisted=True)),
+    Column("livro_id", Integer, Computed(
+        "COALESCE(json_extract(dados_novos, '$.livro_id'), json_extract(dados_antigos, '$.livro_id'))",
+        persisted=True)),
+)
+
+Table(
+    "versoes_tabelas", metadata,
+    Column("tabela", String(50), primary_key=True),
+    Column("fatia", Integer, primary_key=True, autoincrement=False),
+    Column("versao", BigInteger, nullable=False, server_default=text("0")),
+)
+
+Table(
+    "contadores_painel", metadata,
+    Column("nome", String(50), primary_key=True),
+    Column("fatia", Integer, primary_key=True, autoincrement=False),
+    Column("valor", Numeric(14, 2), nullable=False, server_default=text("0")),
+)
+
+Table(
+    "tarefas_agendadas", metadata,
+    Column("nome", String(50), primary_key=True),
+    Column("ultima_execucao", Date),
+    Column("em_execucao_desde", TIMESTAMP, nullable=True),
+)
+
+
+def criar_tabelas(bind=None):
+    """Cria as tabelas que ainda não existem. Roda no deploy (`flask criar-tabelas`), não no import."""
+    metadata.create_all(bind or obter_engine())
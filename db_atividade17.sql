@@ -176,32 +176,36 @@ CREATE TRIGGER log_update_usuarios
 AFTER UPDATE ON Usuarios
 FOR EACH ROW
 BEGIN
-    INSERT INTO logs_auditoria (
-        tabela_afetada,
-        operacao,
-        id_registro,
-        dados_antigos,
-        dados_novos,
-        usuario_executor
-    )
-    VALUES (
-        'Usuarios',
-        'UPDATE',
-        OLD.id_usuario,
-        JSON_OBJECT(
-            'nome', OLD.nome_usuario,
-            'email', OLD.email,
-            'telefone', OLD.numero_telefone,
-            'multa', OLD.multa_atual
-        ),
-        JSON_OBJECT(
-            'nome', NEW.nome_usuario,
-            'email', NEW.email,
-            'telefone', NEW.numero_telefone,
-            'multa', NEW.multa_atual
-        ),
-        USER()
-    );
+    -- O acúmulo diário de multas (multas.py) só mexe em multa_pendente
+    IF NOT (OLD.nome_usuario <=> NEW.nome_usuario AND OLD.email <=> NEW.email
+            AND OLD.numero_telefone <=> NEW.numero_telefone AND OLD.multa_atual <=> NEW.multa_atual) THEN
+        INSERT INTO logs_auditoria (
+            tabela_afetada,
+            operacao,
+            id_registro,
+            dados_antigos,
+            dados_novos,
+            usuario_executor
+        )
+        VALUES (
+            'Usuarios',
+            'UPDATE',
+            OLD.id_usuario,
+            JSON_OBJECT(
+                'nome', OLD.nome_usuario,
+                'email', OLD.email,
+                'telefone', OLD.numero_telefone,
+                'multa', OLD.multa_atual
+            ),
+            JSON_OBJECT(
+                'nome', NEW.nome_usuario,
+                'email', NEW.email,
+                'telefone', NEW.numero_telefone,
+                'multa', NEW.multa_atual
+            ),
+            USER()
+        );
+    END IF;
 END$$
 DELIMITER ;
 
@@ -242,28 +246,34 @@ CREATE TRIGGER log_update_emprestimos
 AFTER UPDATE ON Emprestimos
 FOR EACH ROW
 BEGIN
-    INSERT INTO logs_auditoria (
-        tabela_afetada,
-        operacao,
-        id_registro,
-        dados_antigos,
-        dados_novos,
-        usuario_executor
-    )
-    VALUES (
-        'Emprestimos',
-        'UPDATE',
-        OLD.ID_emprestimo,
-        JSON_OBJECT(
-            'status', OLD.Status_emprestimo,
-            'data_devolucao_real', OLD.Data_devolucao_real
-        ),
-        JSON_OBJECT(
-            'status', NEW.Status_emprestimo,
-            'data_devolucao_real', NEW.Data_devolucao_real
-        ),
-        USER()
-    );
+    -- O acúmulo diário de multas (multas.py) só mexe na coluna multa
+    IF NOT (OLD.Status_emprestimo <=> NEW.Status_emprestimo
+            AND OLD.Data_devolucao_real <=> NEW.Data_devolucao_real) THEN
+        INSERT INTO logs_auditoria (
+            tabela_afetada,
+            operacao,
+            id_registro,
+            dados_antigos,
+            dados_novos,
+            usuario_executor
+        )
+        VALUES (
+            'Emprestimos',
+            'UPDATE',
+            OLD.ID_emprestimo,
+            JSON_OBJECT(
+                'status', OLD.Status_emprestimo,
+                'data_devolucao_real', OLD.Data_devolucao_real
+            ),
+            JSON_OBJECT(
+                'usuario_id', NEW.Usuario_id,
+                'livro_id', NEW.Livro_id,
+                'status', NEW.Status_emprestimo,
+                'data_devolucao_real', NEW.Data_devolucao_real
+            ),
+            USER()
+        );
+    END IF;
 END$$
 DELIMITER ;
 
@@ -297,133 +307,11 @@ BEGIN
 END$$
 DELIMITER ;
 
--- 3. GATILHOS ATUALIZAÇÃO AUTOMÁTICA PÓS-EVENTO (INSERT/UPDATE/DELETE)
-
--- 3.1. Diminuir quantidade de livros após empréstimo
-DELIMITER $$
-CREATE TRIGGER diminuir_livro_emprestimo
-AFTER INSERT ON Emprestimos
-FOR EACH ROW
-BEGIN
-	UPDATE Livros
-    SET Quantidade_disponivel = Quantidade_disponivel - 1
-    WHERE ID_livro = NEW.Livro_id;
-END$$
-DELIMITER ;
-
--- 3.2. Aumentar quantidade do livro na devolução
-DELIMITER $$
-CREATE TRIGGER aumentar_livro_devolucao
-AFTER UPDATE ON Emprestimos
-FOR EACH ROW
-BEGIN	
-	IF OLD.Status_emprestimo <> 'devolvido'
-		AND NEW.Status_emprestimo = 'devolvido' THEN
-        
-        UPDATE Livros
-        SET Quantidade_disponivel = Quantidade_disponivel + 1
-		WHERE ID_livro = NEW.Livro_id;
-	END IF;
-END$$
-DELIMITER ;
-
--- 3.3. Devolver livro ao excluir empréstimo pendente
-DELIMITER $$
-CREATE TRIGGER deletar_emprestimo_pendente
-AFTER DELETE ON Emprestimos
-FOR EACH ROW
-BEGIN
-    IF OLD.Status_emprestimo <> 'devolvido' THEN
-        UPDATE Livros
-        SET Quantidade_disponivel = Quantidade_disponivel + 1
-        WHERE ID_livro = OLD.Livro_id;
-    END IF;
-END$$
-DELIMITER ;
-
--- 3.4 Quando atingir estoque mínimo após empréstimo, informar estoque baixo
-DELIMITER $$
-CREATE TRIGGER atualizar_status_apos_emprestimo
-AFTER INSERT ON Emprestimos
-FOR EACH ROW
-BEGIN
-    DECLARE qtd_atual INT;
-
-    -- Pega a quantidade atual do livro
-    SELECT Quantidade_disponivel INTO qtd_atual
-    FROM Livros
-    WHERE ID_livro = NEW.Livro_id;
-
-    -- Atualiza a coluna status conforme a quantidade
-    IF qtd_atual <= 2 THEN
-        UPDATE Livros
-        SET l_Status = 'Estoque baixo'
-        WHERE ID_livro = NEW.Livro_id;
-    ELSE
-        UPDATE Livros
-        SET l_Status = 'Disponível'
-        WHERE ID_livro = NEW.Livro_id;
-    END IF;
-END$$
-DELIMITER ;
-
--- 3.5 Atualizar status do estoque ao devolver livro
-DELIMITER $$
-CREATE TRIGGER atualizar_status_apos_update_emprestimo
-AFTER UPDATE ON Emprestimos
-FOR EACH ROW
-BEGIN
-    DECLARE qtd_atual INT;
-
-    -- Só executa se o empréstimo foi devolvido
-    IF OLD.Status_emprestimo <> 'devolvido'
-       AND NEW.Status_emprestimo = 'devolvido' THEN
-
-        -- Pega a quantidade atual do livro
-        SELECT Quantidade_disponivel INTO qtd_atual
-        FROM Livros
-        WHERE ID_livro = NEW.Livro_id;
-
-        -- Atualiza o status conforme a nova quantidade
-        IF qtd_atual <= 2 THEN
-            UPDATE Livros
-            SET l_Status = 'Estoque baixo'
-            WHERE ID_livro = NEW.Livro_id;
-        ELSE
-            UPDATE Livros
-            SET l_Status = 'Disponível'
-            WHERE ID_livro = NEW.Livro_id;
-        END IF;
-
-    END IF;
-END$$
-DELIMITER ;
-
--- 3.6 Atualizar status do estoque ao excluir livro
-DELIMITER $$
-CREATE TRIGGER atualizar_status_apos_devolucao
-AFTER DELETE ON Emprestimos
-FOR EACH ROW
-BEGIN
-    DECLARE qtd_atual INT;
-
-    -- Pega a quantidade atual do livro
-    SELECT Quantidade_disponivel INTO qtd_atual
-    FROM Livros
-    WHERE ID_livro = OLD.Livro_id;
-
-    -- Atualiza a coluna status conforme a quantidade
-    IF qtd_atual <= 2 THEN
-        UPDATE Livros
-        SET l_Status = 'Estoque baixo'
-        WHERE ID_livro = OLD.Livro_id;
-    ELSE
-        UPDATE Livros
-        SET l_Status = 'Disponível'
-        WHERE ID_livro = OLD.Livro_id;
-    END IF;
-END$$
-DELIMITER ;
+-- 3. ESTOQUE DE LIVROS
+-- Quantidade_disponivel e l_Status são mantidos pela aplicação
+-- (operacoes_emprestimo.py): o empréstimo desconta o exemplar com um UPDATE
+-- condicionado a Quantidade_disponivel > 0, e a devolução e a exclusão de um
+-- empréstimo em aberto o repõem. Não há gatilhos de estoque em Emprestimos.
 
 -- 4. Geração Automática de Valores
 
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+
+import consultas
+from database import obter_engine
+
+PASTA_MIGRACOES = Path(__file__).parent / "migracoes"
+
+
+def separar_comandos(sql):
+    """Separa um arquivo .sql em comandos, respeitando `DELIMITER` como no db_atividade17.sql."""
+    delimitador = ";"
+    atual = []
+    for linha in sql.splitlines():
+        if linha.strip().upper().startswith("DELIMITER"):
+            delimitador = linha.split()[1]
+            continue
+        atual.append(linha)
+        if linha.rstrip().endswith(delimitador):
+            comando = "\n".join(atual).rstrip()[:-len(delimitador)]
+            atual = []
+            if any(l.strip() and not l.strip().startswith("--") for l in comando.splitlines()):
+                yield comando.strip()
+
+
+def migrar():
+    """Aplica, em ordem, os arquivos de migracoes/ que ainda não constam em versao_esquema.
+
+    O MySQL faz commit implícito a cada DDL, então uma migração não é atômica:
+    cada comando concluído fica registrado como `<arquivo>#<n>` e, se um deles
+    falhar, a próxima execução recomeça por ele. Com o arquivo inteiro aplicado
+    esses registros dão lugar ao nome do arquivo. Por isso uma migração já
+    aplicada, mesmo em parte, não deve ser editada; corrija com um arquivo novo.
+    """
+    if obter_engine().dialect.name != "mysql":
+        print("As migrações são para MySQL; no SQLite use `flask criar-tabelas`.")
+        return []
+
+    with obter_engine().begin() as conn:
+        conn.execute(consultas.CRIAR_VERSAO_ESQUEMA)
+        aplicadas = set(conn.execute(consultas.MIGRACOES_APLICADAS).scalars())
+
+    novas = []
+    for arquivo in sorted(PASTA_MIGRACOES.glob("*.sql")):
+        if arquivo.stem in aplicadas:
+            continue
+        for numero, comando in enumerate(separar_comandos(arquivo.read_text(encoding="utf-8")), start=1):
+            passo = f"{arquivo.stem}#{numero}"
+            if passo in aplicadas:
+                continue
+            with obter_engine().begin() as conn:
+                conn.exec_driver_sql(comando)
+                conn.execute(consultas.REGISTRAR_MIGRACAO, {"versao": passo})
+        with obter_engine().begin() as conn:
+            conn.execute(consultas.REGISTRAR_MIGRACAO, {"versao": arquivo.stem})
+            conn.execute(consultas.APAGAR_PASSOS_MIGRACAO, {"passos": f"{arquivo.stem}#%"})
+        print(f"Migração aplicada: {arquivo.name}")
+        novas.append(arquivo.stem)
+    return novas
+
+
+# (nome, tabela ou alias que deve usar índice, consulta, parâmetros)
+CONSULTAS_QUENTES = [
+    ("login", "usuarios",
+     consultas.LOGIN.text, {"email": "x@x"}),
+    ("varredura de atrasados", "Emprestimos",
+     consultas.MARCAR_ATRASADOS.text,
+     {"desde": date.today() - timedelta(days=1), "hoje": date.today()}),
+    ("acúmulo de multas", "Emprestimos",
+     consultas.ACUMULAR_MULTAS_EMPRESTIMOS.text, {"hoje": date.today(), "diaria": 2}),
+    ("listagem de atrasados", "e",
+     consultas.ATRASADOS.text, {}),
+    ("estatísticas do usuário", "e",
+     consultas.ESTATISTICAS_USUARIO.text, {"id": 1}),
+    ("busca por ISBN", "l",
+     consultas.BUSCA_ISBN.text,
+     {"isbn": "9788535902778", "termo": "978-85-359-0277-8", "limite": 51, "deslocamento": 0}),
+    ("busca por início do título", "l",
+     consultas.BUSCA_PREFIXO.text, {"prefixo": "Dom%", "limite": 51, "deslocamento": 0}),
+    ("listagem de auditoria", "logs_auditoria",
+     consultas.AUDITORIA_RECENTE.text, {"desde": date.today() - timedelta(days=7)}),
+    ("histórico de um registro", "logs_auditoria",
+     """SELECT id_log FROM logs_auditoria WHERE tabela_afetada IN ('Emprestimos') AND id_registro = :id
+        ORDER BY data_hora DESC, id_log DESC LIMIT 51""", {"id": 1}),
+    ("histórico de um usuário nos empréstimos", "logs_auditoria",
+     """SELECT id_log FROM logs_auditoria WHERE usuario_id = :id
+        ORDER BY data_hora DESC, id_log DESC LIMIT 51""", {"id": 1}),
+    ("relatório de auditoria", "logs_auditoria",
+     """SELECT * FROM logs_auditoria
+        WHERE data_hora >= :inicio AND data_hora < :fim AND operacao = :operacao""",
+     {"inicio": date.today() - timedelta(days=7), "fim": date.today(), "operacao": "UPDATE"}),
+]
+
+
+def verificar_planos():
+    """Roda EXPLAIN nas consultas quentes e devolve as que fazem varredura completa (type = ALL).
+
+    Em tabelas quase vazias o otimizador pode preferir a varredura mesmo com
+    índice, então rode contra uma base populada.
+    """
+    regressoes = []
+    with obter_engine().connect() as conn:
+        for nome, tabela, consulta, params in CONSULTAS_QUENTES:
+            plano = conn.execute(text("EXPLAIN " + consulta), params).mappings().fetchall()
+            linhas = [linha for linha in plano if linha["table"] == tabela]
+            if any(linha["type"] == "ALL" for linha in linhas):
+                regressoes.append(nome)
+            for linha in linhas:
+                print(f"{nome}: type={linha['type']} key={linha['key']} rows={linha['rows']}")
+    return regressoes
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from flask import Response, abort, request
+from sqlalchemy import text
+from replicas import engine_leitura
+
+TAMANHO_LOTE = 1000
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+
+def _ler_data(nome):
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        abort(400, f"Parâmetro '{nome}' deve estar no formato AAAA-MM-DD.")
+
+
+def _filtro_periodo(coluna_data):
+    # `fim` é inclusivo; compara com o dia seguinte para funcionar também com TIMESTAMP
+    inicio, fim = _ler_data("inicio"), _ler_data("fim")
+    condicoes, params = [], {}
+    if inicio:
+        condicoes.append(f"{coluna_data} >= :inicio")
+        params["inicio"] = inicio
+    if fim:
+        condicoes.append(f"{coluna_data} < :fim")
+        params["fim"] = fim + timedelta(days=1)
+    return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), params
+
+
+def _valor_json(valor):
+    return valor.isoformat() if hasattr(valor, "isoformat") else str(valor)
+
+
+def _gerar(engine, consulta, params, formato, colunas_json):
+    # O cursor no servidor (stream_results) traz TAMANHO_LOTE linhas por vez,
+    # então a memória não depende do tamanho da tabela
+    with engine.connect() as conn:
+        resultado = conn.execution_options(stream_results=True, yield_per=TAMANHO_LOTE).execute(
+            text(consulta), params
+        )
+        colunas = list(resultado.keys())
+
+        if formato == "csv":
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            escritor.writerow(colunas)
+            yield buffer.getvalue()
+            for lote in resultado.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                escritor.writerows(lote)
+                yield buffer.getvalue()
+        else:
+            for lote in resultado.partitions():
+                linhas = []
+                for linha in lote:
+                    registro = dict(zip(colunas, linha))
+                    for coluna in colunas_json:
+                        if isinstance(registro.get(coluna), str):
+                            registro[coluna] = json.loads(registro[coluna])
+                    linhas.append(json.dumps(registro, default=_valor_json, ensure_ascii=False) + "\n")
+                yield "".join(linhas)
+
+
+def exportar(nome, consulta, coluna_data, ordem, colunas_json=()):
+    """Resposta em streaming (CSV ou JSON Lines) de `consulta`, filtrada por ?inicio=&fim= em `coluna_data`."""
+    formato = request.args.get("formato", "csv")
+    if formato not in FORMATOS:
+        abort(400, "Formato deve ser 'csv' ou 'jsonl'.")
+
+    filtro, params = _filtro_periodo(coluna_data)
+    sql = f"{consulta}{filtro} ORDER BY {ordem}"
+    # O gerador roda depois que o contexto da requisição acaba; a réplica
+    # (ou o primário, logo após uma escrita) é escolhida ainda dentro dele
+    return Response(
+        _gerar(engine_leitura(), sql, params, formato, colunas_json),
+        content_type=FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename={nome}.{formato}"},
+    )
@@ -0,0 +1,151 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from flask import has_request_context, session
+from sqlalchemy import text
+
+import database
+from database import obter_engine
+from transacao import depois_do_commit
+
+log = logging.getLogger(__name__)
+
+# "gatilho": os gatilhos log_* gravam logs_auditoria na mesma transação (padrão).
+# "aplicacao": a aplicação enfileira os eventos e uma thread grava em lotes.
+MODO = os.environ.get("AUDITORIA_MODO", "gatilho")
+
+CAPACIDADE = int(os.environ.get("AUDITORIA_CAPACIDADE", 10000))
+TAMANHO_LOTE = int(os.environ.get("AUDITORIA_TAMANHO_LOTE", 500))
+INTERVALO = float(os.environ.get("AUDITORIA_INTERVALO", 1.0))
+
+INSERIR_LOG = text("""
+    INSERT INTO logs_auditoria
+        (tabela_afetada, operacao, id_registro, dados_antigos, dados_novos, usuario_executor, data_hora)
+    VALUES (:tabela, :operacao, :id_registro, :antigos, :novos, :executor, :data_hora)
+""")
+
+_fila = queue.Queue(maxsize=CAPACIDADE)
+_trava = threading.Lock()
+_urgente = threading.Event()
+_thread = None
+
+
+def ativa():
+    return MODO == "aplicacao"
+
+
+def _json(dados):
+    return None if dados is None else json.dumps(dados, default=str, ensure_ascii=False)
+
+
+def _executor():
+    if has_request_context() and session.get("usuario_nome"):
+        return f"{session['usuario_nome']} (app)"
+    return f"{database.user}@{database.host} (app)"
+
+
+def registrar(tabela, operacao, id_registro, antigos=None, novos=None):
+    """Enfileira um evento de auditoria; dentro de uma requisição, só quando ela fizer commit.
+
+    Com a fila cheia a chamada espera a gravação liberar espaço, em vez de perder eventos.
+    """
+    if not ativa():
+        return
+    _enfileirar(tabela, operacao, id_registro, antigos, novos)
+
+
+def registrar_evento(tabela, operacao, id_registro, antigos=None, novos=None):
+    """Enfileira um evento que nenhum gatilho grava (DEVOLUÇÃO, PAGAMENTO_MULTA), em qualquer modo."""
+    _enfileirar(tabela, operacao, id_registro, antigos, novos)
+
+
+def _enfileirar(tabela, operacao, id_registro, antigos, novos):
+    _iniciar()
+    # Executor e horário de agora; a entrada na fila espera o commit da requisição
+    evento = {
+        "tabela": tabela,
+        "operacao": operacao,
+        "id_registro": id_registro,
+        "antigos": _json(antigos),
+        "novos": _json(novos),
+        "executor": _executor(),
+        "data_hora": datetime.now().replace(microsecond=0),
+    }
+    depois_do_commit(lambda: _fila.put(evento))
+
+
+def _gravar(lote):
+    try:
+        with obter_engine().begin() as conn:
+            conn.execute(INSERIR_LOG, lote)
+    except Exception:
+        log.exception("Falha ao gravar %s eventos de auditoria", len(lote))
+
+
+def _executar():
+    lote = []
+    limite = time.monotonic() + INTERVALO
+    while True:
+        try:
+            lote.append(_fila.get(timeout=max(0.0, limite - time.monotonic())))
+        except queue.Empty:
+            pass
+        if len(lote) >= TAMANHO_LOTE or (lote and (_urgente.is_set() or time.monotonic() >= limite)):
+            _gravar(lote)
+            for _ in lote:
+                _fila.task_done()
+            lote = []
+        if time.monotonic() >= limite:
+            limite = time.monotonic() + INTERVALO
+
+
+def _iniciar():
+    global _thread
+    if _thread is not None:
+        return
+    with _trava:
+        if _thread is None:
+            _thread = threading.Thread(target=_executar, name="gravador-auditoria", daemon=True)
+            _thread.start()
+            atexit.register(descarregar)
+
+
+def descarregar(timeout=10):
+    """Espera a fila esvaziar (usado no encerramento do processo)."""
+    if _thread is None:
+        return
+    _urgente.set()
+    fim = time.monotonic() + timeout
+    while _fila.unfinished_tasks and time.monotonic() < fim:
+        time.sleep(0.05)
+    _urgente.clear()
+
+
+def _gatilhos_auditoria():
+    # Reaproveita as definições de db_atividade17.sql para não duplicar o corpo dos gatilhos
+    from esquema import separar_comandos
+    script = (Path(__file__).parent / "db_atividade17.sql").read_text(encoding="utf-8")
+    for comando in separar_comandos(script):
+        encontrado = re.search(r"CREATE TRIGGER (log_\w+)", comando)
+        if encontrado:
+            yield encontrado.group(1), comando
+
+
+def alternar_gatilhos(ativar):
+    """Remove (modo aplicacao) ou recria (modo gatilho) os gatilhos log_* no banco."""
+    nomes = []
+    with obter_engine().begin() as conn:
+        for nome, comando in _gatilhos_auditoria():
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nome}")
+            if ativar:
+                conn.exec_driver_sql(comando[comando.index("CREATE TRIGGER"):])
+            nomes.append(nome)
+    return nomes
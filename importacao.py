@@ -0,0 +1,187 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import consultas
+from cache import buscas
+from database import obter_engine
+import fila_auditoria
+import senhas
+from validacao import isbn_valido, telefone_valido
+from versoes import incrementar_versao
+
+TAMANHO_LOTE = int(os.environ.get("IMPORTACAO_TAMANHO_LOTE", 1000))
+# O hashlib solta o GIL durante o KDF, então threads bastam para usar todos os
+# núcleos; um pool de processos faria fork de um worker web com threads
+TRABALHADORES = int(os.environ.get("IMPORTACAO_TRABALHADORES", os.cpu_count() or 1))
+# Mesmo valor do gatilho quantidade_inicial_livro, aplicado aqui para que o
+# SQLite (sem o gatilho) grave o mesmo que o MySQL
+QUANTIDADE_PADRAO = 1
+
+def ler_registros(arquivo, nome_arquivo):
+    """Lê um upload CSV (com cabeçalho) ou JSON (lista de objetos ou JSON Lines).
+
+    Devolve pares (número da linha/registro, registro) para os relatórios de erro.
+    """
+    conteudo = arquivo.read()
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode("utf-8-sig")
+    if nome_arquivo.lower().endswith((".json", ".jsonl")):
+        conteudo = conteudo.strip()
+        if conteudo.startswith("["):
+            return list(enumerate(json.loads(conteudo), start=1))
+        return [(numero, json.loads(linha)) for numero, linha in enumerate(conteudo.splitlines(), start=1)
+                if linha.strip()]
+    # Linha 1 é o cabeçalho
+    return list(enumerate(csv.DictReader(io.StringIO(conteudo)), start=2))
+
+
+def _vazio_para_none(valor):
+    if isinstance(valor, str):
+        valor = valor.strip()
+    return None if valor in ("", None) else valor
+
+
+def _inteiro(registro, campo, obrigatorio=False):
+    valor = _vazio_para_none(registro.get(campo))
+    if valor is None:
+        if obrigatorio:
+            raise ValueError(f"campo '{campo}' é obrigatório")
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"campo '{campo}' deve ser um número inteiro")
+
+
+def validar_livro(registro):
+    titulo = _vazio_para_none(registro.get("titulo"))
+    if not titulo:
+        raise ValueError("campo 'titulo' é obrigatório")
+    isbn = _vazio_para_none(registro.get("isbn"))
+    if not isbn_valido(isbn):
+        raise ValueError(f"ISBN inválido: {isbn}")
+    quantidade = _inteiro(registro, "quantidade")
+    if quantidade is None:
+        quantidade = QUANTIDADE_PADRAO
+    elif quantidade < 1:
+        # O gatilho quantidade_inicial_livro trocaria o valor por 1 sem avisar
+        raise ValueError("Quantidade deve ser pelo menos 1")
+    return {
+        "titulo": titulo,
+        "autor_id": _inteiro(registro, "autor_id"),
+        "isbn": isbn.replace("-", "").replace(" ", ""),
+        "ano_publicacao": _inteiro(registro, "ano_publicacao"),
+        "genero_id": _inteiro(registro, "genero_id"),
+        "editora_id": _inteiro(registro, "editora_id"),
+        "quantidade": quantidade,
+        "resumo": _vazio_para_none(registro.get("resumo")),
+    }
+
+
+def validar_usuario(registro):
+    nome = _vazio_para_none(registro.get("nome"))
+    email = _vazio_para_none(registro.get("email"))
+    senha = _vazio_para_none(registro.get("senha"))
+    if not nome or not email or not senha:
+        raise ValueError("campos 'nome', 'email' e 'senha' são obrigatórios")
+    telefone = _vazio_para_none(registro.get("telefone"))
+    if not telefone_valido(telefone):
+        raise ValueError("Formato de telefone inválido. Use (XX) 9XXXX-XXXX")
+    data_inscricao = _vazio_para_none(registro.get("data_inscricao"))
+    try:
+        data_inscricao = date.fromisoformat(data_inscricao) if data_inscricao else date.today()
+    except ValueError:
+        raise ValueError("data_inscricao deve estar no formato AAAA-MM-DD")
+    return {"nome": nome, "email": email, "telefone": telefone, "data": data_inscricao, "senha": senha}
+
+
+def _validar(registros, validar):
+    validos, erros = [], []
+    for numero, registro in registros:
+        if not isinstance(registro, dict):
+            erros.append({"linha": numero, "erro": "registro deve ser um objeto"})
+            continue
+        try:
+            validos.append((numero, validar(registro)))
+        except ValueError as e:
+            erros.append({"linha": numero, "erro": str(e)})
+    return validos, erros
+
+
+def _inserir_em_lotes(comando, linhas, erros):
+    """executemany por lote, cada lote na sua transação. Se um lote falhar
+    (gatilho, chave estrangeira...), refaz linha a linha só para apontar quais falharam."""
+    inseridos = 0
+    for inicio in range(0, len(linhas), TAMANHO_LOTE):
+        lote = linhas[inicio:inicio + TAMANHO_LOTE]
+        try:
+            with obter_engine().begin() as conn:
+                conn.execute(comando, [params for _, params in lote])
+            inseridos += len(lote)
+        except Exception:
+            for numero, params in lote:
+                try:
+                    with obter_engine().begin() as conn:
+                        conn.execute(comando, params)
+                    inseridos += 1
+                except Exception as e:
+                    erros.append({"linha": numero, "erro": str(getattr(e, "orig", e))[:200]})
+    return inseridos
+
+
+def importar_livros(registros):
+    validos, erros = _validar(registros, validar_livro)
+    inseridos = _inserir_em_lotes(consultas.INSERIR_LIVRO, validos, erros)
+    if inseridos:
+        buscas.invalidar()
+        incrementar_versao("Livros")
+    return {"inseridos": inseridos, "erros": sorted(erros, key=lambda e: e["linha"])}
+
+
+def _auditar_usuarios(emails):
+    with obter_engine().connect() as conn:
+        for inicio in range(0, len(emails), TAMANHO_LOTE):
+            for usuario in conn.execute(consultas.USUARIOS_POR_EMAIL, {"emails": emails[inicio:inicio + TAMANHO_LOTE]}):
+                fila_auditoria.registrar("usuarios", "INSERT", usuario.id_usuario, novos={
+                    "nome": usuario.nome_usuario,
+                    "email": usuario.email,
+                    "telefone": usuario.numero_telefone,
+                    "data_inscricao": usuario.data_inscricao,
+                })
+
+
+def importar_usuarios(registros):
+    validos, erros = _validar(registros, validar_usuario)
+
+    # E-mails repetidos no arquivo ou já cadastrados viram erro aqui, em vez de
+    # derrubar o lote inteiro no gatilho valida_email_unico
+    emails = [params["email"] for _, params in validos]
+    existentes = set()
+    with obter_engine().connect() as conn:
+        for inicio in range(0, len(emails), TAMANHO_LOTE):
+            existentes.update(
+                email.lower() for email in
+                conn.execute(consultas.EMAILS_CADASTRADOS, {"emails": emails[inicio:inicio + TAMANHO_LOTE]}).scalars()
+            )
+    unicos = []
+    for numero, params in validos:
+        if params["email"].lower() in existentes:
+            erros.append({"linha": numero, "erro": f"Email já cadastrado: {params['email']}"})
+        else:
+            existentes.add(params["email"].lower())
+            unicos.append((numero, params))
+
+    if unicos:
+        with ThreadPoolExecutor(max_workers=TRABALHADORES, thread_name_prefix="importacao") as executor:
+            hashes = executor.map(senhas.calcular_hash, [p["senha"] for _, p in unicos], chunksize=64)
+            for (_, params), hash_senha in zip(unicos, hashes):
+                params["senha"] = hash_senha
+
+    inseridos = _inserir_em_lotes(consultas.INSERIR_USUARIO, unicos, erros)
+    if fila_auditoria.ativa() and inseridos:
+        _auditar_usuarios([params["email"] for _, params in unicos])
+    return {"inseridos": inseridos, "erros": sorted(erros, key=lambda e: e["linha"])}
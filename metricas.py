@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+log_lentas = logging.getLogger("consultas_lentas")
+
+# Em milissegundos; 0 (padrão) desliga o registro de consultas lentas
+CONSULTA_LENTA_MS = float(os.environ.get("METRICAS_CONSULTA_LENTA_MS", 0))
+
+SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUANTIDADES = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+LINHAS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class Histograma:
+    """Histograma cumulativo por rota, no formato de exposição do Prometheus."""
+
+    def __init__(self, nome, ajuda, limites):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.limites = limites
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, rota, valor):
+        with self._trava:
+            serie = self._series.setdefault(rota, [[0] * (len(self.limites) + 1), 0.0, 0])
+            serie[0][bisect_left(self.limites, valor)] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._trava:
+            series = {rota: (list(contagens), soma, total) for rota, (contagens, soma, total) in self._series.items()}
+        for rota, (contagens, soma, total) in sorted(series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.limites, contagens):
+                acumulado += contagem
+                linhas.append(f'{self.nome}_bucket{{rota="{rota}",le="{limite}"}} {acumulado}')
+            linhas.append(f'{self.nome}_bucket{{rota="{rota}",le="+Inf"}} {total}')
+            linhas.append(f'{self.nome}_sum{{rota="{rota}"}} {soma:.6f}')
+            linhas.append(f'{self.nome}_count{{rota="{rota}"}} {total}')
+        return linhas
+
+
+requisicao_segundos = Histograma("biblioteca_requisicao_segundos", "Duração total da requisição.", SEGUNDOS)
+banco_segundos = Histograma("biblioteca_banco_segundos", "Tempo gasto em consultas por requisição.", SEGUNDOS)
+consultas = Histograma("biblioteca_consultas", "Consultas executadas por requisição.", QUANTIDADES)
+linhas_afetadas = Histograma(
+    "biblioteca_linhas", "Linhas devolvidas ou alteradas por requisição (rowcount do driver).", LINHAS
+)
+renderizacao_segundos = Histograma("biblioteca_renderizacao_segundos", "Tempo de renderização Jinja por requisição.", SEGUNDOS)
+
+HISTOGRAMAS = [requisicao_segundos, banco_segundos, consultas, linhas_afetadas, renderizacao_segundos]
+
+_consultas_lentas = 0
+_trava_lentas = threading.Lock()
+
+# Etapa da subida do worker -> segundos (app.criar_app)
+_inicializacao = {}
+
+
+def _medicao():
+    return g.get("_metricas") if has_request_context() else None
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    global _consultas_lentas
+    duracao = time.perf_counter() - conn.info["inicio_consulta"].pop()
+    medicao = _medicao()
+    if medicao is not None:
+        medicao["consultas"] += 1
+        medicao["banco"] += duracao
+        if cursor.rowcount and cursor.rowcount > 0:
+            medicao["linhas"] += cursor.rowcount
+    if CONSULTA_LENTA_MS and duracao * 1000 >= CONSULTA_LENTA_MS:
+        with _trava_lentas:
+            _consultas_lentas += 1
+        rota = request.endpoint if has_request_context() else "-"
+        log_lentas.warning("%.1f ms [%s] %s | parâmetros: %r", duracao * 1000, rota, " ".join(statement.split()), parameters)
+
+
+def _antes_de_renderizar(app, template, context, **extra):
+    medicao = _medicao()
+    if medicao is not None:
+        medicao["inicio_render"] = time.perf_counter()
+
+
+def _depois_de_renderizar(app, template, context, **extra):
+    medicao = _medicao()
+    if medicao is not None and "inicio_render" in medicao:
+        medicao["render"] += time.perf_counter() - medicao.pop("inicio_render")
+
+
+def medir_consultas():
+    """Conta tempo, consultas e linhas de cada engine na requisição em andamento.
+
+    Os eventos ficam na classe Engine, então valem para o primário e as
+    réplicas, criados só no primeiro uso, e para os engines assíncronos do
+    asgi.py (cada um tem um Engine síncrono por baixo).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(Engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(Engine, "after_cursor_execute", _depois_da_consulta)
+
+
+def registrar_inicializacao(etapa, segundos):
+    _inicializacao[etapa] = segundos
+    log.info("Inicialização: %s em %.1f ms", etapa, segundos * 1000)
+
+
+def instrumentar(app):
+    """Liga os eventos do SQLAlchemy e os hooks do Flask que alimentam /metrics.
+
+    Chame logo após criar o app, antes dos outros before_request, para que a
+    varredura de atrasados feita no before_request entre na conta da rota.
+    """
+    medir_consultas()
+    before_render_template.connect(_antes_de_renderizar, app)
+    template_rendered.connect(_depois_de_renderizar, app)
+
+    @app.before_request
+    def iniciar_medicao():
+        g._metricas = {"inicio": time.perf_counter(), "consultas": 0, "banco": 0.0, "linhas": 0, "render": 0.0}
+
+    @app.teardown_request
+    def registrar_medicao(erro=None):
+        medicao = g.pop("_metricas", None)
+        if medicao is None or request.path == "/metrics":
+            return
+        rota = request.endpoint or "desconhecida"
+        requisicao_segundos.observar(rota, time.perf_counter() - medicao["inicio"])
+        banco_segundos.observar(rota, medicao["banco"])
+        consultas.observar(rota, medicao["consultas"])
+        linhas_afetadas.observar(rota, medicao["linhas"])
+        renderizacao_segundos.observar(rota, medicao["render"])
+
+
+def exportar():
+    """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)."""
+    linhas = []
+    for histograma in HISTOGRAMAS:
+        linhas += histograma.exportar()
+    linhas += [
+        "# HELP biblioteca_consultas_lentas_total Consultas acima de METRICAS_CONSULTA_LENTA_MS.",
+        "# TYPE biblioteca_consultas_lentas_total counter",
+        f"biblioteca_consultas_lentas_total {_consultas_lentas}",
+        "# HELP biblioteca_inicializacao_segundos Duração de cada etapa da subida do worker.",
+        "# TYPE biblioteca_inicializacao_segundos gauge",
+    ]
+    linhas += [f'biblioteca_inicializacao_segundos{{etapa="{etapa}"}} {segundos:.6f}'
+               for etapa, segundos in _inicializacao.items()]
+    return "\n".join(linhas) + "\n"
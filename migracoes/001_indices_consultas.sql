@@ -0,0 +1,16 @@
+-- Índices para os predicados mais usados pela aplicação
+
+-- Login e gatilho valida_email_unico
+ALTER TABLE usuarios ADD UNIQUE INDEX uq_usuarios_email (email);
+
+-- Varredura de atrasados e listagem /emprestimos/atrasados
+CREATE INDEX idx_emprestimos_status_prevista ON Emprestimos (Status_emprestimo, Data_devolucao_prevista);
+
+-- Estatísticas por usuário (também cobre a chave estrangeira Usuario_id)
+CREATE INDEX idx_emprestimos_usuario_status ON Emprestimos (Usuario_id, Status_emprestimo);
+
+-- Paginação e exportação de /emprestimos
+CREATE INDEX idx_emprestimos_data ON Emprestimos (Data_emprestimo, ID_emprestimo);
+
+-- Listagem /auditoria e relatorio_auditoria
+CREATE INDEX idx_logs_data_operacao ON logs_auditoria (data_hora, operacao);
@@ -0,0 +1,15 @@
+-- Particiona logs_auditoria por mês de data_hora.
+-- O MySQL exige a coluna de particionamento em toda chave única, por isso a
+-- chave primária passa a ser (id_log, data_hora). As partições mensais
+-- seguintes são criadas por `flask arquivar-auditoria`.
+
+ALTER TABLE logs_auditoria
+    MODIFY data_hora TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id_log, data_hora);
+
+ALTER TABLE logs_auditoria
+    PARTITION BY RANGE (UNIX_TIMESTAMP(data_hora)) (
+        PARTITION p_inicial VALUES LESS THAN (UNIX_TIMESTAMP('2026-01-01 00:00:00')),
+        PARTITION p_futuro VALUES LESS THAN MAXVALUE
+    );
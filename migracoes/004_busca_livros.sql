@@ -0,0 +1,9 @@
+-- Busca do catálogo (/livros/buscar)
+
+-- Busca por palavras no título e no resumo, e pelo nome do autor
+ALTER TABLE Livros ADD FULLTEXT INDEX ft_livros_titulo_resumo (Titulo, Resumo);
+ALTER TABLE Autores ADD FULLTEXT INDEX ft_autores_nome (Nome_autor);
+
+-- Caminhos rápidos: ISBN exato e prefixo do título
+CREATE INDEX idx_livros_isbn ON Livros (ISBN);
+CREATE INDEX idx_livros_titulo ON Livros (Titulo);
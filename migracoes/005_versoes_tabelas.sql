@@ -0,0 +1,141 @@
+-- Contadores de versão por tabela para o ETag das listagens (versoes.py).
+-- Cada tabela tem 16 fatias; a fatia é o id do registro módulo 16, para que
+-- empréstimos simultâneos de livros diferentes não esperem pela mesma linha.
+-- A versão da tabela é a soma das fatias.
+
+CREATE TABLE versoes_tabelas (
+    tabela VARCHAR(50) NOT NULL,
+    fatia TINYINT NOT NULL,
+    versao BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tabela, fatia)
+);
+
+INSERT INTO versoes_tabelas (tabela, fatia)
+SELECT t.tabela, f.fatia
+FROM (SELECT 'Livros' AS tabela UNION ALL SELECT 'Autores' UNION ALL SELECT 'generos' UNION ALL SELECT 'Editoras') t
+CROSS JOIN (
+    SELECT 0 AS fatia UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+    UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7
+    UNION ALL SELECT 8 UNION ALL SELECT 9 UNION ALL SELECT 10 UNION ALL SELECT 11
+    UNION ALL SELECT 12 UNION ALL SELECT 13 UNION ALL SELECT 14 UNION ALL SELECT 15
+) f;
+
+DELIMITER $$
+CREATE TRIGGER versao_livros_insert
+AFTER INSERT ON Livros
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Livros' AND fatia = NEW.ID_livro % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_livros_update
+AFTER UPDATE ON Livros
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Livros' AND fatia = NEW.ID_livro % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_livros_delete
+AFTER DELETE ON Livros
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Livros' AND fatia = OLD.ID_livro % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_autores_insert
+AFTER INSERT ON Autores
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Autores' AND fatia = NEW.ID_autor % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_autores_update
+AFTER UPDATE ON Autores
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Autores' AND fatia = NEW.ID_autor % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_autores_delete
+AFTER DELETE ON Autores
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Autores' AND fatia = OLD.ID_autor % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_generos_insert
+AFTER INSERT ON generos
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'generos' AND fatia = NEW.id_genero % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_generos_update
+AFTER UPDATE ON generos
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'generos' AND fatia = NEW.id_genero % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_generos_delete
+AFTER DELETE ON generos
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'generos' AND fatia = OLD.id_genero % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_editoras_insert
+AFTER INSERT ON Editoras
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Editoras' AND fatia = NEW.ID_editora % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_editoras_update
+AFTER UPDATE ON Editoras
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Editoras' AND fatia = NEW.ID_editora % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER versao_editoras_delete
+AFTER DELETE ON Editoras
+FOR EACH ROW
+BEGIN
+    UPDATE versoes_tabelas SET versao = versao + 1
+    WHERE tabela = 'Editoras' AND fatia = OLD.ID_editora % 16;
+END$$
+DELIMITER ;
@@ -0,0 +1,84 @@
+-- Multas por atraso (multas.py)
+-- Emprestimos.multa: acumulada enquanto o empréstimo está em aberto e valor
+-- final depois da devolução. usuarios.multa_pendente: soma das multas dos
+-- empréstimos atrasados do usuário. As duas são recalculadas uma vez por dia.
+
+ALTER TABLE Emprestimos ADD COLUMN multa DECIMAL(10, 2) NOT NULL DEFAULT 0.00;
+ALTER TABLE usuarios ADD COLUMN multa_pendente DECIMAL(10, 2) NOT NULL DEFAULT 0.00;
+
+-- Os gatilhos de auditoria passam a ignorar UPDATE que só mexe nas colunas de
+-- multa; sem isso o acúmulo diário gravaria um log por empréstimo atrasado
+DROP TRIGGER IF EXISTS log_update_usuarios;
+DROP TRIGGER IF EXISTS log_update_emprestimos;
+
+DELIMITER $$
+CREATE TRIGGER log_update_usuarios
+AFTER UPDATE ON Usuarios
+FOR EACH ROW
+BEGIN
+    -- O acúmulo diário de multas (multas.py) só mexe em multa_pendente
+    IF NOT (OLD.nome_usuario <=> NEW.nome_usuario AND OLD.email <=> NEW.email
+            AND OLD.numero_telefone <=> NEW.numero_telefone AND OLD.multa_atual <=> NEW.multa_atual) THEN
+        INSERT INTO logs_auditoria (
+            tabela_afetada,
+            operacao,
+            id_registro,
+            dados_antigos,
+            dados_novos,
+            usuario_executor
+        )
+        VALUES (
+            'Usuarios',
+            'UPDATE',
+            OLD.id_usuario,
+            JSON_OBJECT(
+                'nome', OLD.nome_usuario,
+                'email', OLD.email,
+                'telefone', OLD.numero_telefone,
+                'multa', OLD.multa_atual
+            ),
+            JSON_OBJECT(
+                'nome', NEW.nome_usuario,
+                'email', NEW.email,
+                'telefone', NEW.numero_telefone,
+                'multa', NEW.multa_atual
+            ),
+            USER()
+        );
+    END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER log_update_emprestimos
+AFTER UPDATE ON Emprestimos
+FOR EACH ROW
+BEGIN
+    -- O acúmulo diário de multas (multas.py) só mexe na coluna multa
+    IF NOT (OLD.Status_emprestimo <=> NEW.Status_emprestimo
+            AND OLD.Data_devolucao_real <=> NEW.Data_devolucao_real) THEN
+        INSERT INTO logs_auditoria (
+            tabela_afetada,
+            operacao,
+            id_registro,
+            dados_antigos,
+            dados_novos,
+            usuario_executor
+        )
+        VALUES (
+            'Emprestimos',
+            'UPDATE',
+            OLD.ID_emprestimo,
+            JSON_OBJECT(
+                'status', OLD.Status_emprestimo,
+                'data_devolucao_real', OLD.Data_devolucao_real
+            ),
+            JSON_OBJECT(
+                'status', NEW.Status_emprestimo,
+                'data_devolucao_real', NEW.Data_devolucao_real
+            ),
+            USER()
+        );
+    END IF;
+END$$
+DELIMITER ;
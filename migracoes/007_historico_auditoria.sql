@@ -0,0 +1,61 @@
+-- Histórico por registro (/auditoria/registro/<tabela>/<id>)
+-- usuario_id e livro_id saem do JSON dos eventos em colunas geradas STORED,
+-- para que "tudo do usuário 45" ou "tudo do livro 9" use índice em vez de
+-- varrer a tabela lendo JSON. Coluna STORED reconstrói a tabela: numa base
+-- grande, rode numa janela de manutenção. Em tabela particionada os índices são
+-- locais; a consulta por registro passa por cada partição, uma busca por índice
+-- em cada.
+
+ALTER TABLE logs_auditoria
+    ADD COLUMN usuario_id INT GENERATED ALWAYS AS (COALESCE(
+        JSON_VALUE(dados_novos, '$.usuario_id' RETURNING UNSIGNED NULL ON ERROR),
+        JSON_VALUE(dados_antigos, '$.usuario_id' RETURNING UNSIGNED NULL ON ERROR)
+    )) STORED,
+    ADD COLUMN livro_id INT GENERATED ALWAYS AS (COALESCE(
+        JSON_VALUE(dados_novos, '$.livro_id' RETURNING UNSIGNED NULL ON ERROR),
+        JSON_VALUE(dados_antigos, '$.livro_id' RETURNING UNSIGNED NULL ON ERROR)
+    )) STORED,
+    ADD INDEX idx_logs_registro (tabela_afetada, id_registro, data_hora),
+    ADD INDEX idx_logs_usuario (usuario_id, data_hora),
+    ADD INDEX idx_logs_livro (livro_id, data_hora);
+
+-- O UPDATE de empréstimo passa a levar usuário e livro, para entrar no
+-- histórico dos dois (os registros anteriores a esta migração só aparecem no
+-- histórico do próprio empréstimo)
+DROP TRIGGER IF EXISTS log_update_emprestimos;
+
+DELIMITER $$
+CREATE TRIGGER log_update_emprestimos
+AFTER UPDATE ON Emprestimos
+FOR EACH ROW
+BEGIN
+    -- O acúmulo diário de multas (multas.py) só mexe na coluna multa
+    IF NOT (OLD.Status_emprestimo <=> NEW.Status_emprestimo
+            AND OLD.Data_devolucao_real <=> NEW.Data_devolucao_real) THEN
+        INSERT INTO logs_auditoria (
+            tabela_afetada,
+            operacao,
+            id_registro,
+            dados_antigos,
+            dados_novos,
+            usuario_executor
+        )
+        VALUES (
+            'Emprestimos',
+            'UPDATE',
+            OLD.ID_emprestimo,
+            JSON_OBJECT(
+                'status', OLD.Status_emprestimo,
+                'data_devolucao_real', OLD.Data_devolucao_real
+            ),
+            JSON_OBJECT(
+                'usuario_id', NEW.Usuario_id,
+                'livro_id', NEW.Livro_id,
+                'status', NEW.Status_emprestimo,
+                'data_devolucao_real', NEW.Data_devolucao_real
+            ),
+            USER()
+        );
+    END IF;
+END$$
+DELIMITER ;
@@ -0,0 +1,174 @@
+-- Totais da página inicial (painel.py), mantidos pelos gatilhos abaixo.
+-- Como em versoes_tabelas, cada contador tem 16 fatias escolhidas pelo id do
+-- registro, para que empréstimos simultâneos não esperem pela mesma linha; o
+-- total é a soma das fatias. `flask reconciliar-painel` (e o agendador, uma vez
+-- por dia) recalcula tudo a partir das tabelas e corrige qualquer desvio.
+
+CREATE TABLE contadores_painel (
+    nome VARCHAR(50) NOT NULL,
+    fatia TINYINT NOT NULL,
+    valor DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (nome, fatia)
+);
+
+INSERT INTO contadores_painel (nome, fatia)
+SELECT c.nome, f.fatia
+FROM (
+    SELECT 'livros' AS nome UNION ALL SELECT 'exemplares_disponiveis' UNION ALL SELECT 'estoque_baixo'
+    UNION ALL SELECT 'emprestimos_ativos' UNION ALL SELECT 'emprestimos_atrasados' UNION ALL SELECT 'multas_pendentes'
+) c
+CROSS JOIN (
+    SELECT 0 AS fatia UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+    UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7
+    UNION ALL SELECT 8 UNION ALL SELECT 9 UNION ALL SELECT 10 UNION ALL SELECT 11
+    UNION ALL SELECT 12 UNION ALL SELECT 13 UNION ALL SELECT 14 UNION ALL SELECT 15
+) f;
+
+-- Livros: quantidade de títulos, exemplares disponíveis e títulos com estoque
+-- baixo. Empréstimo, devolução e exclusão de empréstimo descontam ou repõem o
+-- exemplar com um UPDATE em Livros (operacoes_emprestimo.py), então chegam
+-- aqui pelo gatilho de UPDATE.
+DELIMITER $$
+CREATE TRIGGER painel_livros_insert
+AFTER INSERT ON Livros
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor + CASE nome
+        WHEN 'livros' THEN 1
+        WHEN 'exemplares_disponiveis' THEN COALESCE(NEW.Quantidade_disponivel, 0)
+        ELSE (NEW.l_Status <=> 'Estoque baixo')
+    END
+    WHERE nome IN ('livros', 'exemplares_disponiveis', 'estoque_baixo') AND fatia = NEW.ID_livro % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_livros_update
+AFTER UPDATE ON Livros
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Quantidade_disponivel <=> NEW.Quantidade_disponivel AND OLD.l_Status <=> NEW.l_Status) THEN
+        UPDATE contadores_painel
+        SET valor = valor + CASE nome
+            WHEN 'exemplares_disponiveis' THEN COALESCE(NEW.Quantidade_disponivel, 0) - COALESCE(OLD.Quantidade_disponivel, 0)
+            ELSE (NEW.l_Status <=> 'Estoque baixo') - (OLD.l_Status <=> 'Estoque baixo')
+        END
+        WHERE nome IN ('exemplares_disponiveis', 'estoque_baixo') AND fatia = NEW.ID_livro % 16;
+    END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_livros_delete
+AFTER DELETE ON Livros
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor - CASE nome
+        WHEN 'livros' THEN 1
+        WHEN 'exemplares_disponiveis' THEN COALESCE(OLD.Quantidade_disponivel, 0)
+        ELSE (OLD.l_Status <=> 'Estoque baixo')
+    END
+    WHERE nome IN ('livros', 'exemplares_disponiveis', 'estoque_baixo') AND fatia = OLD.ID_livro % 16;
+END$$
+DELIMITER ;
+
+-- Emprestimos: em aberto (pendente ou atrasado) e atrasados
+DELIMITER $$
+CREATE TRIGGER painel_emprestimos_insert
+AFTER INSERT ON Emprestimos
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor + CASE nome
+        WHEN 'emprestimos_ativos' THEN (NEW.Status_emprestimo <=> 'pendente') + (NEW.Status_emprestimo <=> 'atrasado')
+        ELSE (NEW.Status_emprestimo <=> 'atrasado')
+    END
+    WHERE nome IN ('emprestimos_ativos', 'emprestimos_atrasados') AND fatia = NEW.ID_emprestimo % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_emprestimos_update
+AFTER UPDATE ON Emprestimos
+FOR EACH ROW
+BEGIN
+    -- O acúmulo diário de multas só mexe na coluna multa
+    IF NOT (OLD.Status_emprestimo <=> NEW.Status_emprestimo) THEN
+        UPDATE contadores_painel
+        SET valor = valor + CASE nome
+            WHEN 'emprestimos_ativos' THEN
+                (NEW.Status_emprestimo <=> 'pendente') + (NEW.Status_emprestimo <=> 'atrasado')
+                - (OLD.Status_emprestimo <=> 'pendente') - (OLD.Status_emprestimo <=> 'atrasado')
+            ELSE (NEW.Status_emprestimo <=> 'atrasado') - (OLD.Status_emprestimo <=> 'atrasado')
+        END
+        WHERE nome IN ('emprestimos_ativos', 'emprestimos_atrasados') AND fatia = NEW.ID_emprestimo % 16;
+    END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_emprestimos_delete
+AFTER DELETE ON Emprestimos
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor - CASE nome
+        WHEN 'emprestimos_ativos' THEN (OLD.Status_emprestimo <=> 'pendente') + (OLD.Status_emprestimo <=> 'atrasado')
+        ELSE (OLD.Status_emprestimo <=> 'atrasado')
+    END
+    WHERE nome IN ('emprestimos_ativos', 'emprestimos_atrasados') AND fatia = OLD.ID_emprestimo % 16;
+END$$
+DELIMITER ;
+
+-- Usuarios: multas a pagar (multa_atual) mais as que ainda acumulam (multa_pendente)
+DELIMITER $$
+CREATE TRIGGER painel_usuarios_insert
+AFTER INSERT ON Usuarios
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor + COALESCE(NEW.multa_atual, 0) + NEW.multa_pendente
+    WHERE nome = 'multas_pendentes' AND fatia = NEW.id_usuario % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_usuarios_update
+AFTER UPDATE ON Usuarios
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.multa_atual <=> NEW.multa_atual AND OLD.multa_pendente <=> NEW.multa_pendente) THEN
+        UPDATE contadores_painel
+        SET valor = valor + COALESCE(NEW.multa_atual, 0) + NEW.multa_pendente
+                          - COALESCE(OLD.multa_atual, 0) - OLD.multa_pendente
+        WHERE nome = 'multas_pendentes' AND fatia = NEW.id_usuario % 16;
+    END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER painel_usuarios_delete
+AFTER DELETE ON Usuarios
+FOR EACH ROW
+BEGIN
+    UPDATE contadores_painel
+    SET valor = valor - COALESCE(OLD.multa_atual, 0) - OLD.multa_pendente
+    WHERE nome = 'multas_pendentes' AND fatia = OLD.id_usuario % 16;
+END$$
+DELIMITER ;
+
+-- Totais atuais na fatia 0; escritas feitas durante a migração são corrigidas
+-- pela primeira reconciliação
+UPDATE contadores_painel c
+JOIN (
+    SELECT 'livros' AS nome, COUNT(*) AS valor FROM Livros
+    UNION ALL SELECT 'exemplares_disponiveis', COALESCE(SUM(Quantidade_disponivel), 0) FROM Livros
+    UNION ALL SELECT 'estoque_baixo', COUNT(*) FROM Livros WHERE l_Status = 'Estoque baixo'
+    UNION ALL SELECT 'emprestimos_ativos', COUNT(*) FROM Emprestimos WHERE Status_emprestimo IN ('pendente', 'atrasado')
+    UNION ALL SELECT 'emprestimos_atrasados', COUNT(*) FROM Emprestimos WHERE Status_emprestimo = 'atrasado'
+    UNION ALL SELECT 'multas_pendentes', COALESCE(SUM(COALESCE(multa_atual, 0) + multa_pendente), 0) FROM usuarios
+) t ON t.nome = c.nome
+SET c.valor = t.valor
+WHERE c.fatia = 0;
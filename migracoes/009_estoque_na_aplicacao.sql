@@ -0,0 +1,14 @@
+-- O estoque passa a ser mantido por operacoes_emprestimo.py, igual no MySQL e
+-- no SQLite: o empréstimo desconta o exemplar com um UPDATE condicionado a
+-- Quantidade_disponivel > 0 (que bloqueia a linha do livro e não altera nada
+-- sem estoque), e a devolução e a exclusão de um empréstimo em aberto o repõem.
+-- Os gatilhos de estoque fariam a mesma conta uma segunda vez; eles só existem
+-- em bases criadas com o db_atividade17.sql anterior a essa mudança (ou que
+-- aplicaram a antiga migração 003, que os combinava).
+
+DROP TRIGGER IF EXISTS diminuir_livro_emprestimo;
+DROP TRIGGER IF EXISTS aumentar_livro_devolucao;
+DROP TRIGGER IF EXISTS deletar_emprestimo_pendente;
+DROP TRIGGER IF EXISTS atualizar_status_apos_emprestimo;
+DROP TRIGGER IF EXISTS atualizar_status_apos_update_emprestimo;
+DROP TRIGGER IF EXISTS atualizar_status_apos_devolucao;
@@ -0,0 +1,9 @@
+-- Marca d'água da varredura diária (agendador.py), compartilhada pelos workers.
+-- Cada worker tenta reservar a tarefa com um UPDATE condicional; só um consegue
+-- por dia, e em_execucao_desde expira se o worker morrer no meio da varredura.
+
+CREATE TABLE IF NOT EXISTS tarefas_agendadas (
+    nome VARCHAR(50) PRIMARY KEY,
+    ultima_execucao DATE NULL,
+    em_execucao_desde TIMESTAMP NULL
+);
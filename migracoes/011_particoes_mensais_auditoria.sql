@@ -0,0 +1,42 @@
+-- A 002 deixou p_inicial com limite fixo em 2026-01-01: em bancos migrados
+-- depois disso, tudo o que é mais novo cai em p_futuro. Esta migração divide
+-- p_futuro em partições mensais (pAAAAMM) do último limite até três meses
+-- adiante, como `flask arquivar-auditoria` faz a cada execução. Sem
+-- particionamento (a 002 não rodou), não faz nada.
+
+DROP PROCEDURE IF EXISTS particoes_mensais_auditoria;
+
+DELIMITER $$
+CREATE PROCEDURE particoes_mensais_auditoria()
+BEGIN
+    DECLARE mes DATE;
+    DECLARE alvo DATE DEFAULT CURDATE() - INTERVAL DAYOFMONTH(CURDATE()) - 1 DAY + INTERVAL 3 MONTH;
+    DECLARE definicoes TEXT DEFAULT '';
+
+    SELECT DATE(FROM_UNIXTIME(MAX(CAST(PARTITION_DESCRIPTION AS UNSIGNED)))) INTO mes
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'logs_auditoria'
+      AND PARTITION_NAME IS NOT NULL AND PARTITION_DESCRIPTION <> 'MAXVALUE';
+
+    WHILE mes IS NOT NULL AND mes < alvo DO
+        SET definicoes = CONCAT(definicoes,
+            'PARTITION p', YEAR(mes) * 100 + MONTH(mes),
+            ' VALUES LESS THAN (UNIX_TIMESTAMP(''', mes + INTERVAL 1 MONTH, ' 00:00:00'')), ');
+        SET mes = mes + INTERVAL 1 MONTH;
+    END WHILE;
+
+    IF definicoes <> '' THEN
+        SET @reorganizar = CONCAT(
+            'ALTER TABLE logs_auditoria REORGANIZE PARTITION p_futuro INTO (',
+            definicoes, 'PARTITION p_futuro VALUES LESS THAN MAXVALUE)'
+        );
+        PREPARE comando FROM @reorganizar;
+        EXECUTE comando;
+        DEALLOCATE PREPARE comando;
+    END IF;
+END$$
+DELIMITER ;
+
+CALL particoes_mensais_auditoria();
+
+DROP PROCEDURE particoes_mensais_auditoria;
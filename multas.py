@@ -0,0 +1,39 @@
+"""Multas por atraso.
+
+Uma vez por dia (agendador ou `flask acumular-multas`) dois UPDATE em lote
+recalculam a multa dos empréstimos atrasados e o total pendente de cada
+usuário; as telas só leem Emprestimos.multa e usuarios.multa_pendente. Na
+devolução a multa final é gravada no empréstimo e somada a multa_atual na
+mesma transação (operacoes_emprestimo.devolver).
+"""
+import logging
+import os
+from datetime import date
+
+import consultas
+from cache import estatisticas_usuarios
+from database import obter_engine
+
+log = logging.getLogger(__name__)
+
+MULTA_DIARIA = float(os.environ.get("MULTA_DIARIA", "2.00"))
+
+
+def dias_de_atraso(data_prevista, data_devolucao):
+    return max(0, (date.fromisoformat(str(data_devolucao)[:10]) - date.fromisoformat(str(data_prevista)[:10])).days)
+
+
+def multa_final(data_prevista, data_devolucao):
+    return round(dias_de_atraso(data_prevista, data_devolucao) * MULTA_DIARIA, 2)
+
+
+def acumular(hoje=None):
+    """Atualiza a multa de todos os empréstimos atrasados e o pendente dos usuários; devolve quantos empréstimos mudaram."""
+    hoje = hoje or date.today()
+    with obter_engine().begin() as conn:
+        alterados = conn.execute(consultas.ACUMULAR_MULTAS_EMPRESTIMOS, {"hoje": hoje, "diaria": MULTA_DIARIA}).rowcount
+        conn.execute(consultas.ACUMULAR_MULTAS_USUARIOS)
+    if alterados:
+        estatisticas_usuarios.invalidar()
+    log.info("Multas acumuladas em %s: %s empréstimos atualizados", hoje, alterados)
+    return alterados
@@ -0,0 +1,180 @@
+import logging
+import os
+import random
+import time
+from collections import namedtuple
+from datetime import date
+
+from sqlalchemy.exc import DBAPIError
+
+import consultas
+import multas
+from transacao import conexao, desfazer
+from versoes import incrementar_versao
+
+log = logging.getLogger(__name__)
+
+TENTATIVAS = int(os.environ.get("EMPRESTIMO_TENTATIVAS", 5))
+ESPERA_BASE = float(os.environ.get("EMPRESTIMO_ESPERA_BASE", 0.05))
+
+# Deadlock e tempo de espera por bloqueio esgotado: a transação inteira pode ser refeita
+ERROS_REPETIVEIS = {1213, 1205}
+
+
+Emprestimo = namedtuple("Emprestimo", "id usuario data_prevista status")
+
+
+class EstoqueEsgotado(Exception):
+    pass
+
+
+class JaDevolvido(Exception):
+    pass
+
+
+class EmprestimoInexistente(Exception):
+    pass
+
+
+def _repetivel(erro):
+    codigo = getattr(erro.orig, "args", [None])[0] if erro.orig is not None else None
+    return codigo in ERROS_REPETIVEIS
+
+
+def com_retentativa(operacao, tentativas=None):
+    """Executa `operacao()` refazendo-a em deadlock, com espera exponencial e aleatória.
+
+    O deadlock desfaz a transação inteira no MySQL; dentro de uma requisição
+    desfazer() descarta também o que a rota já tinha feito nela, para que cada
+    tentativa comece do zero.
+    """
+    tentativas = tentativas or TENTATIVAS
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return operacao()
+        except DBAPIError as e:
+            if not _repetivel(e) or tentativa == tentativas:
+                raise
+            espera = ESPERA_BASE * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5)
+            desfazer()
+            log.info("Deadlock no empréstimo (tentativa %s de %s), repetindo em %.3f s", tentativa, tentativas, espera)
+            time.sleep(espera)
+
+
+def _emprestar(usuario_id, livro_id, data_emprestimo, data_prevista):
+    with conexao() as conn:
+        # Desconta o exemplar antes do INSERT, num UPDATE que só passa com estoque:
+        # quem chegar ao mesmo tempo espera o bloqueio da linha do livro (ou do
+        # arquivo, no SQLite) e já encontra a quantidade descontada
+        if conn.execute(consultas.RESERVAR_EXEMPLAR, {"id": livro_id}).rowcount == 0:
+            raise EstoqueEsgotado(livro_id)
+        incrementar_versao("Livros", conn)
+
+        usuario = conn.execute(
+            consultas.USUARIO_DO_EMPRESTIMO,
+            {"id": usuario_id}
+        ).fetchone()
+
+        resultado = conn.execute(
+            consultas.INSERIR_EMPRESTIMO,
+            {
+                "usuario_id": usuario_id,
+                "livro_id": livro_id,
+                "data_emprestimo": data_emprestimo,
+                "data_devolucao_prevista": data_prevista,
+                "status": "pendente"
+            }
+        )
+        emprestimo_id = resultado.lastrowid
+
+        # O gatilho data_devolucao_prevista (MySQL) troca o vencimento pedido por
+        # empréstimo + 20 dias; o status sai do vencimento gravado. Empréstimo que
+        # já entra vencido fica atrasado, porque a varredura diária só olha
+        # vencimentos posteriores à anterior
+        prevista = conn.execute(consultas.VENCIMENTO_EMPRESTIMO, {"id": emprestimo_id}).scalar()
+        prevista = date.fromisoformat(str(prevista)[:10])
+        status = "pendente"
+        if prevista < date.today():
+            conn.execute(consultas.MARCAR_EMPRESTIMO_ATRASADO, {"id": emprestimo_id})
+            status = "atrasado"
+        return Emprestimo(emprestimo_id, usuario, prevista, status)
+
+
+def emprestar(usuario_id, livro_id, data_emprestimo, data_prevista):
+    """Confere o estoque e registra o empréstimo na transação da requisição (ou numa própria, fora dela).
+
+    Devolve Emprestimo(id, linha do usuário com nome_usuario e multa_atual,
+    vencimento gravado, status inicial). Levanta EstoqueEsgotado se não houver
+    exemplar disponível.
+    """
+    return com_retentativa(lambda: _emprestar(usuario_id, livro_id, data_emprestimo, data_prevista))
+
+
+def _devolver(emprestimo_id, data_devolucao_real):
+    with conexao() as conn:
+        # Duas devoluções simultâneas do mesmo empréstimo cobrariam a multa duas vezes
+        mysql = conn.dialect.name == "mysql"
+        emprestimo = conn.execute(
+            consultas.EMPRESTIMO_A_DEVOLVER_PARA_ATUALIZAR if mysql else consultas.EMPRESTIMO_A_DEVOLVER,
+            {"id": emprestimo_id}
+        ).fetchone()
+        if emprestimo is None:
+            raise EmprestimoInexistente(emprestimo_id)
+        if emprestimo.Status_emprestimo == 'devolvido':
+            raise JaDevolvido(emprestimo_id)
+
+        multa = multas.multa_final(emprestimo.Data_devolucao_prevista, data_devolucao_real)
+        conn.execute(
+            consultas.REGISTRAR_DEVOLUCAO,
+            {"data_devolucao_real": data_devolucao_real, "multa": multa, "id": emprestimo_id}
+        )
+        conn.execute(consultas.REPOR_EXEMPLAR, {"id": emprestimo.Livro_id})
+        incrementar_versao("Livros", conn)
+        acumulada = float(emprestimo.multa or 0)
+        if multa or acumulada:
+            # A multa acumulada até ontem sai do pendente; a final entra no saldo do usuário
+            conn.execute(
+                consultas.COBRAR_MULTA,
+                {"multa": multa, "acumulada": acumulada, "usuario_id": emprestimo.Usuario_id}
+            )
+        return emprestimo, multa
+
+
+def devolver(emprestimo_id, data_devolucao_real):
+    """Registra a devolução e aplica a multa final na transação da requisição (ou numa própria, fora dela).
+
+    Devolve (linha do empréstimo antes da devolução, multa cobrada). Levanta
+    JaDevolvido se o empréstimo já tiver sido devolvido e EmprestimoInexistente
+    se ele não existir.
+    """
+    return com_retentativa(lambda: _devolver(emprestimo_id, data_devolucao_real))
+
+
+def _excluir(emprestimo_id):
+    with conexao() as conn:
+        mysql = conn.dialect.name == "mysql"
+        emprestimo = conn.execute(
+            consultas.EMPRESTIMO_A_DEVOLVER_PARA_ATUALIZAR if mysql else consultas.EMPRESTIMO_A_DEVOLVER,
+            {"id": emprestimo_id}
+        ).fetchone()
+        if emprestimo is None:
+            return None
+        conn.execute(consultas.EXCLUIR_EMPRESTIMO, {"id": emprestimo_id})
+        if emprestimo.Status_emprestimo != 'devolvido':
+            conn.execute(consultas.REPOR_EXEMPLAR, {"id": emprestimo.Livro_id})
+            incrementar_versao("Livros", conn)
+            if emprestimo.multa:
+                conn.execute(
+                    consultas.DESCONTAR_MULTA_PENDENTE,
+                    {"acumulada": emprestimo.multa, "usuario_id": emprestimo.Usuario_id}
+                )
+        return emprestimo
+
+
+def excluir(emprestimo_id):
+    """Apaga o empréstimo; se ainda estava em aberto, o exemplar volta ao estoque
+    e a multa acumulada dele sai do pendente do usuário.
+
+    Devolve a linha apagada, ou None se o empréstimo não existir.
+    """
+    return com_retentativa(lambda: _excluir(emprestimo_id))
@@ -0,0 +1,76 @@
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+from flask import request
+from sqlalchemy import text
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+Pagina = namedtuple("Pagina", "itens proximo")
+
+
+def ler_limite():
+    limite = request.args.get("limite", LIMITE_PADRAO, type=int)
+    return max(1, min(limite, LIMITE_MAXIMO))
+
+
+@lru_cache(maxsize=256)
+def _instrucao(sql):
+    # Cada listagem gera poucas variações de SQL (com e sem cursor); a mesma
+    # string devolve o mesmo text(), sem varrer o SQL de novo a cada página
+    return text(sql)
+
+
+def _fechar_pagina(linhas, limite, cursor):
+    # Busca-se um registro a mais só para saber se existe próxima página
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        return Pagina(linhas, cursor(linhas[-1]))
+    return Pagina(linhas, None)
+
+
+def pagina_por_id(conn, consulta, chave, params=None):
+    """Página de `consulta` (sem WHERE/ORDER BY) em ordem crescente da chave inteira `chave`."""
+    limite = ler_limite()
+    apos = request.args.get("apos", type=int)
+    params = dict(params or {}, apos=apos, limite=limite + 1)
+    filtro = f" WHERE {chave} > :apos" if apos is not None else ""
+
+    linhas = conn.execute(_instrucao(f"{consulta}{filtro} ORDER BY {chave} LIMIT :limite"), params).fetchall()
+    atributo = chave.split(".")[-1]
+    return _fechar_pagina(linhas, limite, lambda linha: getattr(linha, atributo))
+
+
+def pagina_por_data(conn, consulta, coluna_data, chave, params=None):
+    """Página de `consulta` (sem WHERE/ORDER BY) da data mais recente para a mais antiga.
+
+    O cursor é `AAAA-MM-DD_id`; a chave desempata registros da mesma data.
+    Registros sem data vêm por último (NULL é o menor valor no MySQL e no
+    SQLite) e têm cursor `_id`.
+    """
+    limite = ler_limite()
+    params = dict(params or {}, limite=limite + 1)
+    filtro = ""
+    try:
+        data_cursor, id_cursor = request.args.get("apos", "").split("_")
+        params["id_cursor"] = int(id_cursor)
+        if data_cursor:
+            params["data_cursor"] = date.fromisoformat(data_cursor)
+            filtro = f"""
+            WHERE ({coluna_data} < :data_cursor
+                   OR ({coluna_data} = :data_cursor AND {chave} < :id_cursor)
+                   OR {coluna_data} IS NULL)"""
+        else:
+            filtro = f" WHERE {coluna_data} IS NULL AND {chave} < :id_cursor"
+    except ValueError:
+        pass
+
+    linhas = conn.execute(
+        _instrucao(f"{consulta}{filtro} ORDER BY {coluna_data} DESC, {chave} DESC LIMIT :limite"), params
+    ).fetchall()
+    data_attr, chave_attr = coluna_data.split(".")[-1], chave.split(".")[-1]
+    return _fechar_pagina(
+        linhas, limite, lambda linha: f"{getattr(linha, data_attr) or ''}_{getattr(linha, chave_attr)}"
+    )
@@ -0,0 +1,50 @@
+"""Totais da página inicial.
+
+No MySQL os gatilhos da migração 008 mantêm contadores_painel a cada escrita
+em Livros, Emprestimos e usuarios, e ler() é uma leitura pela chave primária.
+reconciliar() recalcula os totais a partir das tabelas e corrige qualquer
+desvio; roda uma vez por dia no agendador e com `flask reconciliar-painel`.
+No SQLite, sem gatilhos, ler() calcula os totais na hora.
+"""
+import logging
+
+import consultas
+from database import obter_engine
+from transacao import conexao_leitura
+
+log = logging.getLogger(__name__)
+
+
+def _totais(conn):
+    return dict(conn.execute(consultas.CALCULAR_TOTAIS).mappings().one())
+
+
+def ler():
+    """{contador: total} para a página inicial."""
+    with conexao_leitura() as conn:
+        if conn.dialect.name != "mysql":
+            totais = _totais(conn)
+        else:
+            totais = dict(conn.execute(consultas.LER_CONTADORES).fetchall())
+    return {nome: totais.get(nome) or 0 for nome in consultas.CONTADORES_PAINEL}
+
+
+def reconciliar():
+    """Recalcula os contadores a partir das tabelas; devolve {contador: desvio corrigido}.
+
+    As varreduras completas rodam sem bloquear nada; só a correção, somada à
+    fatia 0 de cada contador com desvio, trava uma linha por um instante.
+    Escritas feitas entre as duas etapas já aplicaram a própria diferença pelos
+    gatilhos, então somar o desvio (em vez de regravar o total) não as perde.
+    """
+    with obter_engine().connect() as conn:
+        desvios = dict(conn.execute(consultas.CALCULAR_DESVIOS).mappings().one())
+    desvios = {nome: desvio for nome, desvio in desvios.items() if desvio}
+    if desvios:
+        with obter_engine().begin() as conn:
+            for nome, desvio in desvios.items():
+                if conn.execute(consultas.CORRIGIR_CONTADOR, {"nome": nome, "desvio": desvio}).rowcount == 0:
+                    conn.execute(consultas.CRIAR_CONTADOR, {"nome": nome, "desvio": desvio})
+    if desvios:
+        log.warning("Contadores do painel corrigidos: %s", desvios)
+    return desvios
@@ -0,0 +1,153 @@
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, has_request_context, session
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from database import criar_engine, obter_engine
+
+log = logging.getLogger(__name__)
+
+# URLs das réplicas de leitura, separadas por vírgula; vazio = tudo no primário
+URLS_REPLICAS = [url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Réplica mais atrasada que isso (segundos) não recebe leituras
+ATRASO_MAXIMO = float(os.environ.get("REPLICA_ATRASO_MAXIMO", 2))
+# Depois de uma escrita, a sessão lê do primário por esse tempo (segundos)
+JANELA_LEITURA_PROPRIA = float(os.environ.get("REPLICA_JANELA_LEITURA_PROPRIA", 5))
+# O atraso de cada réplica é medido no máximo uma vez por intervalo
+INTERVALO_ATRASO = float(os.environ.get("REPLICA_INTERVALO_ATRASO", 1))
+# Depois de uma medição que falhou, a espera dobra a cada falha seguida até este limite
+ESPERA_MAXIMA_FALHA = float(os.environ.get("REPLICA_ESPERA_MAXIMA_FALHA", 30))
+
+COMANDOS_LEITURA = ("SELECT", "SHOW", "EXPLAIN", "DESCRIBE")
+# Controle de transação (begin_nested); não escreve nada por si só
+COMANDOS_CONTROLE = ("SAVEPOINT", "RELEASE", "ROLLBACK")
+# Depois das CTEs, o verbo diz se o WITH lê ou escreve
+ESCRITA_APOS_CTE = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b")
+
+_replicas = None
+_rodizio = itertools.cycle(range(len(URLS_REPLICAS)))
+# índice da réplica -> (próxima medição, último atraso medido, falhas seguidas)
+_atrasos = {}
+_medindo = set()
+_trava = threading.Lock()
+
+
+def obter_replicas():
+    """Engines das réplicas, criados no primeiro uso, como o do primário (database.obter_engine)."""
+    global _replicas
+    if _replicas is None:
+        with _trava:
+            if _replicas is None:
+                _replicas = [criar_engine(url) for url in URLS_REPLICAS]
+    return _replicas
+
+
+def atraso(replica):
+    """Segundos de atraso da réplica; infinito se a replicação estiver parada ou a base inacessível.
+
+    Uma instância MySQL sem replicação configurada (duas bases locais de
+    teste, por exemplo) e bases que não são MySQL contam como sem atraso.
+    """
+    if replica.dialect.name != "mysql":
+        return 0.0
+    try:
+        with replica.connect() as conn:
+            try:
+                linha, campo = conn.execute(text("SHOW REPLICA STATUS")).mappings().fetchone(), "Seconds_Behind_Source"
+            except DBAPIError:
+                # MySQL anterior a 8.0.22
+                linha, campo = conn.execute(text("SHOW SLAVE STATUS")).mappings().fetchone(), "Seconds_Behind_Master"
+    except Exception:
+        log.warning("Réplica %s inacessível; lendo do primário", replica.url.render_as_string(), exc_info=True)
+        return float("inf")
+    if linha is None:
+        return 0.0
+    return float("inf") if linha[campo] is None else float(linha[campo])
+
+
+def _medir(indice):
+    segundos = atraso(obter_replicas()[indice])
+    with _trava:
+        falhas = _atrasos.get(indice, (0, None, 0))[2] + 1 if segundos == float("inf") else 0
+        espera = min(INTERVALO_ATRASO * 2 ** falhas, ESPERA_MAXIMA_FALHA) if falhas else INTERVALO_ATRASO
+        _atrasos[indice] = (time.monotonic() + espera, segundos, falhas)
+        _medindo.discard(indice)
+
+
+def _atraso_recente(indice):
+    """Último atraso medido da réplica; infinito enquanto não houver medição.
+
+    A medição roda numa thread à parte: uma réplica fora do ar não prende a
+    requisição pelo connect_timeout, só deixa as leituras no primário até
+    responder de novo.
+    """
+    replica = obter_replicas()[indice]
+    if replica.dialect.name != "mysql":
+        return 0.0
+    with _trava:
+        proxima, segundos, _ = _atrasos.get(indice, (0, float("inf"), 0))
+        if time.monotonic() >= proxima and indice not in _medindo:
+            _medindo.add(indice)
+            threading.Thread(target=_medir, args=(indice,), name=f"atraso-replica-{indice}", daemon=True).start()
+    return segundos
+
+
+# A thread de medição não passa para o processo filho do fork
+os.register_at_fork(after_in_child=_medindo.clear)
+
+
+def _escolher():
+    if time.time() - session.get("escreveu_em", 0) < JANELA_LEITURA_PROPRIA:
+        return obter_engine()
+    for _ in URLS_REPLICAS:
+        with _trava:
+            indice = next(_rodizio)
+        if _atraso_recente(indice) <= ATRASO_MAXIMO:
+            return obter_replicas()[indice]
+    return obter_engine()
+
+
+def engine_leitura():
+    """Engine para consultas só de leitura: uma réplica em dia ou, na falta dela, o primário.
+
+    A escolha vale para a requisição inteira, para que as consultas de uma
+    mesma página vejam o mesmo estado. Fora de uma requisição usa o primário.
+    """
+    if not URLS_REPLICAS or not has_request_context():
+        return obter_engine()
+    if "engine_leitura" not in g:
+        g.engine_leitura = _escolher()
+    return g.engine_leitura
+
+
+def _escreve(statement):
+    comando = statement.lstrip().upper()
+    if comando.startswith("WITH"):
+        return ESCRITA_APOS_CTE.search(comando) is not None
+    return not comando.startswith(COMANDOS_LEITURA + COMANDOS_CONTROLE)
+
+
+def _marcar_escrita(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and conn.engine is obter_engine() and _escreve(statement):
+        g.escreveu = True
+
+
+# Na classe, porque o engine do primário só existe depois da primeira consulta
+if URLS_REPLICAS:
+    event.listen(Engine, "before_cursor_execute", _marcar_escrita)
+
+
+def leitura_propria(app):
+    """Depois de uma requisição que escreveu no primário, a sessão passa a ler dele por um tempo."""
+    @app.after_request
+    def lembrar_escrita(resposta):
+        if URLS_REPLICAS and g.get("escreveu"):
+            session["escreveu_em"] = time.time()
+        return resposta
@@ -0,0 +1,41 @@
+"""Rotas do app, um blueprint por domínio.
+
+Os módulos só são importados em registrar(), chamado por app.criar_app(), e o
+tempo de importação de cada um vai para /metrics.
+"""
+import importlib
+import time
+
+from flask import flash, render_template, request
+
+import importacao
+import metricas
+
+BLUEPRINTS = ("principal", "usuarios", "livros", "autores", "editoras", "generos", "emprestimos", "auditoria")
+
+
+def registrar(app):
+    for nome in BLUEPRINTS:
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(f"rotas.{nome}")
+        metricas.registrar_inicializacao(f"rotas.{nome}", time.perf_counter() - inicio)
+        app.register_blueprint(modulo.bp)
+
+
+# Upload de CSV/JSON, usado pelas rotas de importação de usuários e livros
+def importar_arquivo(importar, titulo, voltar, campos):
+    resultado = None
+    if request.method == 'POST':
+        arquivo = request.files.get('arquivo')
+        if not arquivo or not arquivo.filename:
+            flash('Selecione um arquivo CSV ou JSON.', 'danger')
+        else:
+            try:
+                registros = importacao.ler_registros(arquivo.stream, arquivo.filename)
+            except (ValueError, UnicodeDecodeError) as e:
+                flash(f'Arquivo inválido: {str(e)[:100]}', 'danger')
+            else:
+                resultado = importar(registros)
+                flash(f"{resultado['inseridos']} registros importados, {len(resultado['erros'])} com erro.",
+                      'warning' if resultado['erros'] else 'success')
+    return render_template('importar.html', titulo=titulo, voltar=voltar, campos=campos, resultado=resultado)
@@ -0,0 +1,59 @@
+from flask import Blueprint, abort, jsonify, render_template, request, redirect, url_for, flash
+import json
+from datetime import date
+import consultas
+from arquivamento import ENTIDADES, consultar_logs, historico_registro, inicio_quente
+from exportacao import exportar
+from paginacao import ler_limite
+from transacao import conexao_leitura
+
+bp = Blueprint("auditoria", __name__)
+
+# Auditoria
+@bp.route('/auditoria')
+def auditoria():
+    with conexao_leitura() as conn:
+        logs = conn.execute(consultas.AUDITORIA_RECENTE, {"desde": inicio_quente()}).fetchall()
+    return render_template('auditoria/listar_logs.html', logs=logs)
+
+@bp.route('/auditoria/export')
+def exportar_auditoria():
+    return exportar("auditoria", consultas.EXPORTAR_AUDITORIA, "data_hora", "id_log",
+                    colunas_json=("dados_antigos", "dados_novos"))
+
+@bp.route('/auditoria/filtrar', methods=['POST'])
+def filtrar_auditoria():
+    try:
+        data_inicio = date.fromisoformat(request.form['data_inicio']) if request.form.get('data_inicio') else None
+        data_fim = date.fromisoformat(request.form['data_fim']) if request.form.get('data_fim') else None
+    except ValueError:
+        flash('Datas inválidas.', 'danger')
+        return redirect(url_for('auditoria.auditoria'))
+    operacao = request.form.get('operacao') or None
+
+    logs = consultar_logs(data_inicio, data_fim, operacao)
+
+    return render_template('auditoria/listar_logs.html', logs=logs)
+
+def _historico_registro(tabela, id):
+    if tabela not in ENTIDADES:
+        abort(404)
+    return historico_registro(tabela, id, request.args.get("apos"), ler_limite())
+
+@bp.route('/auditoria/registro/<tabela>/<int:id>')
+def historico_registro_auditoria(tabela, id):
+    pagina = _historico_registro(tabela, id)
+    return render_template('auditoria/historico_registro.html', logs=pagina.itens, proximo=pagina.proximo,
+                           tabela=tabela, id_registro=id)
+
+@bp.route('/api/auditoria/registro/<tabela>/<int:id>')
+def api_historico_registro(tabela, id):
+    pagina = _historico_registro(tabela, id)
+    eventos = [
+        dict(log._mapping,
+             data_hora=log.data_hora.isoformat(),
+             dados_antigos=json.loads(log.dados_antigos) if isinstance(log.dados_antigos, str) else log.dados_antigos,
+             dados_novos=json.loads(log.dados_novos) if isinstance(log.dados_novos, str) else log.dados_novos)
+        for log in pagina.itens
+    ]
+    return jsonify({"eventos": eventos, "proximo": pagina.proximo})
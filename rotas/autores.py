@@ -0,0 +1,105 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+import consultas
+from cache import invalidar_referencia
+from paginacao import pagina_por_id
+from transacao import conexao, conexao_leitura
+from versoes import condicional, incrementar_versao
+
+bp = Blueprint("autores", __name__)
+
+# Listar Autores
+@bp.route("/autores")
+@condicional("Autores")
+def listar_autor():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_id(conn, consultas.LISTAR_AUTORES, "ID_autor")
+    return render_template("autores/listar_autor.html", autores=pagina.itens, proximo=pagina.proximo)
+
+# Cadastrar Autores
+@bp.route("/autores/cadastrar_autor", methods=["GET", "POST"])
+def cadastrar_autor():
+    if request.method == "POST":
+        nome = request.form.get("nome")
+        nacionalidade = request.form.get("nacionalidade")
+        nascimento = request.form.get("nascimento")
+        biografia = request.form.get("biografia")
+
+        with conexao() as conn:
+    
+            autor_existente = conn.execute(
+                consultas.AUTOR_POR_NOME,
+                {"nome": nome}
+            ).fetchone()
+
+            if autor_existente:
+                flash("Autor já cadastrado!", "error")
+
+            else:
+                conn.execute(
+                    consultas.INSERIR_AUTOR,
+                    {
+                        "nome": nome,
+                        "nacionalidade": nacionalidade,
+                        "data_nascimento": nascimento,
+                        "biografia": biografia
+                    }
+                )
+                flash("Autor cadastrado com sucesso!", "success")
+                invalidar_referencia("autores")
+                incrementar_versao("Autores", conn)
+        return redirect(url_for("autores.listar_autor"))
+
+    return render_template("autores/cadastrar_autor.html")
+       
+# Editar Autores
+@bp.route("/autores/editar_autor/<int:id>", methods=["GET", "POST"])
+def editar_autor(id):
+    with conexao() as conn:
+        autor = conn.execute(
+            consultas.AUTOR_POR_ID, {"id": id}
+        ).fetchone()
+
+    if not autor:
+        flash("Autor não encontrado!", "error")
+        return redirect(url_for("autores.listar_autor"))
+
+    if request.method == "POST":
+        nome = request.form.get("nome")
+        nacionalidade = request.form.get("nacionalidade")
+        nascimento = request.form.get("nascimento")
+        biografia = request.form.get("biografia")
+
+        with conexao() as conn:
+            conn.execute(
+                consultas.ATUALIZAR_AUTOR,
+                {
+                    "nome": nome,
+                    "nacionalidade": nacionalidade,
+                    "data_nascimento": nascimento,
+                    "biografia": biografia,
+                    "id": id
+                }
+            )
+        invalidar_referencia("autores")
+        incrementar_versao("Autores")
+        flash("Autor atualizado com sucesso!", "success")
+        return redirect(url_for("autores.listar_autor"))
+
+    return render_template("autores/editar_autor.html", autor=autor)
+
+# Excluir Autores
+@bp.route("/autores/excluir_autor/<int:id>")
+def excluir_autor(id):
+    with conexao() as conn:
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                consultas.EXCLUIR_AUTOR,
+                {"id": id}
+            )
+                incrementar_versao("Autores")
+            invalidar_referencia("autores")
+            flash('Autor excluído com sucesso!', 'success')
+        except:
+            flash('Autor não pode ser excluído!', 'danger')
+    return redirect(url_for("autores.listar_autor"))
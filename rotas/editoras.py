@@ -0,0 +1,89 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+import consultas
+from cache import invalidar_referencia
+from paginacao import pagina_por_id
+from transacao import conexao, conexao_leitura
+from versoes import condicional, incrementar_versao
+
+bp = Blueprint("editoras", __name__)
+
+# Listar Editoras
+@bp.route("/editoras")
+@condicional("Editoras")
+def listar_editora():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_id(conn, consultas.LISTAR_EDITORAS, "ID_editora")
+    return render_template("editoras/listar_editora.html", editoras=pagina.itens, proximo=pagina.proximo)
+
+# Cadastrar Editoras
+@bp.route("/editoras/cadastrar_editora", methods=["GET", "POST"])
+def cadastrar_editora():
+    if request.method == "POST":
+        nome = request.form.get("nome")
+        endereco = request.form.get("endereco")
+
+        with conexao() as conn:
+            editora_existente = conn.execute(
+                consultas.EDITORA_POR_NOME,
+                {"nome": nome}
+            ).fetchone()
+
+            if editora_existente:
+                flash("Editora já cadastrada!", "error")
+            else:
+                conn.execute(
+                    consultas.INSERIR_EDITORA,
+                    {"nome": nome, "endereco": endereco}
+                )
+                flash("Editora cadastrada com sucesso!", "success")
+                invalidar_referencia("editoras")
+                incrementar_versao("Editoras", conn)
+        return redirect(url_for("editoras.listar_editora"))
+
+    return render_template("editoras/cadastrar_editora.html")
+
+# Editar Editoras
+@bp.route("/editoras/editar_editora/<int:id>", methods=["GET", "POST"])
+def editar_editora(id):
+    with conexao() as conn:
+        editora = conn.execute(
+            consultas.EDITORA_POR_ID,
+            {"id": id}
+        ).fetchone()
+
+    if not editora:
+        flash("Editora não encontrada!", "error")
+        return redirect(url_for("editoras.listar_editora"))
+
+    if request.method == "POST":
+        nome = request.form.get("nome")
+        endereco = request.form.get("endereco")
+
+        with conexao() as conn:
+            conn.execute(
+                consultas.ATUALIZAR_EDITORA,
+                {"nome": nome, "endereco": endereco, "id": id}
+            )
+        invalidar_referencia("editoras")
+        incrementar_versao("Editoras")
+        flash("Editora atualizada com sucesso!", "success")
+        return redirect(url_for("editoras.listar_editora"))
+
+    return render_template("editoras/editar_editora.html", editora=editora)
+
+# Excluir Editoras
+@bp.route("/editoras/excluir_editora/<int:id>")
+def excluir_editora(id):
+    with conexao() as conn:
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                consultas.EXCLUIR_EDITORA,
+                {"id": id}
+            )
+                incrementar_versao("Editoras")
+            invalidar_referencia("editoras")
+            flash('Editora excluído com sucesso!', 'success')
+        except:
+            flash('Editora não pode ser excluída!', 'danger')
+    return redirect(url_for("editoras.listar_editora"))
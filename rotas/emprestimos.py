@@ -0,0 +1,153 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+import consultas
+import fila_auditoria
+from cache import estatisticas_usuarios
+from exportacao import exportar
+from multas import MULTA_DIARIA, dias_de_atraso
+from operacoes_emprestimo import EmprestimoInexistente, EstoqueEsgotado, JaDevolvido, devolver, emprestar, excluir
+from paginacao import pagina_por_data
+from transacao import conexao, conexao_leitura
+
+bp = Blueprint("emprestimos", __name__)
+
+# Listar Empréstimos
+@bp.route("/emprestimos")
+def listar_emprestimos():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_data(conn, consultas.LISTAR_EMPRESTIMOS, "e.Data_emprestimo", "e.ID_emprestimo")
+    return render_template("emprestimos/listar_emprestimo.html", emprestimos=pagina.itens, proximo=pagina.proximo)
+
+# Exportar Empréstimos
+@bp.route("/emprestimos/export")
+def exportar_emprestimos():
+    return exportar("emprestimos", consultas.EXPORTAR_EMPRESTIMOS, "Data_emprestimo", "ID_emprestimo")
+
+# Criar Empréstimo
+@bp.route("/emprestimos/novo", methods=["GET", "POST"])
+def novo_emprestimo():
+    with conexao() as conn:
+        usuarios = conn.execute(consultas.USUARIOS_EMPRESTIMO).fetchall()
+        
+        livros = conn.execute(consultas.LIVROS_DISPONIVEIS).fetchall()
+        
+    if request.method == "POST":
+        usuario_id = request.form.get("usuario_id")
+        livro_id = request.form.get("livro_id")
+        data_emprestimo = request.form.get("data_emprestimo")
+        data_devolucao_prevista = request.form.get("data_devolucao_prevista")
+        
+        from datetime import datetime, timedelta
+        
+        data_emprestimo_obj = datetime.strptime(data_emprestimo, '%Y-%m-%d')
+        
+        if not data_devolucao_prevista:
+            data_devolucao_prevista_obj = data_emprestimo_obj + timedelta(days=20)
+        else:
+            data_devolucao_prevista_obj = datetime.strptime(data_devolucao_prevista, '%Y-%m-%d')
+        
+        data_devolucao_prevista_str = data_devolucao_prevista_obj.strftime('%Y-%m-%d')
+        
+        if data_devolucao_prevista_obj.date() < data_emprestimo_obj.date():
+            flash('Data de devolução não pode ser anterior à data de empréstimo.', 'danger')
+            return render_template("emprestimos/novo_emprestimo.html", 
+                                usuarios=usuarios, 
+                                livros=livros)
+        
+        if data_emprestimo_obj.date() > datetime.now().date():
+            flash('Data de empréstimo não pode ser futura.', 'danger')
+            return render_template("emprestimos/novo_emprestimo.html", 
+                                usuarios=usuarios, 
+                                livros=livros)
+        
+        try:
+            novo = emprestar(usuario_id, livro_id, data_emprestimo, data_devolucao_prevista_str)
+        except EstoqueEsgotado:
+            flash('Livro sem exemplares disponíveis.', 'danger')
+            return render_template("emprestimos/novo_emprestimo.html", 
+                                usuarios=usuarios, 
+                                livros=livros)
+
+        mensagem_aviso = ""
+        if novo.usuario and novo.usuario.multa_atual > 0:
+            mensagem_aviso = f" Usuário possui multa pendente de R$ {novo.usuario.multa_atual:.2f}."
+            
+        # O vencimento e o status gravados, que no MySQL podem diferir do formulário
+        data_devolucao_prevista_str = novo.data_prevista.isoformat()
+        estatisticas_usuarios.invalidar(int(usuario_id))
+        fila_auditoria.registrar("Emprestimos", "INSERT", novo.id, novos={
+            "usuario_id": int(usuario_id),
+            "livro_id": int(livro_id),
+            "data_emprestimo": data_emprestimo,
+            "data_prevista": data_devolucao_prevista_str,
+            "status": novo.status
+        })
+        flash(f"Empréstimo realizado com sucesso! Data de devolução: {data_devolucao_prevista_str}.{mensagem_aviso}", 
+              "warning" if mensagem_aviso else "success")
+        return redirect(url_for("emprestimos.listar_emprestimos"))
+
+    return render_template("emprestimos/novo_emprestimo.html", usuarios=usuarios, livros=livros)
+
+# Devolver empréstimo
+@bp.route("/emprestimos/devolver/<int:id>", methods=["GET", "POST"])
+def devolver_emprestimo(id):
+    with conexao() as conn:
+        emprestimo = conn.execute(
+            consultas.EMPRESTIMO_DETALHADO,
+            {"id": id}
+        ).fetchone()
+
+    if not emprestimo:
+        flash("Empréstimo não encontrado!", "error")
+        return redirect(url_for("emprestimos.listar_emprestimos"))
+
+    if request.method == "POST":
+        data_devolucao_real = request.form.get("data_devolucao_real")
+
+        try:
+            anterior, multa = devolver(id, data_devolucao_real)
+        except JaDevolvido:
+            flash("Empréstimo já devolvido.", "warning")
+            return redirect(url_for("emprestimos.listar_emprestimos"))
+        except EmprestimoInexistente:
+            flash("Empréstimo não encontrado!", "error")
+            return redirect(url_for("emprestimos.listar_emprestimos"))
+
+        mensagem_multa = ""
+        if multa:
+            dias = dias_de_atraso(anterior.Data_devolucao_prevista, data_devolucao_real)
+            mensagem_multa = f"Multa de R$ {multa:.2f} ({dias} dias de atraso) somada à conta do usuário."
+
+        estatisticas_usuarios.invalidar(emprestimo.Usuario_id)
+        fila_auditoria.registrar("Emprestimos", "UPDATE", id,
+            {"status": anterior.Status_emprestimo, "data_devolucao_real": anterior.Data_devolucao_real},
+            {"usuario_id": anterior.Usuario_id, "livro_id": anterior.Livro_id,
+             "status": "devolvido", "data_devolucao_real": data_devolucao_real})
+        fila_auditoria.registrar_evento("Emprestimos", "DEVOLUÇÃO", id,
+            {"status": anterior.Status_emprestimo, "multa_acumulada": anterior.multa},
+            {"data_devolucao_real": data_devolucao_real, "usuario_id": anterior.Usuario_id,
+             "livro_id": anterior.Livro_id, "multa": multa})
+        flash(f"Devolução realizada com sucesso! {mensagem_multa}", 
+              "warning" if mensagem_multa else "success")
+        return redirect(url_for("emprestimos.listar_emprestimos"))
+
+    return render_template("emprestimos/devolver_emprestimo.html", emprestimo=emprestimo, multa_diaria=MULTA_DIARIA)
+
+# Excluir Empréstimo
+@bp.route("/emprestimos/excluir/<int:id>")
+def excluir_emprestimo(id):
+    # Empréstimo ainda em aberto devolve o exemplar ao estoque
+    emprestimo = excluir(id)
+
+    if emprestimo:
+        estatisticas_usuarios.invalidar(emprestimo.Usuario_id)
+    flash("Empréstimo excluído com sucesso!", "success")
+    return redirect(url_for("emprestimos.listar_emprestimos"))
+
+# Listar Empréstimos Atrasados
+@bp.route("/emprestimos/atrasados")
+def listar_emprestimos_atrasados():
+    with conexao_leitura() as conn:
+        emprestimos_atrasados = conn.execute(consultas.ATRASADOS).fetchall()
+    
+    print(f"Empréstimos atrasados encontrados: {len(emprestimos_atrasados)}")
+    return render_template("emprestimos/listar_atrasados.html", emprestimos=emprestimos_atrasados)
@@ -0,0 +1,61 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+import consultas
+from cache import invalidar_referencia
+from paginacao import pagina_por_id
+from transacao import conexao, conexao_leitura
+from versoes import condicional, incrementar_versao
+
+bp = Blueprint("generos", __name__)
+
+# Listar Gêneros 
+@bp.route('/generos')
+@condicional("generos")
+def listar_generos():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_id(conn, consultas.LISTAR_GENEROS, "id_genero")
+    return render_template('generos/listar_genero.html', dados=pagina.itens, tabela='generos', proximo=pagina.proximo)
+
+# Cadastrar Gêneros 
+@bp.route('/generos/novo', methods=['GET', 'POST'])
+def novo_genero():
+    if request.method == 'POST':
+        nome = request.form['nome']
+        with conexao() as conn:
+            conn.execute(consultas.INSERIR_GENERO, {"nome": nome})
+        invalidar_referencia("generos")
+        incrementar_versao("generos")
+        flash('Gênero adicionado com sucesso!', 'success')
+        return redirect(url_for('generos.listar_generos'))
+    return render_template('generos/cadastrar_genero.html', tabela='generos', dado=None)
+
+# Editar Gêneros 
+@bp.route('/generos/editar/<int:id>', methods=['GET', 'POST'])
+def editar_genero(id):
+    with conexao() as conn:
+        if request.method == 'POST':
+            nome = request.form['nome']
+            conn.execute(consultas.ATUALIZAR_GENERO, {"nome": nome, "id": id})
+            invalidar_referencia("generos")
+            incrementar_versao("generos")
+            flash('Gênero atualizado com sucesso!', 'success')
+            return redirect(url_for('generos.listar_generos'))
+
+        genero = conn.execute(consultas.GENERO_POR_ID, {"id": id}).fetchone()
+    return render_template('generos/editar_genero.html', tabela='generos', dado=genero)
+
+# Excluir Gêneros 
+@bp.route('/generos/excluir/<int:id>')
+def excluir_genero(id):
+    with conexao() as conn:
+        try:
+            # Savepoint: a falha (chave estrangeira) desfaz só o DELETE, não a transação da requisição
+            with conn.begin_nested():
+                conn.execute(consultas.EXCLUIR_GENERO, {"id": id})
+                incrementar_versao("generos")
+            invalidar_referencia("generos")
+            flash('Gênero excluído com sucesso!', 'success')
+        except:
+            flash('Gênero não pode ser excluído!', 'danger')
+
+    
+    return redirect(url_for('generos.listar_generos'))
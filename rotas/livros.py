@@ -0,0 +1,188 @@
+from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash
+import consultas
+import fila_auditoria
+import importacao
+from busca import buscar_livros
+from cache import buscas, obter_autores, obter_generos, obter_editoras, nomes_referencia
+from paginacao import ler_limite, pagina_por_id
+from rotas import importar_arquivo
+from transacao import conexao, conexao_leitura
+from versoes import condicional, incrementar_versao
+
+bp = Blueprint("livros", __name__)
+
+# Listar Livros
+@bp.route("/livros")
+@condicional("Livros", "Autores", "generos", "Editoras")
+def listar_livros():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_id(conn, consultas.LISTAR_LIVROS, "ID_livro")
+
+    autores, generos, editoras = nomes_referencia()
+    livros = [
+        dict(livro._mapping,
+             Nome_autor=autores.get(livro.Autor_id),
+             nome_genero=generos.get(livro.Genero_id),
+             Nome_editora=editoras.get(livro.Editora_id))
+        for livro in pagina.itens
+    ]
+    return render_template("livros/listar_livro.html", livros=livros, proximo=pagina.proximo)
+
+# Buscar Livros
+def _buscar_livros():
+    return buscar_livros(
+        request.args.get("q", ""),
+        modo=request.args.get("modo", "texto"),
+        pagina=max(1, request.args.get("pagina", 1, type=int)),
+        limite=ler_limite()
+    )
+
+@bp.route("/livros/buscar")
+def buscar_livro():
+    pagina = _buscar_livros()
+    return render_template("livros/buscar_livro.html", livros=pagina.itens, proxima_pagina=pagina.proximo)
+
+@bp.route("/api/livros/buscar")
+def api_buscar_livros():
+    pagina = _buscar_livros()
+    return jsonify({"livros": pagina.itens, "proxima_pagina": pagina.proximo})
+
+# Cadastrar Livros
+@bp.route("/livros/criar_livro", methods=["GET", "POST"])
+def criar_livro():
+    autores, generos, editoras = obter_autores(), obter_generos(), obter_editoras()
+
+    if request.method == "POST":
+        titulo = request.form.get("titulo")
+        autor_id = request.form.get("autor_id")
+        isbn = request.form.get("isbn")
+        ano_publicacao = request.form.get("ano_publicacao")
+        genero_id = request.form.get("genero_id")
+        editora_id = request.form.get("editora_id")
+        quantidade = request.form.get("quantidade")
+        resumo = request.form.get("resumo")
+
+        try:
+            with conexao() as conn, conn.begin_nested():
+                conn.execute(
+                    consultas.INSERIR_LIVRO,
+                    {
+                        "titulo": titulo,
+                        "autor_id": autor_id,
+                        "isbn": isbn,
+                        "ano_publicacao": ano_publicacao,
+                        "genero_id": genero_id,
+                        "editora_id": editora_id,
+                        "quantidade": quantidade,
+                        "resumo": resumo
+                    }
+                )
+            
+            buscas.invalidar()
+            incrementar_versao("Livros")
+            flash("Livro criado com sucesso!", "success")
+            return redirect(url_for("livros.listar_livros"))
+            
+        except Exception as e:
+            error_msg = str(e)
+            if "Quantidade de livros não pode ser negativa" in error_msg:
+                flash('Quantidade não pode ser negativa!', 'danger')
+            else:
+                flash('Erro ao criar livro', 'danger')
+            
+            return render_template("livros/criar_livro.html", 
+                                 autores=autores, 
+                                 generos=generos, 
+                                 editoras=editoras)
+
+    return render_template("livros/criar_livro.html", autores=autores, generos=generos, editoras=editoras)
+
+# Importar Livros
+@bp.route("/livros/importar", methods=["GET", "POST"])
+def importar_livros():
+    return importar_arquivo(importacao.importar_livros, "Importar Livros", "livros.listar_livros",
+                            ["titulo", "autor_id", "isbn", "ano_publicacao", "genero_id",
+                             "editora_id", "quantidade", "resumo"])
+
+# Editar Livros
+@bp.route("/livros/editar_livro/<int:id>", methods=["GET", "POST"])
+def editar_livro(id):
+    with conexao() as conn:
+        livro = conn.execute(
+            consultas.LIVRO_POR_ID, {"id": id}
+        ).fetchone()
+
+    autores, generos, editoras = obter_autores(), obter_generos(), obter_editoras()
+    
+    if not livro:
+        flash("Livro não encontrado!", "error")
+        return redirect(url_for("livros.listar_livros"))
+
+    if request.method == "POST":
+        titulo = request.form.get("titulo")
+        autor_id = request.form.get("autor_id")
+        isbn = request.form.get("isbn")
+        ano_publicacao = request.form.get("ano_publicacao")
+        genero_id = request.form.get("genero_id")
+        editora_id = request.form.get("editora_id")
+        quantidade = request.form.get("quantidade")
+        resumo = request.form.get("resumo")
+        
+        try:
+            with conexao() as conn, conn.begin_nested():
+                conn.execute(
+                    consultas.ATUALIZAR_LIVRO,
+                    {
+                        "titulo": titulo,
+                        "autor_id": autor_id,
+                        "isbn": isbn,
+                        "ano_publicacao": ano_publicacao,
+                        "genero_id": genero_id,
+                        "editora_id": editora_id,
+                        "quantidade": quantidade,
+                        "resumo": resumo,
+                        "id": id
+                    }
+                )
+            
+            buscas.invalidar()
+            incrementar_versao("Livros")
+            flash("Livro atualizado com sucesso!", "success")
+            return redirect(url_for("livros.listar_livros"))
+            
+        except Exception as e:
+            error_msg = str(e)
+            if "Quantidade de livros não pode ser negativa" in error_msg:
+                flash('Quantidade não pode ser negativa!', 'danger')
+            else:
+                flash('Erro ao atualizar livro', 'danger')
+            
+            return render_template("livros/editar_livro.html", 
+                                 livro=livro, 
+                                 autores=autores, 
+                                 generos=generos, 
+                                 editoras=editoras)
+
+    return render_template("livros/editar_livro.html", 
+                         livro=livro, autores=autores, generos=generos, editoras=editoras)
+
+# Excluir Livros
+@bp.route("/livros/excluir_livro/<int:id>")
+def excluir_livro(id):
+    with conexao() as conn:
+        antigo = None
+        if fila_auditoria.ativa():
+            antigo = conn.execute(
+                consultas.LIVRO_AUDITADO,
+                {"id": id}
+            ).mappings().fetchone()
+        conn.execute(
+            consultas.EXCLUIR_LIVRO,
+            {"id": id}
+        )
+    if antigo:
+        fila_auditoria.registrar("Livros", "DELETE", id, antigos=dict(antigo))
+    buscas.invalidar()
+    incrementar_versao("Livros")
+    flash("Livro excluído com sucesso!", "success")
+    return redirect(url_for("livros.listar_livros"))
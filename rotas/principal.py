@@ -0,0 +1,32 @@
+import logging
+
+from flask import Blueprint, Response, jsonify, render_template, session
+from sqlalchemy import text
+import metricas
+import painel
+from database import obter_engine
+
+log = logging.getLogger(__name__)
+
+bp = Blueprint("principal", __name__)
+
+@bp.route('/')
+def index():
+    totais = painel.ler() if 'usuario_id' in session else None
+    return render_template('index.html', painel=totais)
+
+@bp.route('/metrics')
+def exibir_metricas():
+    return Response(metricas.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Verificação de saúde para o balanceador: 503 enquanto o primário não responde,
+# então um worker novo só recebe tráfego depois de alcançar o banco
+@bp.route('/saude')
+def saude():
+    try:
+        with obter_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception:
+        log.warning("Banco inacessível na verificação de saúde", exc_info=True)
+        return jsonify({"banco": "indisponivel"}), 503
+    return jsonify({"banco": "ok"})
@@ -0,0 +1,185 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+import consultas
+import fila_auditoria
+import importacao
+import senhas
+from cache import estatisticas_usuarios
+from paginacao import pagina_por_id
+from rotas import importar_arquivo
+from transacao import conexao, conexao_leitura, liberar
+from validacao import telefone_valido
+
+bp = Blueprint("usuarios", __name__)
+
+# Cadastro Usuários
+@bp.route('/cadastro', methods=['GET', 'POST'])
+def cadastro():
+    if request.method == 'POST':
+        nome = request.form['nome']
+        email = request.form['email']
+        telefone = request.form['telefone']
+        data_inscricao = request.form['data_inscricao']
+        senha = request.form['senha']
+        
+        if not telefone_valido(telefone):
+            flash('Formato de telefone inválido. Use (XX) 9XXXX-XXXX', 'danger')
+            return render_template('usuarios/cadastro.html')
+        
+        hash_senha = senhas.gerar_hash(senha)
+
+        with conexao() as conn:
+            try:
+                with conn.begin_nested():
+                    resultado = conn.execute(consultas.INSERIR_USUARIO, {
+                        "nome": nome, "email": email, "telefone": telefone, "data": data_inscricao, "senha": hash_senha
+                    })
+                fila_auditoria.registrar('usuarios', 'INSERT', resultado.lastrowid, novos={
+                    'nome': nome, 'email': email, 'telefone': telefone, 'data_inscricao': data_inscricao
+                })
+                
+                flash('Cadastro realizado com sucesso! Faça login.', 'success')
+                return redirect(url_for('usuarios.login'))
+                
+            except Exception as e:
+                error_msg = str(e)
+                
+                if "Email já cadastrado" in error_msg:
+                    flash('Este email já está cadastrado no sistema!', 'danger')
+                
+                elif "Formato de telefone inválido" in error_msg:
+                    flash('Telefone no formato incorreto!', 'danger')
+                
+                else:
+                    flash(f'Erro no cadastro: {error_msg[:100]}', 'danger')
+                
+                return render_template('usuarios/cadastro.html')
+
+    return render_template('usuarios/cadastro.html')
+
+# Login Usuários
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form['email']
+        senha = request.form['senha']
+
+        with conexao() as conn:
+            usuario = conn.execute(consultas.LOGIN, {"email": email}).fetchone()
+        # A conexão volta ao pool antes do KDF, que leva dezenas de milissegundos
+        liberar()
+
+        confere, novo_hash = senhas.verificar(usuario.senha, senha) if usuario else (False, None)
+        if confere:
+            if novo_hash:
+                with conexao() as conn:
+                    conn.execute(consultas.ATUALIZAR_SENHA, {"senha": novo_hash, "id": usuario.id_usuario})
+            session['usuario_id'] = usuario.id_usuario
+            session['usuario_nome'] = usuario.nome_usuario
+            flash('Login realizado com sucesso!', 'success')
+            return redirect(url_for('principal.index'))
+        else:
+            flash('Email ou senha incorretos.', 'danger')
+
+    return render_template('usuarios/login.html')
+
+# LOGOUT 
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Logout realizado com sucesso!', 'success')
+    return redirect(url_for('principal.index'))
+
+# Listar Usuários
+@bp.route('/usuarios')
+def listar_usuarios():
+    with conexao_leitura() as conn:
+        pagina = pagina_por_id(conn, consultas.LISTAR_USUARIOS, "id_usuario")
+    return render_template('usuarios/listar_usuario.html', dados=pagina.itens, tabela='usuarios', proximo=pagina.proximo)
+
+# Importar Usuários
+@bp.route('/usuarios/importar', methods=['GET', 'POST'])
+def importar_usuarios():
+    return importar_arquivo(importacao.importar_usuarios, 'Importar Usuários', 'usuarios.listar_usuarios',
+                            ['nome', 'email', 'telefone', 'data_inscricao', 'senha'])
+
+# Editar Usuários
+@bp.route('/usuarios/editar/<int:id>', methods=['GET', 'POST'])
+def editar_usuario(id):
+    with conexao() as conn:
+        if request.method == 'POST':
+            nome = request.form['nome']
+            email = request.form['email']
+            telefone = request.form['telefone']
+            data = request.form['data_inscricao']
+            multa = request.form['multa']
+            # Lido sempre: uma multa menor que a anterior é registrada como pagamento
+            antigo = conn.execute(consultas.USUARIO_AUDITADO, {"id": id}).mappings().fetchone()
+            conn.execute(consultas.ATUALIZAR_USUARIO, {"nome": nome, "email": email, "telefone": telefone, "data": data, "multa": multa, "id": id})
+            if antigo:
+                fila_auditoria.registrar('Usuarios', 'UPDATE', id, dict(antigo), {
+                    'nome': nome, 'email': email, 'telefone': telefone, 'multa': multa
+                })
+                if multa and float(multa) < float(antigo['multa'] or 0):
+                    fila_auditoria.registrar_evento('Usuarios', 'PAGAMENTO_MULTA', id, {'multa': antigo['multa']}, {
+                        'multa': float(multa), 'valor_pago': round(float(antigo['multa']) - float(multa), 2)
+                    })
+            estatisticas_usuarios.invalidar(id)
+            flash('Usuário atualizado com sucesso!', 'success')
+            return redirect(url_for('usuarios.listar_usuarios'))
+
+        usuario = conn.execute(consultas.USUARIO_POR_ID, {"id": id}).fetchone()
+    return render_template('usuarios/editar_usuario.html', tabela='usuarios', dado=usuario)
+
+# Excluir Usuários
+@bp.route('/usuarios/excluir/<int:id>')
+def excluir_usuario(id):
+    with conexao() as conn:
+        conn.execute(consultas.EXCLUIR_USUARIO, {"id": id})
+        try:
+            flash('Usuário excluído com sucesso!', 'success')
+        except:
+            flash('Usuário não pode ser excluído!', 'danger')
+    return redirect(url_for('usuarios.listar_usuarios'))
+
+# Estatísticas
+def consultar_estatisticas(conn, usuario_id):
+    # Uma consulta só: agregados por janela sobre todos os empréstimos do usuário,
+    # devolvendo apenas os 10 mais recentes e os atrasados. As multas vêm prontas
+    # das colunas mantidas por multas.py
+    linhas = conn.execute(consultas.ESTATISTICAS_USUARIO, {"id": usuario_id}).fetchall()
+
+    multa_atual = (linhas[0].multa_atual if linhas else 0) or 0
+    multa_pendente = (linhas[0].multa_pendente if linhas else 0) or 0
+    total_emprestimos = (linhas[0].total_emprestimos if linhas else 0) or 0
+    atrasos = (linhas[0].atrasos if linhas else 0) or 0
+
+    historico = [linha for linha in linhas if linha.posicao is not None and linha.posicao <= 10]
+    emprestimos_atrasados = [linha for linha in linhas if linha.em_atraso == 1]
+
+    estatisticas = {
+        'total_emprestimos': total_emprestimos,
+        'atrasos': atrasos,
+        'multa_atual': multa_atual,
+        'multa_pendente': multa_pendente,
+        'multa_total': multa_atual + multa_pendente,
+        'media_atrasos': round((atrasos * 100.0) / total_emprestimos, 2) if total_emprestimos > 0 else 0
+    }
+    return estatisticas, historico, emprestimos_atrasados, multa_atual
+
+def carregar_estatisticas(usuario_id):
+    with conexao_leitura() as conn:
+        return consultar_estatisticas(conn, usuario_id)
+
+@bp.route('/estatisticas')
+def estatisticas():
+    if 'usuario_id' not in session:
+        flash('Faça login para ver suas estatísticas.', 'warning')
+        return redirect(url_for('usuarios.login'))
+
+    usuario_id = session['usuario_id']
+    estatisticas, historico, emprestimos_atrasados, multa_atual = estatisticas_usuarios.obter(
+        usuario_id, lambda: carregar_estatisticas(usuario_id)
+    )
+
+    return render_template('usuarios/estatisticas.html', estatisticas=estatisticas, historico=historico,
+                           emprestimos_atrasados=emprestimos_atrasados, multa_atual=multa_atual)
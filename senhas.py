@@ -0,0 +1,55 @@
+"""Hash e verificação de senhas numa pool limitada.
+
+O KDF (scrypt ou pbkdf2, do werkzeug) ocupa a CPU por dezenas de milissegundos
+a cada chamada; num pico de logins ele tomava todas as threads do worker e as
+outras rotas esperavam. Aqui o cálculo roda em no máximo SENHA_TRABALHADORES
+threads por processo (o hashlib solta o GIL durante o KDF); os logins além
+disso esperam na fila da pool, e o resto do worker continua livre.
+
+SENHA_METODO usa o formato do werkzeug ("scrypt:32768:8:1",
+"pbkdf2:sha256:600000"). Um hash gravado com outro método ou outro tamanho de
+sal é refeito no próximo login que acertar a senha.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METODO = os.environ.get("SENHA_METODO", "scrypt")
+TAMANHO_SAL = int(os.environ.get("SENHA_TAMANHO_SAL", 16))
+TRABALHADORES = int(os.environ.get("SENHA_TRABALHADORES", os.cpu_count() or 1))
+
+# As threads só nascem no primeiro submit, então a pool sobrevive ao fork dos workers
+_pool = ThreadPoolExecutor(max_workers=TRABALHADORES, thread_name_prefix="senhas")
+
+
+def calcular_hash(senha):
+    """Hash com os parâmetros configurados, na thread atual (para outras pools, como a da importação)."""
+    return generate_password_hash(senha, method=METODO, salt_length=TAMANHO_SAL)
+
+
+@lru_cache(maxsize=1)
+def _metodo_completo():
+    # O werkzeug grava "scrypt" como "scrypt:32768:8:1"; um hash de teste mostra a forma gravada
+    return calcular_hash("").split("$", 1)[0]
+
+
+def precisa_rehash(hash_salvo):
+    partes = hash_salvo.split("$")
+    return len(partes) != 3 or partes[0] != _metodo_completo() or len(partes[1]) != TAMANHO_SAL
+
+
+def _verificar(hash_salvo, senha):
+    if not check_password_hash(hash_salvo, senha):
+        return False, None
+    return True, calcular_hash(senha) if precisa_rehash(hash_salvo) else None
+
+
+def gerar_hash(senha):
+    return _pool.submit(calcular_hash, senha).result()
+
+
+def verificar(hash_salvo, senha):
+    """(senha confere, novo hash ou None); o novo hash vem quando o gravado usa parâmetros antigos."""
+    return _pool.submit(_verificar, hash_salvo, senha).result()
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+# Antes de qualquer import do app: sem agendador nem MySQL nos testes
+os.environ.setdefault("AGENDADOR_ATIVO", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import cache  # noqa: E402
+import database  # noqa: E402
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Base SQLite nova, em arquivo (várias conexões enxergam os mesmos dados), como primário."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'biblioteca.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    engine = database.obter_engine()
+    database.criar_tabelas(engine)
+    # Os caches são do processo e sobreviveriam de um teste (e de uma base) para outro
+    for valor in vars(cache).values():
+        if isinstance(valor, cache.CacheTTL):
+            valor.invalidar()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def cliente(banco):
+    """Cliente de teste de um app novo, sobre a base do teste."""
+    from app import criar_app
+    return criar_app().test_client()
+
+
+@pytest.fixture
+def livro(banco):
+    """Cria um livro com `quantidade` exemplares; devolve o id."""
+    def criar(quantidade=1, titulo="Dom Casmurro"):
+        with banco.begin() as conn:
+            return conn.execute(
+                text("INSERT INTO Livros (Titulo, ISBN, Quantidade_disponivel) VALUES (:titulo, '9788535902778', :qtd)"),
+                {"titulo": titulo, "qtd": quantidade}
+            ).lastrowid
+    return criar
+
+
+@pytest.fixture
+def usuario(banco):
+    """Cria um usuário; devolve o id."""
+    def criar(email="leitor@exemplo.com"):
+        with banco.begin() as conn:
+            return conn.execute(
+                text("""
+                    INSERT INTO usuarios (nome_usuario, email, data_inscricao, multa_atual, senha)
+                    VALUES ('Leitor', :email, CURDATE(), 0, '-')
+                """),
+                {"email": email}
+            ).lastrowid
+    return criar
+
+
+@pytest.fixture
+def estoque(banco):
+    """Quantidade_disponivel atual de um livro."""
+    def ler(livro_id):
+        with banco.connect() as conn:
+            return conn.execute(
+                text("SELECT Quantidade_disponivel FROM Livros WHERE ID_livro = :id"), {"id": livro_id}
+            ).scalar()
+    return ler
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+import agendador
+from operacoes_emprestimo import emprestar
+
+HOJE = date.today()
+
+
+def _status(banco, emprestimo_id):
+    with banco.connect() as conn:
+        return conn.execute(
+            text("SELECT Status_emprestimo FROM Emprestimos WHERE ID_emprestimo = :id"), {"id": emprestimo_id}
+        ).scalar()
+
+
+def test_varredura_roda_uma_vez_por_dia_entre_processos(banco, livro, usuario, monkeypatch):
+    monkeypatch.setattr(agendador, "ultima_varredura", None)
+    monkeypatch.setattr(agendador, "_nova_tentativa", 0.0)
+    emprestimo = emprestar(usuario(), livro(), HOJE - timedelta(days=3), HOJE + timedelta(days=10))
+    with banco.begin() as conn:
+        conn.execute(text("UPDATE Emprestimos SET Data_devolucao_prevista = :ontem WHERE ID_emprestimo = :id"),
+                     {"ontem": HOJE - timedelta(days=1), "id": emprestimo.id})
+
+    assert agendador.atualizar_status_emprestimos() == 1
+    assert _status(banco, emprestimo.id) == "atrasado"
+    assert not agendador.varredura_pendente()
+
+    # Outro worker, com a marca d'água em memória ainda vazia, não repete a varredura
+    agendador.ultima_varredura = None
+    assert agendador.atualizar_status_emprestimos() is None
+    assert not agendador.varredura_pendente()
+
+
+def test_reserva_abandonada_expira(banco, monkeypatch):
+    monkeypatch.setattr(agendador, "ultima_varredura", None)
+    monkeypatch.setattr(agendador, "_nova_tentativa", 0.0)
+    assert agendador._reservar(HOJE) == (True, None)
+    assert agendador._reservar(HOJE) == (False, None)
+
+    monkeypatch.setattr(agendador, "TEMPO_MAXIMO", -1)
+    assert agendador._reservar(HOJE) == (True, None)
+
+
+def test_emprestimo_com_vencimento_passado_entra_atrasado(banco, livro, usuario):
+    emprestimo = emprestar(usuario(), livro(), HOJE - timedelta(days=30), HOJE - timedelta(days=2))
+
+    assert emprestimo.status == "atrasado"
+    assert _status(banco, emprestimo.id) == "atrasado"
+
+
+def test_emprestimo_no_prazo_entra_pendente(banco, livro, usuario):
+    emprestimo = emprestar(usuario(), livro(), HOJE, HOJE + timedelta(days=14))
+
+    assert emprestimo.status == "pendente"
+    assert emprestimo.data_prevista == HOJE + timedelta(days=14)
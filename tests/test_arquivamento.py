@@ -0,0 +1,56 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+import arquivamento
+
+ANTIGO = datetime.now().replace(microsecond=0) - timedelta(days=400)
+
+
+@pytest.fixture
+def logs_antigos(banco, monkeypatch, tmp_path):
+    """Sete eventos de um mês fora da retenção e um recente, com lotes de 3."""
+    monkeypatch.setattr(arquivamento, "TAMANHO_LOTE", 3)
+    monkeypatch.setattr(arquivamento, "PASTA_ARQUIVO", tmp_path / "arquivo")
+    with banco.begin() as conn:
+        conn.execute(
+            text("INSERT INTO logs_auditoria (tabela_afetada, operacao, id_registro, data_hora) VALUES ('Livros', 'UPDATE', :id, :quando)"),
+            [{"id": i, "quando": ANTIGO.replace(day=1) + timedelta(hours=i)} for i in range(7)]
+            + [{"id": 99, "quando": datetime.now().replace(microsecond=0)}]
+        )
+    return f"{ANTIGO:%Y%m}"
+
+
+def _ids(banco, tabela):
+    with banco.connect() as conn:
+        return sorted(conn.execute(text(f"SELECT id_registro FROM {tabela}")).scalars())
+
+
+def _ids_arquivo(caminho):
+    with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+        return sorted(json.loads(linha)["id_registro"] for linha in arquivo)
+
+
+def test_arquiva_em_tabela_mensal(banco, logs_antigos):
+    assert logs_antigos in arquivamento.arquivar(destino="tabela")
+
+    assert _ids(banco, f"logs_auditoria_{logs_antigos}") == list(range(7))
+    assert _ids(banco, "logs_auditoria") == [99]
+
+
+def test_arquivo_repetido_nao_duplica_linhas(banco, logs_antigos):
+    caminho = arquivamento.PASTA_ARQUIVO / f"logs_auditoria_{logs_antigos}.jsonl.gz"
+    with banco.connect() as conn:
+        arquivamento._gravar_arquivo(conn, logs_antigos, f"SELECT {arquivamento.COLUNAS} FROM logs_auditoria WHERE id_registro < 7", {})
+    # Execução anterior interrompida depois de gravar o arquivo e apagar só parte das linhas
+    with banco.begin() as conn:
+        conn.execute(text("DELETE FROM logs_auditoria WHERE id_registro < 3"))
+
+    arquivamento.arquivar(destino="arquivo")
+
+    assert _ids_arquivo(caminho) == list(range(7))
+    assert _ids(banco, "logs_auditoria") == [99]
+    assert not caminho.with_name(caminho.name + ".tmp").exists()
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from busca import buscar_livros
+
+
+def _livro_de(banco, titulo, autor):
+    with banco.begin() as conn:
+        autor_id = conn.execute(text("INSERT INTO Autores (Nome_autor) VALUES (:nome)"), {"nome": autor}).lastrowid
+        return conn.execute(
+            text("INSERT INTO Livros (Titulo, ISBN, Autor_id, Quantidade_disponivel) VALUES (:titulo, '9788535902778', :autor, 1)"),
+            {"titulo": titulo, "autor": autor_id}
+        ).lastrowid
+
+
+def test_palavras_do_titulo_e_do_autor_na_mesma_busca(banco):
+    casmurro = _livro_de(banco, "Dom Casmurro", "Machado de Assis")
+    _livro_de(banco, "Quincas Borba", "Machado de Assis")
+    _livro_de(banco, "Casmurro Genérico", "Outro Autor")
+
+    pagina = buscar_livros("casmurro machado")
+
+    assert [item["ID_livro"] for item in pagina.itens] == [casmurro]
+    assert pagina.itens[0]["Nome_autor"] == "Machado de Assis"
+
+
+def test_isbn_vai_direto_ao_indice(banco):
+    livro_id = _livro_de(banco, "Dom Casmurro", "Machado de Assis")
+
+    assert [item["ID_livro"] for item in buscar_livros("978-85-359-0277-8").itens] == [livro_id]
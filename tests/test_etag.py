@@ -0,0 +1,48 @@
+def _listar(cliente, etag=None, url="/livros"):
+    return cliente.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_mesmo_etag_responde_304_sem_corpo(cliente, livro):
+    livro()
+    primeira = _listar(cliente)
+    assert primeira.status_code == 200 and primeira.headers["ETag"]
+
+    repetida = _listar(cliente, primeira.headers["ETag"])
+
+    assert repetida.status_code == 304
+    assert repetida.data == b""
+    assert repetida.headers["ETag"] == primeira.headers["ETag"]
+    assert "private" in repetida.headers["Cache-Control"] and "no-cache" in repetida.headers["Cache-Control"]
+
+
+def test_escrita_em_tabela_da_pagina_muda_o_etag(cliente):
+    etag = _listar(cliente).headers["ETag"]
+
+    # /livros mostra o nome do gênero, então um gênero novo invalida a página
+    assert cliente.post("/generos/novo", data={"nome": "Romance"}).status_code == 302
+    # A primeira página depois do POST mostra a mensagem flash e não leva ETag
+    assert "ETag" not in _listar(cliente, etag).headers
+
+    depois = _listar(cliente, etag)
+    assert depois.status_code == 200
+    assert depois.headers["ETag"] != etag
+
+
+def test_etag_depende_da_pagina_e_do_usuario(cliente):
+    etag = _listar(cliente).headers["ETag"]
+
+    assert _listar(cliente, etag, "/livros?limite=10").status_code == 200
+    with cliente.session_transaction() as sessao:
+        sessao["usuario_id"] = 1
+    assert _listar(cliente, etag).status_code == 200
+
+
+def test_mensagem_flash_pendente_renderiza_a_pagina(cliente):
+    etag = _listar(cliente).headers["ETag"]
+    with cliente.session_transaction() as sessao:
+        sessao["_flashes"] = [("success", "Livro cadastrado com sucesso!")]
+
+    resposta = _listar(cliente, etag)
+
+    assert resposta.status_code == 200
+    assert "Livro cadastrado com sucesso!" in resposta.get_data(as_text=True)
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+import fila_auditoria
+from transacao import conexao
+
+
+@pytest.fixture
+def modo_aplicacao(banco, monkeypatch):
+    monkeypatch.setattr(fila_auditoria, "MODO", "aplicacao")
+    yield
+    fila_auditoria.descarregar()
+
+
+def _logs(banco):
+    with banco.connect() as conn:
+        return conn.execute(text(
+            "SELECT tabela_afetada, operacao, id_registro, dados_novos, usuario_executor FROM logs_auditoria ORDER BY id_log"
+        )).fetchall()
+
+
+def test_eventos_sao_gravados_em_lote(banco, modo_aplicacao, monkeypatch):
+    monkeypatch.setattr(fila_auditoria, "TAMANHO_LOTE", 4)
+    lotes = []
+    gravar = fila_auditoria._gravar
+    monkeypatch.setattr(fila_auditoria, "_gravar", lambda lote: (lotes.append(len(lote)), gravar(lote)))
+
+    for id_registro in range(10):
+        fila_auditoria.registrar("Livros", "INSERT", id_registro, novos={"titulo": f"Livro {id_registro}"})
+    fila_auditoria.descarregar()
+
+    logs = _logs(banco)
+    assert [log.id_registro for log in logs] == list(range(10))
+    assert json.loads(logs[3].dados_novos) == {"titulo": "Livro 3"}
+    assert logs[0].usuario_executor.endswith("(app)")
+    assert sum(lotes) == 10 and max(lotes) <= 4
+
+
+def test_modo_gatilho_so_grava_eventos_sem_gatilho(banco):
+    fila_auditoria.registrar("Livros", "INSERT", 1)
+    fila_auditoria.registrar_evento("Emprestimos", "DEVOLUÇÃO", 2)
+    fila_auditoria.descarregar()
+
+    assert [(log.operacao, log.id_registro) for log in _logs(banco)] == [("DEVOLUÇÃO", 2)]
+
+
+@pytest.mark.parametrize("status, gravados", [(200, [7]), (500, [])])
+def test_na_requisicao_so_entra_na_fila_depois_do_commit(cliente, banco, modo_aplicacao, status, gravados):
+    app = cliente.application
+
+    @app.route("/teste-auditoria")
+    def alterar():
+        with conexao() as conn:
+            conn.execute(text("INSERT INTO generos (nome_genero) VALUES ('Romance')"))
+        fila_auditoria.registrar("generos", "INSERT", 7, novos={"nome": "Romance"})
+        assert fila_auditoria._fila.unfinished_tasks == 0
+        return "", status
+
+    assert cliente.get("/teste-auditoria").status_code == status
+    fila_auditoria.descarregar()
+
+    assert [log.id_registro for log in _logs(banco)] == gravados
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+import importacao
+import senhas
+
+
+def test_livro_sem_quantidade_entra_com_o_padrao(banco):
+    resultado = importacao.importar_livros([
+        (2, {"titulo": "Dom Casmurro", "isbn": "978-85-359-0277-8"}),
+        (3, {"titulo": "Quincas Borba", "isbn": "9788535902778", "quantidade": "0"}),
+    ])
+
+    assert resultado == {"inseridos": 1, "erros": [{"linha": 3, "erro": "Quantidade deve ser pelo menos 1"}]}
+    with banco.connect() as conn:
+        assert conn.execute(text("SELECT Quantidade_disponivel FROM Livros")).scalars().all() == [1]
+
+
+def test_usuarios_importados_com_senha_em_hash(banco):
+    resultado = importacao.importar_usuarios([
+        (2, {"nome": "Ana", "email": "ana@exemplo.com", "senha": "segredo1"}),
+        (3, {"nome": "Bia", "email": "bia@exemplo.com", "senha": "segredo2"}),
+        (4, {"nome": "Ana de novo", "email": "ANA@exemplo.com", "senha": "segredo3"}),
+    ])
+
+    assert resultado["inseridos"] == 2
+    assert resultado["erros"] == [{"linha": 4, "erro": "Email já cadastrado: ANA@exemplo.com"}]
+    with banco.connect() as conn:
+        hashes = dict(conn.execute(text("SELECT email, senha FROM usuarios")).fetchall())
+    assert senhas.verificar(hashes["bia@exemplo.com"], "segredo2")[0]
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import text
+
+import multas
+from operacoes_emprestimo import devolver, emprestar
+
+HOJE = date.today()
+
+
+def _multas(banco, emprestimo_id, usuario_id):
+    with banco.connect() as conn:
+        return conn.execute(text("""
+            SELECT e.multa, u.multa_pendente, u.multa_atual
+            FROM Emprestimos e JOIN usuarios u ON u.id_usuario = e.Usuario_id
+            WHERE e.ID_emprestimo = :id AND u.id_usuario = :usuario
+        """), {"id": emprestimo_id, "usuario": usuario_id}).one()
+
+
+def test_acumular_recalcula_sem_cobrar_em_dobro(banco, livro, usuario, monkeypatch):
+    monkeypatch.setattr(multas, "MULTA_DIARIA", 2.0)
+    usuario_id = usuario()
+    atrasado = emprestar(usuario_id, livro(), HOJE - timedelta(days=20), HOJE - timedelta(days=5))
+    no_prazo = emprestar(usuario_id, livro(titulo="Quincas Borba"), HOJE, HOJE + timedelta(days=5))
+
+    assert multas.acumular(HOJE) == 1
+    assert multas.acumular(HOJE) == 0
+    assert _multas(banco, atrasado.id, usuario_id)[:2] == (Decimal("10.00"), Decimal("10.00"))
+    assert _multas(banco, no_prazo.id, usuario_id)[0] == 0
+
+    # No dia seguinte a multa cresce uma diária
+    assert multas.acumular(HOJE + timedelta(days=1)) == 1
+    assert _multas(banco, atrasado.id, usuario_id)[:2] == (Decimal("12.00"), Decimal("12.00"))
+
+
+def test_devolucao_grava_a_multa_final_e_zera_o_pendente(banco, livro, usuario, monkeypatch):
+    monkeypatch.setattr(multas, "MULTA_DIARIA", 2.0)
+    usuario_id = usuario()
+    emprestimo = emprestar(usuario_id, livro(), HOJE - timedelta(days=20), HOJE - timedelta(days=3))
+    multas.acumular(HOJE)
+
+    devolver(emprestimo.id, HOJE)
+    multas.acumular(HOJE)
+
+    multa, pendente, atual = _multas(banco, emprestimo.id, usuario_id)
+    assert (multa, pendente, atual) == (Decimal("6.00"), Decimal("0.00"), Decimal("6.00"))
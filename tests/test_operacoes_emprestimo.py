@@ -0,0 +1,110 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import text
+
+import multas
+from operacoes_emprestimo import EmprestimoInexistente, EstoqueEsgotado, JaDevolvido, devolver, emprestar, excluir
+
+HOJE = date.today()
+PREVISTA = HOJE + timedelta(days=20)
+
+
+def _disputar(livro_id, usuario_id, threads):
+    """Dispara `threads` empréstimos do mesmo livro ao mesmo tempo; devolve (concedidos, esgotados, erros)."""
+    concedidos, esgotados, erros = [], [], []
+    largada = threading.Barrier(threads)
+
+    def trabalhador():
+        largada.wait()
+        try:
+            concedidos.append(emprestar(usuario_id, livro_id, HOJE, PREVISTA).id)
+        except EstoqueEsgotado:
+            esgotados.append(livro_id)
+        except Exception as e:
+            erros.append(e)
+
+    todas = [threading.Thread(target=trabalhador) for _ in range(threads)]
+    for thread in todas:
+        thread.start()
+    for thread in todas:
+        thread.join()
+    return concedidos, esgotados, erros
+
+
+@pytest.mark.parametrize("exemplares", [1, 3])
+def test_emprestimos_simultaneos_nao_passam_do_estoque(banco, livro, usuario, estoque, exemplares):
+    livro_id, usuario_id = livro(exemplares), usuario()
+
+    concedidos, esgotados, erros = _disputar(livro_id, usuario_id, threads=12)
+
+    assert erros == []
+    assert len(concedidos) == exemplares
+    assert len(esgotados) == 12 - exemplares
+    assert estoque(livro_id) == 0
+    with banco.connect() as conn:
+        registrados = conn.execute(
+            text("SELECT COUNT(*) FROM Emprestimos WHERE Livro_id = :id"), {"id": livro_id}
+        ).scalar()
+    assert registrados == exemplares
+
+
+def test_livro_sem_estoque_recusa_emprestimo(livro, usuario, estoque):
+    livro_id = livro(0)
+    with pytest.raises(EstoqueEsgotado):
+        emprestar(usuario(), livro_id, HOJE, PREVISTA)
+    assert estoque(livro_id) == 0
+
+
+def test_devolucao_repoe_exemplar_uma_vez(livro, usuario, estoque):
+    livro_id = livro(1)
+    emprestimo_id = emprestar(usuario(), livro_id, HOJE, PREVISTA).id
+    assert estoque(livro_id) == 0
+
+    devolver(emprestimo_id, HOJE)
+    assert estoque(livro_id) == 1
+    with pytest.raises(JaDevolvido):
+        devolver(emprestimo_id, HOJE)
+    assert estoque(livro_id) == 1
+
+
+def test_devolver_emprestimo_inexistente(banco):
+    with pytest.raises(EmprestimoInexistente):
+        devolver(999, HOJE)
+
+
+def test_excluir_repoe_so_emprestimo_em_aberto(livro, usuario, estoque):
+    livro_id, usuario_id = livro(2), usuario()
+    aberto = emprestar(usuario_id, livro_id, HOJE, PREVISTA).id
+    devolvido = emprestar(usuario_id, livro_id, HOJE, PREVISTA).id
+    devolver(devolvido, HOJE)
+    assert estoque(livro_id) == 1
+
+    assert excluir(devolvido).Status_emprestimo == "devolvido"
+    assert estoque(livro_id) == 1
+    assert excluir(aberto).Status_emprestimo == "pendente"
+    assert estoque(livro_id) == 2
+    assert excluir(aberto) is None
+
+
+def test_excluir_atrasado_tira_a_multa_do_pendente(banco, livro, usuario, monkeypatch):
+    monkeypatch.setattr(multas, "MULTA_DIARIA", 2.0)
+    usuario_id = usuario()
+    atrasado = emprestar(usuario_id, livro(), HOJE - timedelta(days=20), HOJE - timedelta(days=4)).id
+    outro = emprestar(usuario_id, livro(titulo="Quincas Borba"), HOJE - timedelta(days=20), HOJE - timedelta(days=1)).id
+    multas.acumular(HOJE)
+
+    excluir(atrasado)
+
+    def pendente():
+        with banco.connect() as conn:
+            return conn.execute(
+                text("SELECT multa_pendente FROM usuarios WHERE id_usuario = :id"), {"id": usuario_id}
+            ).scalar()
+
+    assert pendente() == 2
+    multas.acumular(HOJE)
+    assert pendente() == 2
+    excluir(outro)
+    assert pendente() == 0
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+import consultas
+from paginacao import pagina_por_data, pagina_por_id
+
+HOJE = date.today()
+
+
+@pytest.fixture
+def paginar(banco):
+    """Percorre uma listagem página a página, seguindo o cursor; devolve os ids de cada página."""
+    app = Flask(__name__)
+
+    def percorrer(funcao, *args, limite=2):
+        paginas, apos = [], ""
+        # Um cursor que volta ao começo faria o laço girar para sempre
+        for _ in range(50):
+            with app.test_request_context(f"/?limite={limite}&apos={apos}"), banco.connect() as conn:
+                pagina = funcao(conn, *args)
+            paginas.append([linha[0] for linha in pagina.itens])
+            if pagina.proximo is None:
+                return paginas
+            apos = pagina.proximo
+        pytest.fail(f"paginação não terminou; cursor {apos!r}")
+    return percorrer
+
+
+@pytest.fixture
+def emprestimos(banco, livro, usuario):
+    """Empréstimos com datas repetidas e dois sem data; devolve os ids na ordem da listagem."""
+    livro_id, usuario_id = livro(), usuario()
+    datas = [HOJE, HOJE - timedelta(days=1), HOJE, None, HOJE - timedelta(days=3), None, HOJE - timedelta(days=1)]
+    with banco.begin() as conn:
+        ids = [
+            conn.execute(
+                text("INSERT INTO Emprestimos (Usuario_id, Livro_id, Data_emprestimo, Status_emprestimo) VALUES (:u, :l, :d, 'pendente')"),
+                {"u": usuario_id, "l": livro_id, "d": data}
+            ).lastrowid
+            for data in datas
+        ]
+    por_data = sorted(zip(datas, ids), key=lambda par: (par[0] or date.min, par[1]), reverse=True)
+    return [id_ for _, id_ in por_data]
+
+
+def test_pagina_por_id_percorre_tudo_uma_vez(banco, livro, paginar):
+    ids = [livro(titulo=f"Livro {i}") for i in range(5)]
+
+    assert paginar(pagina_por_id, "SELECT ID_livro FROM Livros", "ID_livro") == [ids[0:2], ids[2:4], ids[4:]]
+
+
+@pytest.mark.parametrize("limite", [1, 2, 3, 10])
+def test_pagina_por_data_inclui_registros_sem_data(emprestimos, paginar, limite):
+    paginas = paginar(pagina_por_data, "SELECT e.ID_emprestimo, e.Data_emprestimo FROM Emprestimos e",
+                      "e.Data_emprestimo", "e.ID_emprestimo", limite=limite)
+
+    assert [id_ for pagina in paginas for id_ in pagina] == emprestimos
+    assert all(len(pagina) == limite for pagina in paginas[:-1])
+
+
+def test_listagem_de_emprestimos_usa_a_mesma_ordem(emprestimos, paginar):
+    paginas = paginar(pagina_por_data, consultas.LISTAR_EMPRESTIMOS, "e.Data_emprestimo", "e.ID_emprestimo")
+
+    assert [id_ for pagina in paginas for id_ in pagina] == emprestimos
@@ -0,0 +1,25 @@
+from sqlalchemy import text
+
+import consultas
+import painel
+
+
+def _contadores(banco):
+    with banco.connect() as conn:
+        return dict(conn.execute(consultas.LER_CONTADORES).fetchall())
+
+
+def test_reconciliar_soma_so_o_desvio(banco, livro):
+    livro(quantidade=4)
+    livro(quantidade=2)
+    with banco.begin() as conn:
+        conn.execute(text("INSERT INTO contadores_painel (nome, fatia, valor) VALUES ('livros', 5, 1), ('exemplares_disponiveis', 0, 9)"))
+
+    assert painel.reconciliar() == {"livros": 1, "exemplares_disponiveis": -3}
+    contadores = _contadores(banco)
+    assert (contadores["livros"], contadores["exemplares_disponiveis"]) == (2, 6)
+    # A fatia que outro gatilho já tinha incrementado continua lá
+    with banco.connect() as conn:
+        assert conn.execute(text("SELECT valor FROM contadores_painel WHERE nome = 'livros' AND fatia = 5")).scalar() == 1
+
+    assert painel.reconciliar() == {}
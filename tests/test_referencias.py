@@ -0,0 +1,31 @@
+from cache import obter_autores
+from versoes import ler_versoes
+
+
+def _cadastrar(cliente, nome):
+    return cliente.post("/autores/cadastrar_autor", data={"nome": nome, "nacionalidade": "Brasileira"})
+
+
+def test_cadastro_de_autor_invalida_cache_e_versao(cliente):
+    with cliente.application.app_context():
+        assert obter_autores() == []
+        versao = ler_versoes("Autores")["Autores"]
+
+    assert _cadastrar(cliente, "Machado de Assis").status_code == 302
+
+    with cliente.application.app_context():
+        assert [autor.Nome_autor for autor in obter_autores()] == ["Machado de Assis"]
+        assert ler_versoes("Autores")["Autores"] == versao + 1
+
+
+def test_autor_repetido_nao_mexe_no_cache_nem_na_versao(cliente):
+    _cadastrar(cliente, "Machado de Assis")
+    with cliente.application.app_context():
+        autores = obter_autores()
+        versao = ler_versoes("Autores")["Autores"]
+
+    assert _cadastrar(cliente, "Machado de Assis").status_code == 302
+
+    with cliente.application.app_context():
+        assert obter_autores() is autores
+        assert ler_versoes("Autores")["Autores"] == versao
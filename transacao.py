@@ -0,0 +1,100 @@
+"""Uma conexão e uma transação por requisição.
+
+Rotas e módulos usam `with conexao() as conn` (ou conexao_leitura() para o que
+pode ir a uma réplica). Dentro de uma requisição os dois devolvem a conexão
+guardada em `g`, aberta na primeira consulta; o commit é feito uma vez, no
+after_request, e exceção não tratada ou resposta 5xx desfazem tudo no
+teardown. Fora de uma requisição (CLI, agendador) cada bloco abre a própria
+transação, como antes.
+"""
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+from database import obter_engine
+from replicas import engine_leitura
+
+
+def obter_conexao(leitura=False):
+    """Conexão da requisição com o primário ou, com `leitura=True`, com o engine de engine_leitura()."""
+    alvo = engine_leitura() if leitura else obter_engine()
+    conexoes = g.setdefault("conexoes", {})
+    if alvo not in conexoes:
+        conexoes[alvo] = alvo.connect()
+    return conexoes[alvo]
+
+
+@contextmanager
+def conexao():
+    if has_request_context():
+        yield obter_conexao()
+    else:
+        with obter_engine().begin() as conn:
+            yield conn
+
+
+@contextmanager
+def conexao_leitura():
+    if has_request_context():
+        yield obter_conexao(leitura=True)
+    else:
+        with obter_engine().connect() as conn:
+            yield conn
+
+
+def _em_transacao():
+    return has_request_context() and any(conn.in_transaction() for conn in g.get("conexoes", {}).values())
+
+
+def depois_do_commit(funcao):
+    """Adia `funcao` para depois do commit da requisição; sem transação aberta, roda na hora.
+
+    Invalidação de cache e eventos de auditoria passam por aqui: feitos antes do
+    commit, outra requisição poderia guardar no cache o dado antigo, e um
+    rollback deixaria na auditoria uma alteração que não aconteceu.
+    """
+    if _em_transacao():
+        g.setdefault("depois_do_commit", []).append(funcao)
+    else:
+        funcao()
+
+
+def liberar():
+    """Confirma e devolve ao pool as conexões da requisição antes de um trabalho demorado sem banco.
+
+    O login chama antes de verificar a senha, para não segurar uma conexão
+    durante o KDF; a consulta seguinte, se houver, abre outra.
+    """
+    if has_request_context():
+        for conn in g.pop("conexoes", {}).values():
+            if conn.in_transaction():
+                conn.commit()
+            conn.close()
+
+
+def desfazer():
+    """Desfaz a transação da requisição, para refazer a operação do zero (deadlock)."""
+    if has_request_context():
+        for conn in g.get("conexoes", {}).values():
+            conn.rollback()
+        g.pop("depois_do_commit", None)
+
+
+def transacao_por_requisicao(app):
+    @app.after_request
+    def confirmar_transacao(resposta):
+        # Antes de a resposta sair: se o commit falhar, o cliente recebe 500 em vez de um sucesso
+        if resposta.status_code < 500:
+            for conn in g.get("conexoes", {}).values():
+                if conn.in_transaction():
+                    conn.commit()
+            for funcao in g.pop("depois_do_commit", []):
+                funcao()
+        return resposta
+
+    @app.teardown_request
+    def fechar_conexoes(erro=None):
+        # Sem commit, close() devolve a conexão ao pool com rollback
+        for conn in g.pop("conexoes", {}).values():
+            conn.close()
+        g.pop("depois_do_commit", None)
@@ -0,0 +1,18 @@
+import re
+
+PADRAO_TELEFONE = re.compile(r'^\(\d{2}\)\s*9?\s*\d{4}-\d{4}$')
+
+
+def telefone_valido(telefone):
+    return not telefone or bool(PADRAO_TELEFONE.match(telefone.strip()))
+
+
+def isbn_valido(isbn):
+    """Valida ISBN-10 ou ISBN-13 (hífens e espaços são ignorados) pelo dígito verificador."""
+    digitos = (isbn or "").replace("-", "").replace(" ", "").upper()
+    if len(digitos) == 10 and digitos[:9].isdigit() and (digitos[9].isdigit() or digitos[9] == "X"):
+        valores = [int(d) for d in digitos[:9]] + [10 if digitos[9] == "X" else int(digitos[9])]
+        return sum((10 - i) * v for i, v in enumerate(valores)) % 11 == 0
+    if len(digitos) == 13 and digitos.isdigit():
+        return sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digitos)) % 10 == 0
+    return False
@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+from pathlib import Path
+
+from flask import make_response, request, session
+import consultas
+from database import obter_engine
+from transacao import conexao, conexao_leitura
+
+# Cada tabela tem FATIAS linhas de contador; os gatilhos escolhem a fatia pelo
+# id do registro, então empréstimos de livros diferentes não disputam a mesma linha
+FATIAS = 16
+MAX_AGE_ESTATICOS = 365 * 24 * 3600
+
+PASTA_TEMPLATES = Path(__file__).parent / "templates"
+# Muda a cada deploy que altera algum template, para não servir 304 de HTML antigo
+_VERSAO_TEMPLATES = max((arquivo.stat().st_mtime_ns for arquivo in PASTA_TEMPLATES.rglob("*.html")), default=0)
+
+_impressoes = {}
+
+
+def ler_versoes(*tabelas):
+    with conexao_leitura() as conn:
+        versoes = dict(conn.execute(consultas.LER_VERSOES, {"tabelas": list(tabelas)}).fetchall())
+    return {tabela: int(versoes.get(tabela) or 0) for tabela in tabelas}
+
+
+def _incrementar(conn, tabela):
+    if not conn.execute(consultas.INCREMENTAR_VERSAO, {"tabela": tabela}).rowcount:
+        conn.execute(consultas.CRIAR_VERSAO, {"tabela": tabela})
+
+
+def incrementar_versao(tabela, conn=None):
+    """Marca `tabela` como alterada. No MySQL os gatilhos da migração 005 já fazem isso.
+
+    `conn` é a conexão da transação que alterou a tabela; sem ela, usa a da
+    requisição (ou uma transação própria, fora dela).
+    """
+    if obter_engine().dialect.name == "mysql":
+        return
+    if conn is not None:
+        _incrementar(conn, tabela)
+        return
+    with conexao() as conn:
+        _incrementar(conn, tabela)
+
+
+def condicional(*tabelas):
+    """GET condicional para páginas que só dependem de `tabelas`.
+
+    O ETag combina as versões das tabelas, a URL (paginação) e o usuário logado
+    (o menu muda). Se o navegador mandar o mesmo ETag em If-None-Match, responde
+    304 sem executar a rota nem renderizar o template.
+    """
+    def decorador(rota):
+        @wraps(rota)
+        def envolvida(*args, **kwargs):
+            # Mensagens flash pendentes só aparecem se a página for renderizada
+            if session.get("_flashes"):
+                return rota(*args, **kwargs)
+
+            chave = (sorted(ler_versoes(*tabelas).items()), request.full_path, session.get("usuario_id"), _VERSAO_TEMPLATES)
+            etag = hashlib.sha1(repr(chave).encode()).hexdigest()[:20]
+            if request.if_none_match.contains(etag):
+                resposta = make_response("", 304)
+            else:
+                resposta = make_response(rota(*args, **kwargs))
+            resposta.set_etag(etag)
+            resposta.cache_control.private = True
+            resposta.cache_control.no_cache = True
+            return resposta
+        return envolvida
+    return decorador
+
+
+def _impressao_digital(pasta, nome):
+    caminho = Path(pasta) / nome
+    try:
+        modificado = caminho.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _impressoes.get(caminho, (None,))[0] != modificado:
+        _impressoes[caminho] = (modificado, hashlib.md5(caminho.read_bytes()).hexdigest()[:10])
+    return _impressoes[caminho][1]
+
+
+def versionar_estaticos(app):
+    """Acrescenta ?v=<hash do conteúdo> às URLs de static/ e as serve com cache de um ano."""
+    @app.url_defaults
+    def impressao_digital_estaticos(endpoint, valores):
+        if endpoint == "static" and "filename" in valores and "v" not in valores:
+            impressao = _impressao_digital(app.static_folder, valores["filename"])
+            if impressao:
+                valores["v"] = impressao
+
+    @app.after_request
+    def cache_estaticos(resposta):
+        if request.endpoint == "static" and request.args.get("v") and resposta.status_code == 200:
+            resposta.cache_control.no_cache = None
+            resposta.cache_control.public = True
+            resposta.cache_control.max_age = MAX_AGE_ESTATICOS
+            resposta.cache_control.immutable = True
+        return resposta